@@ -8,6 +8,23 @@ from color_utilities.additionals import (ILLUMINANT_WHITEPOINTS, T4200K, T6800K,
 from color_utilities.converters import *
 from color_utilities.xyz import *
 from color_utilities.constants import *
+from color_utilities.batch_converters import *
+from color_utilities.batch_color_utils import *
+from color_utilities.compositing import *
+from color_utilities.ycbcr import *
+from color_utilities.frame_processor import *
+from color_utilities.spectral import *
+from color_utilities.cct import *
+from color_utilities.oklab import *
+from color_utilities.image_kernels import *
+from color_utilities.color_statistics import *
+from color_utilities.palettes import *
+from color_utilities.adjustments import *
+from color_utilities.dithering import *
+from color_utilities.buffers import *
+from color_utilities.grading import *
+from color_utilities.tone_mapping import *
+from color_utilities import batch_transfer_functions
 
 
 #* Combo functions
@@ -492,3 +509,8 @@ def yxy_to_rgb(
         adaptation=adaptation,
         color_space=color_space,
         output=output)
+
+
+#* Imported last so the cache and the profiler enabled by environment variables can wrap every function above
+from color_utilities import caching, profiling  # pylint: disable=wrong-import-position
+from color_utilities.caching import cache, cache_info, clear_cache  # pylint: disable=wrong-import-position
@@ -35,6 +35,9 @@ Rec709Luma = '0.212656R + 0.715158G + 0.072186B'
 Rec2020Luma = '0.2627R + 0.678G + 0.0593B'
 Rec2100Luma = '0.2627R + 0.678G + 0.0593B'
 
+#= The Rec. 709/sRGB luma weights (R, G, B) used by the ASC CDL saturation and the WCAG relative luminance
+REC709_LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
 # BT.470-625 (PAL) = '0.299R + 0.587G + 0.114B'
 
 
@@ -0,0 +1,248 @@
+"""This module contains array versions of the color adjustment functions (saturate, desaturate, color_change,
+darker_color, brighter_color and half_color) built from composable adjustments.
+A chain of adjustments is applied with a single conversion from RGB and a single one back. Consecutive adjustments
+in the same model share the intermediate values, and switching between HSV, HSL and HSP converts directly
+between them without going through RGB.
+
+Example:
+    >>> adjust_batch(image, [Adjustment.saturate(10), Adjustment.darker(5), Adjustment.saturate(5, mode="hsl")])
+"""
+# pylint: disable=invalid-name, protected-access
+from collections.abc import Callable, Sequence
+from enum import Enum
+
+import numpy as np
+
+from . import batch_converters as bc
+from .constants import Out1
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The models adjustments can work in and the channel they brighten/darken
+MODELS = {"rgb": None, "hsv": 2, "hsl": 2, "hsp": 2}
+
+#= Weights of the perceived brightness in HSP
+HSP_WEIGHTS = (0.299, 0.587, 0.114)
+
+#= Operations darkening a color. Everything else brightens it (same as color_utils)
+DARKEN = {"dark", "darken", "dim"}
+
+
+def _model(mode: str, allowed: tuple) -> str:
+    """### Returns a validated lowercase model name"""
+    mode = mode.strip().lower()
+    if mode not in allowed:
+        raise ValueError(f"Mode can only be one of the following: {allowed}!")
+    return mode
+
+
+class Adjustment:
+    """### A single adjustment applied in place to (N, 3) values of a color model
+
+    Create them with the constructors named after the color_utils functions (`Adjustment.saturate(10)`) and apply
+    one or a sequence of them with `adjust_batch`.
+
+    ### Args:
+        `model` (str): The model the adjustment works in. One of MODELS
+        `func` (Callable): Takes the (N, 3) values (RGB normalized, H in degrees and the others in range 0-1) and
+                            the bit depth, and changes the values in place
+        `name` (str, optional): A description shown by repr. Defaults to "custom".
+    """
+
+    def __init__(self, model: str, func: Callable, name: str = "custom"):
+        self.model = _model(model, tuple(MODELS))
+        self.func = func
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"Adjustment({self.name}, {self.model})"
+
+    @staticmethod
+    def _shift(channel: int, amount: float) -> Callable:
+        """### Returns a function adding `amount` to a channel and clamping it in range 0-1"""
+        def shift(values: np.ndarray, depth: int):
+            column = values[:, channel]
+            column += amount
+            np.clip(column, 0, 1, out=column)
+        return shift
+
+    @classmethod
+    def saturate(cls, value: float = 5, mode: str = "hsv") -> "Adjustment":
+        """### Adds `value` (range 0-100) to the saturation in HSV or HSL. Like color_utils.saturate \
+            (the intermediate values aren't rounded, so results can differ by a few code values)"""
+        mode = _model(mode, ("hsv", "hsl"))
+        return cls(mode, cls._shift(1, value / 100), f"saturate {value}")
+
+    @classmethod
+    def desaturate(cls, value: float = 5, mode: str = "hsv") -> "Adjustment":
+        """### Subtracts `value` (range 0-100) from the saturation in HSV or HSL. Like color_utils.desaturate \
+            (the intermediate values aren't rounded, so results can differ by a few code values)"""
+        mode = _model(mode, ("hsv", "hsl"))
+        return cls(mode, cls._shift(1, -value / 100), f"desaturate {value}")
+
+    @classmethod
+    def color_change(cls, value: float = 5, operation: str = "darken", mode: str = "rgb") -> "Adjustment":
+        """### Brightens/darkens by `value`. Like color_utils.color_change
+
+        #### N/B: `value` is in range 0-255 (the code values of 8-bit depth, scaled for other depths) for "rgb" \
+            mode and in range 0-100 for "hsl", "hsv" and "hsp" modes. In those modes the intermediate values aren't \
+            rounded, so results can differ from color_utils.color_change by a few code values.
+        """
+        mode = _model(mode, tuple(MODELS))
+        sign = -1 if operation.strip().lower() in DARKEN else 1
+        name = f"color_change {sign * value} {mode}"
+        if mode != "rgb":
+            return cls(mode, cls._shift(MODELS[mode], sign * value / 100), name)
+
+        def change(values: np.ndarray, depth: int):
+            values += sign * value / (2 ** depth - 1)
+            np.clip(values, 0, 1, out=values)
+        return cls("rgb", change, name)
+
+    @classmethod
+    def darker(cls, level: float = 5, mode: str = "hsv") -> "Adjustment":
+        """### Subtracts `level` (range 0-100) from V in HSV or L in HSL. Like additionals.darker_color \
+            (the intermediate values aren't rounded, so results can differ by a few code values)"""
+        mode = _model(mode, ("hsv", "hsl"))
+        return cls(mode, cls._shift(2, -level / 100), f"darker {level}")
+
+    @classmethod
+    def brighter(cls, level: float = 5, mode: str = "hsv") -> "Adjustment":
+        """### Adds `level` (range 0-100) to V in HSV or L in HSL. Like additionals.brighter_color \
+            (the intermediate values aren't rounded, so results can differ by a few code values)"""
+        mode = _model(mode, ("hsv", "hsl"))
+        return cls(mode, cls._shift(2, level / 100), f"brighter {level}")
+
+    @classmethod
+    def half(cls, operation: str = "darken") -> "Adjustment":
+        """### Halves the code values or adds half of them. Same as color_utils.half_color"""
+        darken = operation.strip().lower() in DARKEN
+
+        def half(values: np.ndarray, depth: int):
+            max_value = 2 ** depth - 1
+            # Back to the code values the scalar function works on (rounded off the float error of normalizing)
+            values *= max_value
+            np.round(values, 6, out=values)
+            halves = np.floor(values / 2)
+            if darken:
+                values[:] = halves
+            else:
+                values += halves
+                np.minimum(values, max_value, out=values)
+            values /= max_value
+        return cls("rgb", half, "half darken" if darken else "half brighten")
+
+
+def _hsp_scale(HSV: np.ndarray) -> np.ndarray:
+    """### Returns P / V of HSV values. HSP has the hue and saturation of HSV, so P scales with V"""
+    unit = HSV.copy()
+    unit[:, 2] = 1
+    RGB = bc.hsv_to_rgb_batch(unit)
+    return np.sqrt((RGB * RGB) @ np.array(HSP_WEIGHTS))
+
+
+def _to_hsv(values: np.ndarray, model: str) -> np.ndarray:
+    """### Converts (N, 3) values of a model to HSV in place where possible"""
+    match model:
+        case "rgb":
+            return bc.rgb_to_hsv_batch(values)
+        case "hsl":
+            S, L = values[:, 1], values[:, 2]
+            V = L + S * np.minimum(L, 1 - L)
+            values[:, 1] = np.where(V > 0, 2 * (1 - L / np.where(V > 0, V, 1)), 0)
+            values[:, 2] = V
+        case "hsp":
+            values[:, 2] /= _hsp_scale(values)
+    return values
+
+
+def _from_hsv(HSV: np.ndarray, model: str) -> np.ndarray:
+    """### Converts (N, 3) HSV values to a model in place where possible"""
+    match model:
+        case "rgb":
+            return bc.hsv_to_rgb_batch(HSV)
+        case "hsl":
+            S, V = HSV[:, 1], HSV[:, 2]
+            L = V * (1 - S / 2)
+            divisor = np.minimum(L, 1 - L)
+            HSV[:, 1] = np.where(divisor > 0, (V - L) / np.where(divisor > 0, divisor, 1), 0)
+            HSV[:, 2] = L
+        case "hsp":
+            HSV[:, 2] *= _hsp_scale(HSV)
+    return HSV
+
+
+def _convert(values: np.ndarray, src: str, dst: str) -> np.ndarray:
+    """### Converts (N, 3) values between models (through HSV unless it's the direct RGB <-> HSL conversion)"""
+    if src == dst:
+        return values
+    if {src, dst} == {"rgb", "hsl"}:
+        return bc.rgb_to_hsl_batch(values) if src == "rgb" else bc.hsl_to_rgb_batch(values)
+    return _from_hsv(_to_hsv(values, src), dst)
+
+
+def adjust_batch(
+    colors,
+    adjustments: Adjustment | Sequence[Adjustment],
+    depth: int = 8,
+    output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Applies an adjustment or a chain of adjustments to an array of colors
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `adjustments` (Adjustment | Sequence[Adjustment]): Applied in order. Consecutive ones in the same model
+                                    work on the same intermediate values
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with the shape of the input (without the last axis for hex output)
+    """
+    if isinstance(adjustments, Adjustment):
+        adjustments = (adjustments,)
+    RGB = bc._colors_array(colors, depth)
+    values, model = np.array(RGB, dtype=np.float64).reshape(-1, 3), "rgb"
+    for adjustment in adjustments:
+        if not isinstance(adjustment, Adjustment):
+            raise TypeError("Adjustments must be Adjustment instances!")
+        values = _convert(values, model, adjustment.model)
+        model = adjustment.model
+        adjustment.func(values, depth)
+    values = _convert(values, model, "rgb").reshape(RGB.shape)
+    return bc.return_rgb_batch(values, output, depth, clamp=True, inplace=True)
+
+
+def saturate_batch(colors, depth: int = 8, value: float = 5, mode: str = "hsv",
+                   output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of color_utils.saturate"""
+    return adjust_batch(colors, Adjustment.saturate(value, mode), depth, output)
+
+
+def desaturate_batch(colors, depth: int = 8, value: float = 5, mode: str = "hsv",
+                     output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of color_utils.desaturate"""
+    return adjust_batch(colors, Adjustment.desaturate(value, mode), depth, output)
+
+
+def color_change_batch(colors, depth: int = 8, value: float = 5, operation: str = "darken", mode: str = "rgb",
+                       output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of color_utils.color_change"""
+    return adjust_batch(colors, Adjustment.color_change(value, operation, mode), depth, output)
+
+
+def darker_color_batch(colors, depth: int = 8, level: float = 5, mode: str = "hsv",
+                       output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of additionals.darker_color"""
+    return adjust_batch(colors, Adjustment.darker(level, mode), depth, output)
+
+
+def brighter_color_batch(colors, depth: int = 8, level: float = 5, mode: str = "hsv",
+                         output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of additionals.brighter_color"""
+    return adjust_batch(colors, Adjustment.brighter(level, mode), depth, output)
+
+
+def half_color_batch(colors, depth: int = 8, operation: str = "darken", output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Array version of color_utils.half_color"""
+    return adjust_batch(colors, Adjustment.half(operation), depth, output)
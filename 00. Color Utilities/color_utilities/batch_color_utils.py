@@ -0,0 +1,294 @@
+"""This module contains array versions of the color scheme functions in color_utils.
+Every function takes N base colors and returns an (N, k, 3) block of new colors (or (N, k) for hex output),
+doing all hue rotations in a single vectorized HSL/HSV pass.
+It also contains the WCAG contrast ratios of every pair of colors in a palette.
+"""
+# pylint: disable=invalid-name, protected-access
+from enum import Enum
+
+import numpy as np
+
+from . import batch_converters as bc
+from . import batch_transfer_functions as btf
+from .additionals import REC709_LUMA_WEIGHTS as LUMINANCE_WEIGHTS
+from .constants import Out1
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The minimum contrast ratios of the WCAG 2.x success criteria (large text is 18pt or 14pt bold)
+WCAG_LEVELS = {"AA": 4.5, "AA_large": 3.0, "AAA": 7.0, "AAA_large": 4.5}
+
+
+def _base_hsw(colors, depth: int, mode: str = "hsl") -> np.ndarray:
+    """### Returns the half-normalized HSL or HSV values of an array of base colors with shape (N, 3)"""
+    mode = mode.strip().lower()
+    if mode not in ("hsl", "hsv"):
+        raise ValueError('Mode can only be either "hsl" or "hsv"!')
+    to_hsw = bc.rgb_to_hsl_batch if mode == "hsl" else bc.rgb_to_hsv_batch
+    return to_hsw(colors, depth=depth).reshape(-1, 3)
+
+
+def _rotate(colors, depth: int, angles: tuple | list, output: Enum) -> np.ndarray:
+    """### Rotates the hue of every base color by every angle and returns the (N, len(angles), 3) block"""
+    HSL = _base_hsw(colors, depth)[:, None, :].repeat(len(angles), axis=1)
+    HSL[..., 0] += np.asarray(angles, dtype=np.float64)
+    return bc.hsl_to_rgb_batch(HSL, depth=depth, output=output)
+
+
+def _random_values(rng: np.random.Generator, shape: tuple, low: int, high: int, thres: int) -> np.ndarray:
+    """### Returns unique random values (per row) in range(low, high) with a chance for values under thres to be raised.
+    Same distribution as the random.sample based values in color_utils.monochrome_scheme"""
+    values = rng.random((shape[0], high - low)).argsort(axis=1)[:, :shape[1]] + low
+    change = (values < thres) & (rng.integers(0, 11, shape) > 3)
+    return np.where(change, rng.integers(thres, 101, shape), values)
+
+
+def complementary_color_batch(colors, depth: int = 8, output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Create the complementary colors of an array of colors
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, 1, 3) block of colors
+    """
+    return _rotate(colors, depth, (180,), output)
+
+
+def triadic_scheme_batch(
+    colors,
+    depth: int = 8,
+    angle: int = 120,
+    complementary: bool = True,
+    output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Return two colors forming a triad or a split complementary with each input color.
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `angle` (int, optional): If no angle is specified, 120 degree angle will be used which will generate the
+            triadic scheme. If angle != 120, 2 new colors will be generated equally distanced from the input color.
+        `complementary` (bool, optional): If True, the new colors will be split complementary (on the opposite
+            side of the color wheel) of the input color. Otherwise, the new colors will be analogous. Defaults to True.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, 2, 3) block of colors
+    """
+    angle = min(angle, 120)
+    offset = 0
+    if complementary:
+        angle /= 2
+        offset = 180
+    return _rotate(colors, depth, (offset - angle, offset + angle), output)
+
+
+def tetradic_scheme_batch(colors, depth: int = 8, angle: int = 30, output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Return three colors froming a tetrad with each input color.
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `angle` (int, optional): The angle to subtract from the adjacent colors hues [-90...90].
+            You can use an angle of zero to generate a square tetrad.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, 3, 3) block of colors
+    """
+    return _rotate(colors, depth, (90 - angle, 180, 270 - angle), output)
+
+
+def monochrome_scheme_batch(
+    colors,
+    depth: int = 8,
+    new_colors: int = 4,
+    seed: int = None,
+    mode: str = "hsl",
+    output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Return new_colors colors in the same hue with varying saturation/lightness for each input color.
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `new_colors` (int, optional): How many new colors to be generated. Defaults to 4.
+        `seed` (int, optional): Use if you want to get the same colors every time. Defaults to None (different).
+        `mode` (str, optional): Either "hsl" or "hsv" method for calculating. Defaults to "hsl".
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, new_colors, 3) block of colors
+    """
+    HSW = _base_hsw(colors, depth, mode)
+    rng = np.random.default_rng(seed)
+    shape = (len(HSW), new_colors)
+
+    res = np.empty((*shape, 3))
+    res[..., 0] = HSW[:, None, 0]
+    res[..., 1] = _random_values(rng, shape, 5, 100, 30) / 100
+    res[..., 2] = _random_values(rng, shape, 5, 100, 15) / 100
+
+    to_rgb = bc.hsl_to_rgb_batch if mode.strip().lower() == "hsl" else bc.hsv_to_rgb_batch
+    return to_rgb(res, depth=depth, output=output)
+
+
+def monochrome_scheme_alt_batch(colors, depth: int = 8, output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Return 4 colors with the same Hue and varying Saturation and Lightness for each input color.
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, 4, 3) block of colors
+    """
+    def wrap(x: np.ndarray, _min: float, thres: float, plus: float) -> np.ndarray:
+        """Same as the wrap function in color_utils.monochrome_scheme_alt for arrays"""
+        return np.where(x - _min < thres, x + plus, x - _min)
+
+    H, S, L = _base_hsw(colors, depth).T
+    s1 = wrap(S, 0.3, 0.1, 0.3)
+    res = np.stack((
+        np.stack((H, s1, wrap(L, 0.5, 0.2, 0.3)), axis=-1),
+        np.stack((H, S, wrap(L, 0.2, 0.2, 0.6)), axis=-1),
+        np.stack((H, s1, np.maximum(0.2, L + (1 - L) * 0.2)), axis=-1),
+        np.stack((H, S, wrap(L, 0.5, 0.2, 0.3)), axis=-1)), axis=1)
+    return bc.hsl_to_rgb_batch(res, depth=depth, output=output)
+
+
+def analogous_scheme_batch(
+    colors,
+    depth: int = 8,
+    output_colors: int = 3,
+    seed: int = None,
+    min_max: tuple = (5, 100, 5, 100),
+    mode: str = "hsl",
+    output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Return output_colors analogous colors (including the input one in the middle) for each input color.
+
+    ### Args:
+        `colors` (array_like): N base colors. R, G, B triples with shape (N, 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `output_colors` (int, optional): How many colors to be expected (including the input one). Defaults to 3.
+        `seed` (int, optional): Use if you want to get the same colors every time. Defaults to None (different).
+        `min_max` (tuple | list, optional): The minimum and maximum values for lightness and saturation respectively.
+        `mode` (str, optional): Either "hsl" or "hsv" method for calculating. Defaults to "hsl".
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+
+    ### Returns:
+        numpy.ndarray: An (N, output_colors, 3) block of colors
+    """
+    HSW = _base_hsw(colors, depth, mode)
+    rng = np.random.default_rng(seed)
+    shape = (len(HSW), output_colors - 1)
+
+    # The number of colors to generate for each hue. Same split as color_utils.analogous_scheme
+    hue_colors = output_colors // 3 - 1 if output_colors % 3 == 0 else output_colors // 3
+    hue1_colors = output_colors // 3 + 1 if output_colors % 3 == 2 else output_colors // 3
+    hue2_colors = output_colors // 3
+    offsets = np.array([30] * hue1_colors + [0] * hue_colors + [-30] * hue2_colors)
+    # The values are assigned in the order H, H1, H2 while the colors are ordered H1, H, H2
+    order = np.r_[hue_colors:hue_colors + hue1_colors, 0:hue_colors, hue_colors + hue1_colors:shape[1]]
+
+    res = np.empty((*shape, 3))
+    res[..., 0] = HSW[:, None, 0] + offsets
+    res[..., 1] = _random_values(rng, shape, min_max[2], min_max[3], 30)[:, order] / 100
+    res[..., 2] = _random_values(rng, shape, min_max[0], min_max[1], 15)[:, order] / 100
+
+    to_rgb = bc.hsl_to_rgb_batch if mode.strip().lower() == "hsl" else bc.hsv_to_rgb_batch
+    res = np.insert(to_rgb(res, depth=depth), shape[1] // 2, bc._colors_array(colors, depth).reshape(-1, 3), axis=1)
+    return bc.return_rgb_batch(res, output, depth, inplace=True)
+
+
+def relative_luminance_batch(colors, depth: int = 8) -> np.ndarray:
+    """### Returns the relative luminance (0-1) of an array of sRGB colors. Same as method 11 of get_color_brightness
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+
+    ### Returns:
+        numpy.ndarray: Luminance values with the shape of the input without the last axis
+    """
+    return btf.srgb(bc._colors_array(colors, depth), decode=True) @ np.array(LUMINANCE_WEIGHTS)
+
+
+def _contrast_blocks(Y: np.ndarray, Y_bg: np.ndarray, chunk: int | None, reuse: bool = False):
+    """### Yields the first row index and the contrast ratios (L1 + 0.05) / (L2 + 0.05) of blocks of rows
+
+    #### N/B: With `reuse` every block is written to the same buffers, so it's only valid until the next one.
+    """
+    if chunk is None:
+        # Blocks of about 256k ratios stay in the cache
+        chunk = max(1, 2 ** 18 // max(len(Y_bg), 1))
+    if chunk < 1:
+        raise ValueError("Chunk must be a positive integer!")
+    Y, Y_bg = Y + 0.05, Y_bg + 0.05
+    light = dark = None
+    for start in range(0, len(Y), chunk):
+        rows = Y[start:start + chunk, None]
+        if light is None or not reuse:
+            light, dark = np.empty((len(rows), len(Y_bg))), np.empty((len(rows), len(Y_bg)))
+        block = light[:len(rows)]
+        np.maximum(rows, Y_bg, out=block)
+        np.divide(block, np.minimum(rows, Y_bg, out=dark[:len(rows)]), out=block)
+        yield start, block
+
+
+def _luminances(colors, backgrounds, depth: int) -> tuple[np.ndarray, np.ndarray]:
+    """### Returns the flat luminances of the foreground and the background colors"""
+    Y = relative_luminance_batch(colors, depth).reshape(-1)
+    return Y, Y if backgrounds is None else relative_luminance_batch(backgrounds, depth).reshape(-1)
+
+
+def iter_contrast_matrix(colors, backgrounds=None, depth: int = 8, chunk: int | None = None):
+    """### Yields the contrast matrix in blocks of rows so audits of huge palettes never hold all of it
+
+    ### Args:
+        `colors` (array_like): N foreground colors. R, G, B triples with shape (N, 3) or hex strings
+        `backgrounds` (array_like, optional): M background colors. Defaults to None (the colors themselves).
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `chunk` (int, optional): How many rows are in a block. Defaults to None (about 256k ratios per block).
+
+    ### Yields:
+        tuple[int, numpy.ndarray]: The index of the first row and a (rows, M) block of contrast ratios
+    """
+    yield from _contrast_blocks(*_luminances(colors, backgrounds, depth), chunk)
+
+
+def contrast_matrix(
+    colors,
+    backgrounds=None,
+    depth: int = 8,
+    chunk: int | None = None,
+    dtype: type = np.float32) -> tuple[np.ndarray, dict]:
+    """### Calculates the WCAG contrast ratio of every foreground/background pair and which levels they pass
+
+    ### Args:
+        `colors` (array_like): N foreground colors. R, G, B triples with shape (N, 3) or hex strings
+        `backgrounds` (array_like, optional): M background colors. Defaults to None (every pair of the colors).
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+        `chunk` (int, optional): How many rows are calculated at once. Defaults to None (about 256k ratios).
+        `dtype` (type, optional): The float type of the returned ratios. Defaults to numpy.float32 (half the
+                                    memory). The masks are always compared in float64.
+
+    #### N/B: The ratios of 20000 colors take 1.6 GB (float32) and every mask 400 MB. \
+        Use `iter_contrast_matrix` to process bigger palettes block by block.
+
+    ### Returns:
+        tuple[numpy.ndarray, dict]: The (N, M) contrast ratios (1-21) and an (N, M) boolean mask for every \
+            level in WCAG_LEVELS ("AA", "AA_large", "AAA", "AAA_large")
+    """
+    Y, Y_bg = _luminances(colors, backgrounds, depth)
+    ratios = np.empty((len(Y), len(Y_bg)), dtype=dtype)
+    masks = {level: np.empty(ratios.shape, dtype=bool) for level in WCAG_LEVELS}
+    for start, block in _contrast_blocks(Y, Y_bg, chunk, reuse=True):
+        rows = slice(start, start + len(block))
+        ratios[rows] = block
+        for level, threshold in WCAG_LEVELS.items():
+            np.greater_equal(block, threshold, out=masks[level][rows])
+    return ratios, masks
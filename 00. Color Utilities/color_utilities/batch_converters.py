@@ -0,0 +1,472 @@
+"""This module contains converters that work on whole arrays of colors at once using numpy.
+They are meant for large amounts of colors (images, palettes, LUTs) where calling the scalar converters
+for every single color would be too slow.
+"""
+# pylint: disable=invalid-name
+from enum import Enum
+
+import numpy as np
+
+from . import batch_transfer_functions as btf
+from . import xyz
+from .buffers import Workspace, _buffer_view, _output
+from .constants import Out1, Out2, Out3
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+
+def _colors_array(colors, depth: int, workspace: Workspace = None) -> np.ndarray:
+    """### Returns an array of normalized R, G, B values with shape (..., 3)
+
+    ### Args:
+        `colors` (array_like): R, G, B triples, hex strings or a buffer (viewed without copying). Integers are
+                                treated as values in the range of the given bit depth, floats as normalized values.
+        `depth` (int): The bit depth of integer input values
+        `workspace` (Workspace, optional): Normalize integer values into its "normalized" array. Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: A floating point array of normalized values
+    """
+    colors = np.asarray(_buffer_view(colors))
+    if colors.dtype.kind == "U":
+        # Hex strings. Every channel has the same number of characters as the max value for the bit depth
+        ch_length = len(hex(2 ** depth - 1)) - 2
+        hexed = np.char.lstrip(colors, "#")
+        if np.any(np.char.str_len(hexed) != ch_length * 3):
+            raise ValueError(f"Hex colors for {depth}-bit depth must have {ch_length * 3} characters!")
+        codes = np.array([[int(i[j:j + ch_length], 16) for j in range(0, ch_length * 3, ch_length)]
+                          for i in hexed.ravel().tolist()], dtype=np.int64)
+        colors = codes.reshape(*hexed.shape, 3)
+    if colors.ndim == 0 or colors.shape[-1] != 3:
+        raise ValueError("Colors must be an array of R, G, B triples with shape (..., 3)!")
+    if colors.dtype.kind in "iub":
+        if workspace is None:
+            return colors / (2 ** depth - 1)
+        return np.divide(colors, 2 ** depth - 1, out=workspace.array("normalized", colors.shape))
+    if colors.dtype.kind != "f":
+        raise TypeError("Colors must be an array of integer or float values!")
+    return colors
+
+
+#= Lowercase hex digits indexed by their value
+_HEX_DIGITS = np.array(list("0123456789abcdef"))
+
+
+def _hex_strings(codes: np.ndarray, depth: int, pound: bool) -> np.ndarray:
+    """### Returns an array of hex strings from integer R, G, B codes with shape (..., 3) in a single pass"""
+    # Every channel has the same number of characters as the max value for the bit depth
+    width = len(hex(2 ** depth - 1)) - 2
+    shifts = np.arange(width - 1, -1, -1) * 4
+    digits = _HEX_DIGITS[(codes[..., None] >> shifts) & 15].reshape(*codes.shape[:-1], 3 * width)
+    if pound:
+        digits = np.concatenate((np.full((*codes.shape[:-1], 1), "#"), digits), axis=-1)
+    # Consecutive single characters in memory are the same as one string of all of them
+    return np.ascontiguousarray(digits).view(f"<U{digits.shape[-1]}")[..., 0]
+
+
+def _codes(RGB: np.ndarray, max_value: int) -> np.ndarray:
+    """### Clamps, scales and rounds normalized values in place and returns them as integers"""
+    np.clip(RGB, 0, 1, out=RGB)
+    RGB *= max_value
+    return np.rint(RGB, out=RGB).astype(np.int64)
+
+
+def _float_array(values, inplace: bool) -> np.ndarray:
+    """### Returns the values as a float array. The input array itself is returned only if it can be modified"""
+    values = np.asarray(_buffer_view(values))
+    if values.dtype.kind != "f":
+        return values.astype(np.float64)
+    return values if inplace and values.flags.writeable else values.copy()
+
+
+def rgb_to_hex_batch(colors, depth: int = 8, pound: bool = True) -> np.ndarray:
+    """### Converts an array of RGB colors to hex strings
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3). Integers are treated as values in the range of
+                                the given bit depth, floats are treated as normalized values.
+        `depth` (int, optional): The bit depth of the colors. Defaults to 8.
+        `pound` (bool, optional): Whether to prefix the strings with a pound sign "#". Defaults to True.
+
+    ### Returns:
+        numpy.ndarray: Hex strings with the shape of the input without the last axis
+    """
+    colors = np.asarray(_buffer_view(colors))
+    if colors.dtype.kind in "iu" and colors.ndim and colors.shape[-1] == 3:
+        max_value = 2 ** depth - 1
+        if np.any(colors < 0) or np.any(colors > max_value):
+            raise ValueError(f"Elements of {depth}-bit color can't be negative or have values higher than {max_value}")
+        return _hex_strings(colors.astype(np.int64), depth, pound)
+    return _hex_strings(_codes(_float_array(_colors_array(colors, depth), False), 2 ** depth - 1), depth, pound)
+
+
+def return_rgb_batch(
+    RGB,
+    output: Enum = Out1.NORMALIZED,
+    depth: int = 8,
+    clamp: bool = False,
+    inplace: bool = False) -> np.ndarray:
+    """### Returns an array of normalized R, G, B values in the desired output type. Same as ih.return_rgb for arrays
+
+    ### Args:
+        `RGB` (array_like): Normalized R, G, B values with shape (..., 3)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+        `depth` (int, optional): The bit depth of round, direct and hex output. Defaults to 8.
+        `clamp` (bool, optional): Clamp normalized and direct output in range. Round and hex output
+                                    is always clamped. Defaults to False.
+        `inplace` (bool, optional): Clamp and scale a writable float input array in place instead of
+                                    a copy. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: The values with the shape of the input (without the last axis for hex output)
+    """
+    max_value = 2 ** depth - 1
+    match output:
+        case Out1.HEX | Out1.HEXP:
+            return _hex_strings(_codes(_float_array(RGB, inplace), max_value), depth, output == Out1.HEXP)
+        case Out1.ROUND:
+            return _codes(_float_array(RGB, inplace), max_value)
+        case Out1.NORMALIZED:
+            return np.clip(RGB, 0, 1, out=_float_array(RGB, inplace)) if clamp else np.asarray(RGB)
+        case _:
+            RGB = _float_array(RGB, inplace)
+            if clamp:
+                np.clip(RGB, 0, 1, out=RGB)
+            RGB *= max_value
+            return RGB
+
+
+def return_hsw_batch(HSW, output: Enum = Out2.HALF_NORMALIZED, inplace: bool = False) -> np.ndarray:
+    """### Returns an array of H, S, W values (H in degrees, S and W in range 0-1) in the desired output type. \
+        Same as ih.return_hsw for arrays
+
+    ### Args:
+        `HSW` (array_like): Hue, Saturation, Wildcard (Either Value, Lightness or Intensity) with shape (..., 3)
+        `output` (Enum, optional): Out2 enum options available. Defaults to Out2.HALF_NORMALIZED.
+        `inplace` (bool, optional): Wrap, clamp and scale a writable float input array in place instead of
+                                    a copy. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: The values with the shape of the input
+    """
+    HSW = _float_array(HSW, inplace)
+    H, SW = HSW[..., 0], HSW[..., 1:]
+    np.remainder(H, 360, out=H)
+    np.clip(SW, 0, 1, out=SW)
+    match output:
+        case Out2.ROUND:
+            SW *= 100
+            np.rint(HSW, out=HSW)
+            np.minimum(H, 359, out=H)
+            return HSW.astype(np.int64)
+        case Out2.NORMALIZED:
+            H /= 360
+        case Out2.HALF_NORMALIZED:
+            pass
+        case Out2.DIRECT:
+            SW *= 100
+        case _:
+            raise ValueError("Wrong output type!")
+    return HSW
+
+
+def return_scale_batch(
+    vals,
+    output: Enum = Out3.DIRECT,
+    min_max: tuple | list = (0, 100),
+    clamp: bool = False,
+    normalized_input: bool = False,
+    inplace: bool = False) -> np.ndarray:
+    """### Returns an array of values in the desired output type. Same as ih.return_scale for arrays
+
+    ### Args:
+        `vals` (array_like): The values to be returned as the requested type
+        `output` (Enum, optional): Out3 enum options available. Defaults to Out3.DIRECT.
+        `min_max` (tuple | list, optional): The minimum and maximum allowed values before clamping.
+                                            Defaults to (0, 100).
+        `clamp` (bool, optional): Clamps the values in the specified in `min_max` range. Defaults to False.
+        `normalized_input` (bool, optional): Whether the input values are in range 0-1 or the default range 0-100
+        `inplace` (bool, optional): Scale a writable float input array in place instead of a copy. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: The values with the shape of the input
+    """
+    vals = _float_array(vals, inplace)
+    low, high = min_max if clamp else (None, None)
+
+    match output:
+        case Out3.ROUND:
+            if normalized_input:
+                vals *= min_max[1]
+            np.rint(vals, out=vals)
+            return (np.clip(vals, low, high, out=vals) if clamp else vals).astype(np.int64)
+        case Out3.NORMALIZED:
+            if clamp:
+                low, high = (0.0, 1.0) if 0 in min_max else (-1.0, 1.0)
+            if not normalized_input:
+                vals /= min_max[1]
+        case Out3.DIRECT | _:
+            if normalized_input:
+                vals *= min_max[1]
+    return np.clip(vals, low, high, out=vals) if clamp else vals
+
+
+#= The channel offsets of the HSV and HSL to RGB formulas
+_HSV_OFFSETS = np.array((5, 3, 1))
+_HSL_OFFSETS = np.array((0, 8, 4))
+
+#= The output types `out` can be used with
+_FLOAT_OUTPUTS = (Out1.NORMALIZED, Out1.DIRECT, Out2.HALF_NORMALIZED, Out2.NORMALIZED, Out2.DIRECT)
+
+
+def _check_out(out: np.ndarray | None, output: Enum):
+    """### Raises an error if `out` is used with an output type that isn't a float array"""
+    if out is not None and output not in _FLOAT_OUTPUTS:
+        raise ValueError("Out can only be used with normalized, half normalized or direct output!")
+
+
+def _hue_chroma(RGB: np.ndarray, ws: Workspace) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """### Returns the hue (in degrees), max, min and delta (chroma) of normalized R, G, B arrays as scratch arrays
+    of the workspace"""
+    shape, dtype = RGB.shape[:-1], RGB.dtype
+    R, G, B = RGB[..., 0], RGB[..., 1], RGB[..., 2]
+    Cmax = np.max(RGB, axis=-1, out=ws.array("max", shape, dtype))
+    Cmin = np.min(RGB, axis=-1, out=ws.array("min", shape, dtype))
+    delta = np.subtract(Cmax, Cmin, out=ws.array("delta", shape, dtype))
+    gray = np.equal(delta, 0, out=ws.array("gray", shape, np.bool_))
+    safe = ws.array("safe delta", shape, dtype)
+    np.copyto(safe, delta)
+    np.copyto(safe, 1, where=gray)
+    # Blue, then green and red on top of it where they are the max
+    H, branch = ws.array("hue", shape, dtype), ws.array("hue branch", shape, dtype)
+    mask = ws.array("hue mask", shape, np.bool_)
+    np.subtract(R, G, out=H)
+    H /= safe
+    H += 4
+    np.subtract(B, R, out=branch)
+    branch /= safe
+    branch += 2
+    np.copyto(H, branch, where=np.equal(G, Cmax, out=mask))
+    np.subtract(G, B, out=branch)
+    branch /= safe
+    np.remainder(branch, 6, out=branch)
+    np.copyto(H, branch, where=np.equal(R, Cmax, out=mask))
+    H *= 60
+    np.copyto(H, 0, where=gray)
+    return H, Cmax, Cmin, delta
+
+
+def rgb_to_hsl_batch(
+    colors,
+    depth: int = 8,
+    output: Enum = Out2.HALF_NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of RGB colors and returns their HSL (Hue, Saturation, Lightness) representation
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `depth` (int, optional): The bit depth of integer input values. Defaults to 8.
+        `output` (Enum, optional): Out2 enum options available. Defaults to Out2.HALF_NORMALIZED.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for float outputs. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays reused between calls. Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: H, S, L values with the same shape as the input
+    """
+    _check_out(out, output)
+    ws = Workspace() if workspace is None else workspace
+    RGB = _colors_array(colors, depth, ws)
+    H, Cmax, Cmin, delta = _hue_chroma(RGB, ws)
+    HSL = _output(out, RGB.shape, RGB.dtype)
+    L, S = HSL[..., 2], HSL[..., 1]
+    np.add(Cmax, Cmin, out=L)
+    L /= 2
+    # delta / max(1 - |2L - 1|, 1e-12) with the denominator built in the spare max array
+    np.multiply(L, 2, out=Cmax)
+    Cmax -= 1
+    np.abs(Cmax, out=Cmax)
+    np.subtract(1, Cmax, out=Cmax)
+    np.maximum(Cmax, 1e-12, out=Cmax)
+    np.divide(delta, Cmax, out=S)
+    HSL[..., 0] = H
+    return return_hsw_batch(HSL, output, inplace=True)
+
+
+def hsl_to_rgb_batch(
+    HSL,
+    depth: int = 8,
+    output: Enum = Out1.NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of HSL colors and returns their RGB representation
+
+    ### Args:
+        `HSL` (array_like): H, S, L values with shape (..., 3). H in degrees 0-360, S and L in range 0-1
+        `depth` (int, optional): The bit depth of the output values. Defaults to 8.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for float outputs. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays reused between calls. Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with the same shape as the input (without the last axis for hex output)
+    """
+    _check_out(out, output)
+    ws = Workspace() if workspace is None else workspace
+    HSL = np.asarray(_buffer_view(HSL), dtype=np.float64)
+    S, L = HSL[..., 1:2], HSL[..., 2:3]
+    # k = (offsets + H / 30) % 12
+    H = np.remainder(HSL[..., 0:1], 360, out=ws.array("hue column", (*HSL.shape[:-1], 1)))
+    H /= 30
+    k = np.add(_HSL_OFFSETS, H, out=ws.array("k", HSL.shape))
+    np.remainder(k, 12, out=k)
+    # clip(min(k - 3, 9 - k), -1, 1)
+    branch = np.subtract(9, k, out=ws.array("k branch", HSL.shape))
+    k -= 3
+    np.minimum(k, branch, out=k)
+    np.clip(k, -1, 1, out=k)
+    # L - S * min(L, 1 - L) * k with the product built in the spare hue array
+    np.subtract(1, L, out=H)
+    np.minimum(L, H, out=H)
+    H *= S
+    k *= H
+    RGB = np.subtract(L, k, out=_output(out, HSL.shape))
+    return return_rgb_batch(RGB, output, depth, inplace=True)
+
+
+def rgb_to_hsv_batch(
+    colors,
+    depth: int = 8,
+    output: Enum = Out2.HALF_NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of RGB colors and returns their HSV (Hue, Saturation, Value) representation
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `depth` (int, optional): The bit depth of integer input values. Defaults to 8.
+        `output` (Enum, optional): Out2 enum options available. Defaults to Out2.HALF_NORMALIZED.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for float outputs. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays reused between calls. Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: H, S, V values with the same shape as the input
+    """
+    _check_out(out, output)
+    ws = Workspace() if workspace is None else workspace
+    RGB = _colors_array(colors, depth, ws)
+    H, Cmax, Cmin, delta = _hue_chroma(RGB, ws)
+    HSV = _output(out, RGB.shape, RGB.dtype)
+    # delta / max with black (max 0) as 0. The spare min array holds the divisor
+    black = np.equal(Cmax, 0, out=ws.array("gray", Cmax.shape, np.bool_))
+    np.copyto(Cmin, Cmax)
+    np.copyto(Cmin, 1, where=black)
+    S = np.divide(delta, Cmin, out=HSV[..., 1])
+    np.copyto(S, 0, where=black)
+    HSV[..., 0] = H
+    HSV[..., 2] = Cmax
+    return return_hsw_batch(HSV, output, inplace=True)
+
+
+def hsv_to_rgb_batch(
+    HSV,
+    depth: int = 8,
+    output: Enum = Out1.NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of HSV colors and returns their RGB representation
+
+    ### Args:
+        `HSV` (array_like): H, S, V values with shape (..., 3). H in degrees 0-360, S and V in range 0-1
+        `depth` (int, optional): The bit depth of the output values. Defaults to 8.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for float outputs. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays reused between calls. Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with the same shape as the input (without the last axis for hex output)
+    """
+    _check_out(out, output)
+    ws = Workspace() if workspace is None else workspace
+    HSV = np.asarray(_buffer_view(HSV), dtype=np.float64)
+    S, V = HSV[..., 1:2], HSV[..., 2:3]
+    # k = (offsets + H / 60) % 6
+    H = np.remainder(HSV[..., 0:1], 360, out=ws.array("hue column", (*HSV.shape[:-1], 1)))
+    H /= 60
+    k = np.add(_HSV_OFFSETS, H, out=ws.array("k", HSV.shape))
+    np.remainder(k, 6, out=k)
+    # V - V * S * clip(min(k, 4 - k), 0, 1) with the product built in the spare hue array
+    branch = np.subtract(4, k, out=ws.array("k branch", HSV.shape))
+    np.minimum(k, branch, out=k)
+    np.clip(k, 0, 1, out=k)
+    np.multiply(V, S, out=H)
+    k *= H
+    RGB = np.subtract(V, k, out=_output(out, HSV.shape))
+    return return_rgb_batch(RGB, output, depth, inplace=True)
+
+
+def convert_rgb(
+    colors,
+    src: str = "SRGB",
+    dst: str = "SRGB",
+    depth: int = 8,
+    observer: str = "2",
+    adaptation: str = "bradford",
+    clamp: bool = False,
+    output: Enum = Out1.NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts R, G, B colors directly from one RGB color space to another
+    Instead of going through `rgb_to_xyz_alt` and `xyz_to_rgb` for every color, the colors are decoded,
+    multiplied by a single cached 3x3 matrix (src RGB -> XYZ -> chromatic adaptation -> dst RGB) and encoded
+    again in one vectorized pass.
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings. Integers are treated as values in
+                            range 0-(max value for bit depth), floats are treated as normalized values in range 0-1
+        `src` (str, optional): The color space of the input colors. Defaults to "SRGB".
+        `dst` (str, optional): The color space of the output colors. Defaults to "SRGB".
+        `depth` (int, optional): The bit depth of integer input and non-normalized output. Defaults to 8.
+        `observer` (str, optional): The observer angle of the illuminants. Defaults to "2".
+        `adaptation` (str, optional): The adaptation method used if the whitepoints differ. Defaults to "bradford".
+        `clamp` (bool, optional): Clamp the linear values in range 0-1 before encoding. Defaults to False.
+        `output` (Enum, optional): Either Out1.HEX, Out1.HEXP, Out1.NORMALIZED, Out1.ROUND or Out1.DIRECT
+        *     hex returns an array of hex strings in the form of decade
+        *     hexp returns an array of hex strings in the form of #facade
+        *     normalized returns an array of floats in range 0-1
+        *     round returns an array of integers in range 0-(max value for bit depth)
+        *     direct returns an array of floats in range 0-(max value for bit depth)
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for normalized and direct output. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the normalized, linear and converted values reused
+                                    between calls. Defaults to None.
+        `kwargs`: Additional arguments passed to both transfer functions. Refer to the
+            batch_transfer_functions module to get the needed arguments for the specific color space
+
+    ### Example:
+        >>> convert_rgb(frame, "ARRI WIDE GAMUT 3", "REC. 2020", EI=800)
+
+    ### Returns:
+        numpy.ndarray: The converted colors with the same shape as the input (without the last axis for hex output)
+    """
+    _check_out(out, output)
+    src, dst = xyz.color_space_name(src), xyz.color_space_name(dst)
+    colors = _colors_array(colors, depth, workspace)
+    matrix = xyz.rgb_to_rgb_matrix(src, dst, observer, adaptation)
+
+    if workspace is None:
+        RGB = btf.get_transfer_function(src)(colors, decode=True, **kwargs) @ matrix.T
+    else:
+        linear = workspace.array("linear", colors.shape, colors.dtype)
+        btf.get_transfer_function(src)(colors, decode=True, out=linear, workspace=workspace, **kwargs)
+        RGB = np.matmul(linear, matrix.T, out=workspace.array("converted", colors.shape))
+    if clamp:
+        np.clip(RGB, 0, 1, out=RGB)
+    RGB = btf.get_transfer_function(dst)(RGB, out=out, workspace=workspace, **kwargs)
+    return return_rgb_batch(RGB, output, depth, inplace=True)
@@ -0,0 +1,1373 @@
+"""This module contains vectorized (numpy) versions of the transfer functions for various color spaces.
+Every function works on a whole array of normalized values (any shape) at once instead of a single R, G, B triple.
+
+Fast math (`with fast_math(): ...`) trades the last digits of precision for speed. Float64 values are converted in
+float32 blocks small enough to stay in the CPU cache, so every step runs at twice the SIMD width on cached data
+instead of streaming whole frames through memory. Unlike a LUT it works for values of any range (scene linear
+values far above 1.0 included). The max error is FAST_MATH_MAX_ERROR code values at 10 and 12-bit.
+
+Example:
+    >>> with fast_math():
+    ...     frame = convert_rgb(frame, "ARRI WIDE GAMUT 3", "REC. 2020", EI=800)
+"""
+# pylint: disable=invalid-name, unused-argument
+import threading
+from collections.abc import Callable
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from math import e, log
+
+import numpy as np
+
+from . import transfer_functions as tf
+from . import alexa_transfer_function_helpers as atfh
+from .transfer_functions import HLG_CONSTANTS, PQ_CONSTANTS
+from .buffers import Workspace, _buffer_view, _output
+from .color_spaces import color_spaces as cs
+
+#! All functions expect and return normalized values (range 0-1 for display referred spaces).
+#! Branches are evaluated with clipped arguments so numpy never warns about invalid values in the unused branch.
+#! Unlike some of their scalar counterparts in transfer_functions.py, `decode=True` always means code values to linear.
+#! The curves are written as chains of in-place elementwise steps. With `out` and a reused `workspace` they don't
+#! allocate any arrays.
+
+#= The default number of values converted at once by fast math
+FAST_MATH_BLOCK = 1 << 16
+
+#= The LUT paths of the HDR curves (`lut=True`) are indexed with the bits of float32 values: the exponent and the top
+#= LUT_MANTISSA_BITS of the mantissa, so every stop in LUT_STOPS gets 2 ** LUT_MANTISSA_BITS entries. Values below the
+#= range get the first entry and values above it the last one. The lookup runs in blocks of LUT_BLOCK values
+LUT_STOPS = (-40, 0)
+LUT_MANTISSA_BITS = 10
+LUT_BLOCK = 1 << 15
+
+#= The max error of fast math in code values by bit depth. For encoding it's the error of the values in the code
+#= value range (values above it are within a relative error of FAST_MATH_MAX_RELATIVE_ERROR). For decoding it's the
+#= error in steps between neighboring code values on top of the 1e-9 resolution of float32 values near black.
+#= Validated over every code value and linear values up to 2 ** 16 of every curve
+FAST_MATH_MAX_ERROR = {10: 0.003, 12: 0.01}
+FAST_MATH_MAX_RELATIVE_ERROR = 1e-6
+
+
+class _FastMath(threading.local):
+    """### Whether fast math is enabled in the current thread and its block size"""
+
+    def __init__(self):
+        self.enabled = False
+        self.block = FAST_MATH_BLOCK
+
+
+_fast = _FastMath()
+
+
+def _array(values) -> np.ndarray:
+    """### Returns the input as a floating point numpy array without copying it when possible"""
+    values = np.asarray(_buffer_view(values, None))
+    return values if values.dtype.kind == "f" else values.astype(np.float64)
+
+
+def _scratch(workspace: Workspace | None, name: str, shape: tuple, dtype) -> np.ndarray:
+    """### Returns a scratch array from the workspace or a new one without a workspace"""
+    return np.empty(shape, dtype=dtype) if workspace is None else workspace.array(name, shape, dtype)
+
+
+def _chain(values: np.ndarray, steps: tuple, out: np.ndarray) -> np.ndarray:
+    """### Applies elementwise steps to values writing every intermediate result into `out`
+
+    Every step is (ufunc, constant) for ufunc(value, constant), (ufunc, None) for ufunc(value) or
+    (ufunc, constant, True) for ufunc(constant, value), e.g. (np.power, 10, True) for 10 ** value.
+    """
+    for step in steps:
+        if step[1] is None:
+            step[0](values, out=out)
+        elif len(step) > 2:
+            step[0](step[1], values, out=out)
+        else:
+            step[0](values, step[1], out=out)
+        values = out
+    if values is not out:
+        np.copyto(out, values)
+    return out
+
+
+def _curve(
+    RGB,
+    out: np.ndarray | None,
+    workspace: Workspace | None,
+    steps: tuple,
+    select: tuple | None = None,
+    selected: tuple = (),
+    pre: tuple = (),
+    post: tuple = ()) -> np.ndarray:
+    """### Evaluates a curve written as elementwise steps. Same as np.where(select, selected, steps) in two passes
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `out` (numpy.ndarray | None): The array the result is written into or None for a new one
+        `workspace` (Workspace | None): Scratch arrays for the input of `pre`, the selection and its branch
+        `steps` (tuple): The steps of the values that aren't selected (of all values without a selection)
+        `select` (tuple | None, optional): (comparison ufunc, threshold) selecting the values of the other
+                                    branch. Defaults to None.
+        `selected` (tuple, optional): The steps of the selected values. Defaults to ().
+        `pre` (tuple, optional): The steps applied to all values before the branches. Defaults to ().
+        `post` (tuple, optional): The steps applied to all values after the branches. Defaults to ().
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if _fast.enabled and RGB.dtype == np.float64 and RGB.ndim:
+        return _fast_curve(RGB, out, workspace, (steps, select, selected, pre, post))
+    if pre:
+        RGB = _chain(RGB, pre, _scratch(workspace, "transfer input", RGB.shape, RGB.dtype))
+    res = _output(out, RGB.shape, RGB.dtype)
+    mask = None
+    if select is not None:
+        mask = select[0](RGB, select[1], out=_scratch(workspace, "transfer mask", RGB.shape, np.bool_))
+    return _branches(RGB, res, workspace, steps, mask, selected, post)
+
+
+def _branches(
+    RGB: np.ndarray,
+    res: np.ndarray,
+    workspace: Workspace | None,
+    steps: tuple,
+    mask: np.ndarray | None,
+    selected: tuple,
+    post: tuple) -> np.ndarray:
+    """### Evaluates the branches of a curve (the `_curve` arguments) into `res` given the mask of the selection"""
+    if mask is None:
+        return _chain(_chain(RGB, steps, res), post, res)
+    # The branch is computed before `res` is written, so `out` can be the input itself
+    branch = _chain(RGB, selected, _scratch(workspace, "transfer branch", RGB.shape, RGB.dtype))
+    _chain(RGB, steps, res)
+    np.copyto(res, branch, where=mask)
+    return _chain(res, post, res)
+
+
+def _block_steps(steps: tuple, shape: tuple, start: int, stop: int) -> tuple:
+    """### Returns the steps with the constants that are arrays of the values' shape (e.g. signs) cut to a block"""
+    return tuple((step[0], step[1][start:stop], *step[2:])
+                 if isinstance(step[1], np.ndarray) and step[1].shape == shape else step for step in steps)
+
+
+def _fast_curve(RGB: np.ndarray, out: np.ndarray | None, workspace: Workspace | None, curve: tuple) -> np.ndarray:
+    """### Evaluates a curve (the `_curve` arguments after the workspace) in float32 blocks of the leading axis.
+    The selection is made on the float64 values, so values at a threshold take the same branch as without fast math"""
+    steps, select, selected, pre, post = curve
+    ws = Workspace() if workspace is None else workspace
+    res = _output(out, RGB.shape, RGB.dtype)
+    rows = max(_fast.block // max(RGB[0].size, 1), 1)
+    for start in range(0, len(RGB), rows):
+        block = RGB[start:start + rows]
+        stop = start + len(block)
+        if pre:
+            block = _chain(block, _block_steps(pre, RGB.shape, start, stop), ws.array("transfer input", block.shape))
+        mask = None
+        if select is not None:
+            mask = select[0](block, select[1], out=ws.array("transfer mask", block.shape, np.bool_))
+        values = ws.array("fast input", block.shape, np.float32)
+        # Every block is read before its result is written, so `out` can be the input itself
+        np.copyto(values, block, casting="same_kind")
+        res[start:stop] = _branches(values, ws.array("fast output", block.shape, np.float32), ws,
+                                    _block_steps(steps, RGB.shape, start, stop), mask,
+                                    _block_steps(selected, RGB.shape, start, stop),
+                                    _block_steps(post, RGB.shape, start, stop))
+    return res
+
+
+def enable_fast_math(block: int = FAST_MATH_BLOCK):
+    """### Converts float64 values in float32 blocks in the current thread. See the module docstring
+
+    ### Args:
+        `block` (int, optional): About how many values are converted at once. Defaults to FAST_MATH_BLOCK.
+    """
+    if not isinstance(block, int) or block < 1:
+        raise ValueError("The block size must be a positive integer!")
+    _fast.enabled, _fast.block = True, block
+
+
+def disable_fast_math():
+    """### Goes back to converting the values with the exact (float64) path in the current thread"""
+    _fast.enabled = False
+
+
+def fast_math_enabled() -> bool:
+    """### Whether fast math is enabled in the current thread"""
+    return _fast.enabled
+
+
+@contextmanager
+def fast_math(block: int = FAST_MATH_BLOCK):
+    """### Enables fast math for the duration of a with block"""
+    state = _fast.enabled, _fast.block
+    enable_fast_math(block)
+    try:
+        yield
+    finally:
+        _fast.enabled, _fast.block = state
+
+
+def _sign(RGB: np.ndarray, workspace: Workspace | None, offset: float = 0) -> np.ndarray:
+    """### Returns the sign of the values plus an offset as a scratch array (used as the constant of a step)"""
+    res = np.add(RGB, offset, out=_scratch(workspace, "transfer sign", RGB.shape, RGB.dtype))
+    return np.sign(res, out=res)
+
+
+def _mask(RGB: np.ndarray, workspace: Workspace | None, select: tuple, invert: bool = False) -> np.ndarray:
+    """### Returns the values selected by (comparison ufunc, threshold) (or the ones that aren't with `invert`, NaN
+    included) as a scratch array. Computed before the result is written, so `out` can be the input itself"""
+    res = select[0](RGB, select[1], out=_scratch(workspace, "transfer limit", RGB.shape, np.bool_))
+    return np.logical_not(res, out=res) if invert else res
+
+
+def _log_lut_inputs(stops: tuple) -> tuple[np.ndarray, int]:
+    """### Returns the values at the entries of a LUT indexed by float32 bits over a range of stops (and one past the
+    end, for the slope of the last entry) and the index bits of the first entry"""
+    shift = 23 - LUT_MANTISSA_BITS
+    first, last = (int(np.array(2.0 ** i, dtype=np.float32).view(np.int32)) >> shift for i in stops)
+    return (np.arange(first, last + 2, dtype=np.int32) << shift).view(np.float32).astype(np.float64), first
+
+
+def _log_lut(values: np.ndarray, first: int, stops: tuple) -> tuple:
+    """### Returns a read only LUT of the curve values at `_log_lut_inputs`: the entries, the slopes to the next ones,
+    the index bits of the first entry and the range of the inputs"""
+    table, slopes = values[:-1].astype(np.float32), np.diff(values).astype(np.float32)
+    table.flags.writeable = slopes.flags.writeable = False
+    return table, slopes, first, (2.0 ** stops[0], 2.0 ** stops[1])
+
+
+def _apply_log_lut(RGB: np.ndarray, out: np.ndarray, lut: tuple) -> np.ndarray:
+    """### Looks up values in a LUT from `_log_lut` with linear interpolation between the entries. NaN stays NaN"""
+    table, slopes, first, (low, high) = lut
+    shift = 23 - LUT_MANTISSA_BITS
+    # Blocks small enough for the scratch arrays to stay in the cache between the steps
+    values, weight, entry = (np.empty(LUT_BLOCK, np.float32) for _ in range(3))
+    position, index = np.empty(LUT_BLOCK, np.int32), np.empty(LUT_BLOCK, np.intp)
+    nan = np.empty(LUT_BLOCK, bool)
+    res = out if out.flags.c_contiguous else np.empty(out.shape, out.dtype)
+    flat_values, flat_res = RGB.reshape(-1), res.reshape(-1)
+    for start in range(0, flat_values.size, LUT_BLOCK):
+        block = flat_values[start:start + LUT_BLOCK]
+        n = len(block)
+        # NaN isn't clipped and its bits point outside of the table. It gets a valid entry and is put back after
+        has_nan = np.isnan(block, out=nan[:n]).any()
+        bits = np.clip(block, low, high, out=values[:n], casting="same_kind").view(np.int32)
+        # The rest of the mantissa is the position between the entries (the value is linear in it within a stop)
+        np.bitwise_and(bits, (1 << shift) - 1, out=position[:n])
+        np.multiply(position[:n], 1 / (1 << shift), out=weight[:n], casting="unsafe")
+        np.right_shift(bits, shift, out=bits)
+        np.subtract(bits, first, out=index[:n], casting="unsafe")
+        weight[:n] *= np.take(slopes, index[:n], out=entry[:n], mode="clip")
+        weight[:n] += np.take(table, index[:n], out=entry[:n], mode="clip")
+        if has_nan:
+            weight[:n][nan[:n]] = np.nan
+        flat_res[start:start + n] = weight[:n]
+    if res is not out:
+        out[...] = res
+    return out
+
+
+def _take(table: np.ndarray, codes: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """### Looks up integer code values in a table. The indices are converted to intp in blocks, which numpy would
+    otherwise do for the whole array at once"""
+    table = table.astype(out.dtype, copy=False)
+    index = np.empty(LUT_BLOCK, np.intp)
+    res = out if out.flags.c_contiguous else np.empty(out.shape, out.dtype)
+    flat_codes, flat_res = codes.reshape(-1), res.reshape(-1)
+    for start in range(0, flat_codes.size, LUT_BLOCK):
+        block = flat_codes[start:start + LUT_BLOCK]
+        n = len(block)
+        index[:n] = block
+        np.take(table, index[:n], out=flat_res[start:start + n])
+    if res is not out:
+        out[...] = res
+    return out
+
+
+@lru_cache(maxsize=16)
+def _code_table(func: Callable, decode: bool, depth: int) -> np.ndarray:
+    """### Returns the result of a curve for every code value of a bit depth"""
+    res = func(np.arange(2 ** depth) / (2 ** depth - 1), decode=decode)
+    res.flags.writeable = False
+    return res
+
+
+@lru_cache(maxsize=16)
+def _float_lut(func: Callable, decode: bool) -> tuple:
+    """### Returns the LUT of a curve over LUT_STOPS"""
+    values, first = _log_lut_inputs(LUT_STOPS)
+    return _log_lut(func(values, decode=decode), first, LUT_STOPS)
+
+
+def _lookup(func: Callable, RGB, decode: bool, depth: int, lut: bool, out: np.ndarray | None) -> np.ndarray | None:
+    """### Converts integer code values with a table of every code value and float values with a LUT if `lut` is
+    set. Returns None if the values are evaluated with the curve"""
+    values = np.asarray(_buffer_view(RGB, None))
+    if values.dtype.kind in "iu":
+        if depth not in range(1, 17):
+            raise ValueError("Depth must be an integer in range 1-16!")
+        if values.size and (values.min() < 0 or values.max() >= 2 ** depth):
+            raise ValueError(f"Code values must be in range 0-{2 ** depth - 1} for {depth}-bit depth!")
+        return _take(_code_table(func, decode, depth), values, _output(out, values.shape))
+    if not lut:
+        return None
+    values = _array(values)
+    return _apply_log_lut(values, _output(out, values.shape, values.dtype), _float_lut(func, decode))
+
+
+def linear(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### The identity transfer function used by scene linear color spaces
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The same values as a floating point array
+    """
+    RGB = _array(RGB)
+    return RGB if out is None else _chain(RGB, (), _output(out, RGB.shape, RGB.dtype))
+
+
+def srgb(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected sRGB values. \
+        This is the sRGB electro-optical transfer function (EOTF) and its inverse
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.divide, 12.92),), (np.greater, 0.04045),
+                      ((np.maximum, 0.04045), (np.add, 0.055), (np.divide, 1.055), (np.power, 2.4)))
+    return _curve(RGB, out, workspace, ((np.multiply, 12.92),), (np.greater, 0.0031308),
+                  ((np.maximum, 0.0031308), (np.power, 1 / 2.4), (np.multiply, 1.055), (np.subtract, 0.055)))
+
+
+def rec601(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected Rec. 601 / Rec.709 values \
+        This is the Rec. 601 / Rec. 709 opto-electronic transfer function (OETF) and its inverse
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 0.081), (np.add, 0.099), (np.divide, 1.099),
+                                            (np.power, 1 / 0.45)), (np.less, 0.081), ((np.divide, 4.5),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.018), (np.power, 0.45), (np.multiply, 1.099),
+                                        (np.subtract, 0.099)), (np.less, 0.018), ((np.multiply, 4.5),))
+
+
+def rec2020(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected Rec.2020 values \
+        This is the Rec. 2020 opto-electronic transfer function (OETF) and its inverse
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    beta = 0.018053968510807
+    alpha = 1 + 5.5 * beta
+    if decode:
+        check = 4.5 * beta
+        return _curve(RGB, out, workspace, ((np.maximum, check), (np.add, alpha - 1), (np.divide, alpha),
+                                            (np.power, 1 / 0.45)), (np.less, check), ((np.divide, 4.5),))
+    return _curve(RGB, out, workspace, ((np.maximum, beta), (np.power, 0.45), (np.multiply, alpha),
+                                        (np.subtract, alpha - 1)), (np.less, beta), ((np.multiply, 4.5),))
+
+
+def romm(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected ROMM (ProPhoto) values \
+        This is the ROMM color component transfer function (CCTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 0), (np.power, 1.8)), (np.less, 16 / 512),
+                      ((np.divide, 16),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.power, 1 / 1.8)), (np.less, 1 / 512),
+                  ((np.multiply, 16),))
+
+
+def eci(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected ECI RGB v2 values \
+        This is the L* color component transfer function (CCTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    CIE_E = 216 / 24389
+    CIE_K = 24389 / 27
+    if decode:
+        return _curve(RGB, out, workspace, ((np.multiply, 100), (np.divide, CIE_K)), (np.greater, 0.08),
+                      ((np.multiply, 100), (np.add, 16), (np.divide, 116), (np.power, 3)))
+    return _curve(RGB, out, workspace, ((np.multiply, CIE_K), (np.divide, 100)), (np.greater, CIE_E),
+                  ((np.cbrt, None), (np.multiply, 1.16), (np.subtract, 0.16)))
+
+
+def rimm(
+    RGB,
+    decode: bool = False,
+    exposure: int = 2,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected RIMM values \
+        This is the RIMM color component transfer function (CCTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `exposure` (int, optional): Maximum exposure level. Defaults to 2.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    clip = 1.099 * exposure ** 0.45 - 0.099
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 0.081), (np.add, 0.099), (np.divide, 1.099),
+                                            (np.power, 1 / 0.45)), (np.less, 0.081), ((np.divide, 4.5),),
+                      pre=((np.multiply, clip),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.018), (np.power, 0.45), (np.multiply, 1.099),
+                                        (np.subtract, 0.099)), (np.less, 0.018), ((np.multiply, 4.5),),
+                  post=((np.divide, clip),))
+
+
+def erimm(
+    RGB,
+    decode: bool = False,
+    exp_min: float = 0.001,
+    exp_max: float = 316.2,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected ERIMM values \
+        This is the ERIMM opto-electronic/electro-optical transfer function (OETF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `exp_min` (int, optional): Minimum exposure. Defaults to 0.001.
+        `exp_max` (int, optional): Maximum exposure. Defaults to 316.2.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    euler_min = e * exp_min
+    lg, lo, hi = log(euler_min), log(exp_min), log(exp_max)
+    check = (lg - lo) / (hi - lo)
+    if decode:
+        return _curve(RGB, out, workspace, ((np.divide, check), (np.multiply, euler_min)), (np.greater, check),
+                      ((np.multiply, hi - lo), (np.add, lo), (np.exp, None)))
+    return _curve(RGB, out, workspace, ((np.multiply, check), (np.divide, euler_min)), (np.greater, euler_min),
+                  ((np.maximum, euler_min), (np.log, None), (np.subtract, lo), (np.divide, hi - lo)),
+                  pre=((np.maximum, 0), (np.minimum, 1)))
+
+
+def blackmagic(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected Blackmagic Film Gen 5 values \
+        This is the Blackmagic Film Gen 5 opto-electronic transfer function (OETF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    A = 0.08692876065491224
+    B = 0.005494072432257808
+    C = 0.5300133392291939
+    D = 8.283605932402494
+    E = 0.09246575342465753
+    LIN_CUT = 0.005
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, C), (np.divide, A), (np.exp, None), (np.subtract, B)),
+                      (np.less, D * LIN_CUT + E), ((np.subtract, E), (np.divide, D)))
+    return _curve(RGB, out, workspace, ((np.maximum, LIN_CUT), (np.add, B), (np.log, None), (np.multiply, A),
+                                        (np.add, C)), (np.less, LIN_CUT), ((np.multiply, D), (np.add, E)))
+
+
+def davinci(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected DaVinci values \
+        This is the DaVinci opto-electronic transfer function (OETF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    DI_A, DI_B, DI_C, DI_M, DI_LIN_CUT = 0.0075, 7.0, 0.07329248, 10.44426855, 0.00262409
+    if decode:
+        return _curve(RGB, out, workspace, ((np.divide, DI_M),), (np.greater, 0.02740668),
+                      ((np.divide, DI_C), (np.subtract, DI_B), (np.power, 2, True), (np.subtract, DI_A)))
+    return _curve(RGB, out, workspace, ((np.multiply, DI_M),), (np.greater, DI_LIN_CUT),
+                  ((np.maximum, DI_LIN_CUT), (np.add, DI_A), (np.log2, None), (np.add, DI_B), (np.multiply, DI_C)))
+
+
+def dcdm(XYZ, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### The DCDM electro-optical transfer function (EOTF). \
+        Converts between standard and linear tristimulus values.
+
+    ### Args:
+        `XYZ` (array_like): The X, Y, Z tristimulus values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(XYZ, out, workspace, ((np.maximum, 0), (np.power, 2.6), (np.multiply, 52.37)))
+    return _curve(XYZ, out, workspace, ((np.maximum, 0), (np.divide, 52.37), (np.power, 1 / 2.6)))
+
+
+def _full_to_legal_steps(depth: int) -> tuple:
+    """### Returns the steps converting full range normalized code values to legal (video) range ones"""
+    mult = 2 ** (depth - 8)
+    return ((np.multiply, (235 - 16) * mult), (np.add, 16 * mult), (np.divide, 2 ** depth - 1))
+
+
+def _legal_to_full_steps(depth: int) -> tuple:
+    """### Returns the steps converting legal (video) range normalized code values to full range ones"""
+    mult = 2 ** (depth - 8)
+    return ((np.multiply, 2 ** depth - 1), (np.subtract, 16 * mult), (np.divide, (235 - 16) * mult))
+
+
+def slog(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected S-Log values \
+        This is the S-Log opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are in legal range. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    check = 0.030001222851889303
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, 0.646596), (np.divide, 0.432699), (np.power, 10, True),
+                                            (np.subtract, 0.037584)), (np.less, check),
+                      ((np.subtract, check), (np.divide, 5)), pre=_legal_to_full_steps(depth) if norm_range else (),
+                      post=((np.multiply, 0.9),) if reflection else ())
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.add, 0.037584), (np.log10, None),
+                                        (np.multiply, 0.432699), (np.add, 0.646596)), (np.less, 0),
+                  ((np.multiply, 5), (np.add, check)), pre=((np.divide, 0.9),) if reflection else (),
+                  post=_full_to_legal_steps(depth) if norm_range else ())
+
+
+def slog2(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected S-Log2 values \
+        This is the S-Log2 opto_electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are in legal range. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if decode:
+        RGB = slog(RGB, True, reflection, depth, norm_range, out=out, workspace=workspace)
+        return _chain(RGB, ((np.multiply, 219), (np.divide, 155)), RGB)
+    scaled = _chain(RGB, ((np.multiply, 155), (np.divide, 219)), _scratch(workspace, "slog2", RGB.shape, RGB.dtype))
+    return slog(scaled, False, reflection, depth, norm_range, out=out, workspace=workspace)
+
+
+def slog3(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected S-Log3 values \
+        This is the S-Log3 opto-electronic/electro-optical transfer function (OETF)(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are full range normalized. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.multiply, 1023), (np.subtract, 420), (np.divide, 261.5),
+                                            (np.power, 10, True), (np.multiply, 0.19), (np.subtract, 0.01)),
+                      (np.less, 171.2102946929 / 1023),
+                      ((np.multiply, 1023), (np.subtract, 95), (np.multiply, 0.01125),
+                       (np.divide, 171.2102946929 - 95)),
+                      pre=() if norm_range else _full_to_legal_steps(depth),
+                      post=() if reflection else ((np.divide, 0.9),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.01125), (np.add, 0.01), (np.divide, 0.19), (np.log10, None),
+                                        (np.multiply, 261.5), (np.add, 420), (np.divide, 1023)), (np.less, 0.01125),
+                  ((np.multiply, 171.2102946929 - 95), (np.divide, 0.01125), (np.add, 95), (np.divide, 1023)),
+                  pre=() if reflection else ((np.multiply, 0.9),),
+                  post=() if norm_range else _legal_to_full_steps(depth))
+
+
+def vlog(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected V-Log values \
+        This is the V-Log opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are full range normalized. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    b, c, d = 0.00873, 0.241514, 0.59820
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, d), (np.divide, c), (np.power, 10, True), (np.subtract, b)),
+                      (np.less, 0.181), ((np.subtract, 0.125), (np.divide, 5.6)),
+                      pre=() if norm_range else _full_to_legal_steps(depth),
+                      post=() if reflection else ((np.divide, 0.9),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.01), (np.add, b), (np.log10, None), (np.multiply, c),
+                                        (np.add, d)), (np.less, 0.01), ((np.multiply, 5.6), (np.add, 0.125)),
+                  pre=() if reflection else ((np.multiply, 0.9),),
+                  post=() if norm_range else _legal_to_full_steps(depth))
+
+
+def flog(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected F-Log values \
+        This is the F-Log opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are full range normalized. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    a, b, c, d, _e, f = 0.555556, 0.009468, 0.344676, 0.790453, 8.735631, 0.092864
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, d), (np.divide, c), (np.power, 10, True), (np.divide, a),
+                                            (np.subtract, b / a)), (np.less, 0.100537775223865),
+                      ((np.subtract, f), (np.divide, _e)),
+                      pre=() if norm_range else _full_to_legal_steps(depth),
+                      post=() if reflection else ((np.divide, 0.9),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.00089), (np.multiply, a), (np.add, b), (np.log10, None),
+                                        (np.multiply, c), (np.add, d)), (np.less, 0.00089),
+                  ((np.multiply, _e), (np.add, f)),
+                  pre=() if reflection else ((np.multiply, 0.9),),
+                  post=() if norm_range else _legal_to_full_steps(depth))
+
+
+def nlog(
+    RGB,
+    decode: bool = False,
+    reflection: bool = True,
+    depth: int = 10,
+    norm_range: bool = True,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and Gamma-corrected N-Log values \
+        This is the N-Log opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `reflection` (bool): Whether the light level to a camera is reflection. Defaults to True.
+        `depth` (int | float): The bit depth of the code values. Defaults to 10-bit.
+        `norm_range` (bool, optional): Whether the code values are full range normalized. Defaults to True.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    a, b, c, d = 650 / 1023, 0.0075, 150 / 1023, 619 / 1023
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, d), (np.divide, c), (np.exp, None)),
+                      (np.less, 452 / 1023), ((np.divide, a), (np.power, 3), (np.subtract, b)),
+                      pre=() if norm_range else _full_to_legal_steps(depth),
+                      post=() if reflection else ((np.divide, 0.9),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.328), (np.log, None), (np.multiply, c), (np.add, d)),
+                  (np.less, 0.328), ((np.add, b), (np.cbrt, None), (np.multiply, a)),
+                  pre=() if reflection else ((np.multiply, 0.9),),
+                  post=() if norm_range else _legal_to_full_steps(depth))
+
+
+def djidlog(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and DJI D-Log values. This defines the DJI D-Log log encoding curve.
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, 0.0929), (np.divide, 6.025)), (np.greater, 0.14),
+                      ((np.multiply, 3.89616), (np.subtract, 2.27752), (np.power, 10, True), (np.subtract, 0.0108),
+                       (np.divide, 0.9892)))
+    return _curve(RGB, out, workspace, ((np.multiply, 6.025), (np.add, 0.0929)), (np.greater, 0.0078),
+                  ((np.maximum, 0.0078), (np.multiply, 0.9892), (np.add, 0.0108), (np.log10, None),
+                   (np.multiply, 0.256663), (np.add, 0.584555)))
+
+
+def filmlighttlog(
+    RGB,
+    decode: bool = False,
+    w: int = 128,
+    g: int = 16,
+    o: float = 0.075,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected FilmlightTLog values \
+        This is the FilmlightTLog opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `w` (int, optional): x value for y = 1.0. Defaults to 128.
+        `g` (int, optional): The gradient at x = 0. Defaults to 16.
+        `o` (float, optional): y value for x = 0.0. Defaults to 0.075.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    b = 1 / (0.7107 + 1.2359 * log(w * g))
+    gs = g / (1 - o)
+    C = b / gs
+    a = 1 - b * log(w + C)
+    s = (1 - o) / (1 - (a + b * log(C)))
+    A = 1 + (a - 1) * s
+    B = b * s
+    G = gs * s
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, A), (np.divide, B), (np.exp, None), (np.subtract, C)),
+                      (np.less, o), ((np.subtract, o), (np.divide, G)))
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.add, C), (np.log, None), (np.multiply, B), (np.add, A)),
+                  (np.less, 0), ((np.multiply, G), (np.add, o)))
+
+
+def arri_log_c3(
+    RGB,
+    decode: bool = False,
+    firmware: int = 3,
+    linear: bool = True,
+    EI: int = 800,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs):
+    """### Converts between Linear and ARRI LogC3 values \
+        This is the ARRI LogC3 opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `firmware` (int, optional): Alexa firmware version. Either 2 ("SUP 2.x") or 3 ("SUP 3.x"). Defaults to 3.
+        `linear` (bool, optional): Conversion method. Either True ("Linear Scene Exposure Factor") or
+                                                False ("Normalised Sensor Signal"). Defaults to True.
+        `EI` (int, optional): Exposure index. One of (160, 200, 250, 320, 400, 500, 640, 800, 1000, 1280, 1600). Defaults to 800.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    method = {True: "Linear Scene Exposure Factor", False: "Normalised Sensor Signal"}
+    if firmware not in (2, 3):
+        raise ValueError("Firmware version can only be either 2 or 3!")
+    if EI not in (160, 200, 250, 320, 400, 500, 640, 800, 1000, 1280, 1600):
+        raise ValueError("Exposure index can only be one of (160, 200, 250, 320, 400, 500, 640, 800, 1000, 1280, 1600)!")
+
+    cut, a, b, c, d, _e, f, _ = atfh.DATA_ALEXA_LOG_C_CURVE_CONVERSION[firmware][method[linear]][EI]
+
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, f), (np.divide, _e)), (np.greater, _e * cut + f),
+                      ((np.subtract, d), (np.divide, c), (np.power, 10, True), (np.subtract, b), (np.divide, a)))
+    return _curve(RGB, out, workspace, ((np.multiply, _e), (np.add, f)), (np.greater, cut),
+                  ((np.maximum, cut), (np.multiply, a), (np.add, b), (np.log10, None), (np.multiply, c), (np.add, d)))
+
+
+def arri_log_c4(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and ARRI LogC4 values \
+        This is the ARRI LogC4 opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    a = (2**18 - 16) / 117.45
+    b = (1023 - 95) / 1023
+    c = 95 / 1023
+    s = (7 * log(2) * 2 ** (7 - 14 * c / b)) / (a * b)
+    t = (2 ** (14 * (-c / b) + 6) - 64) / a
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, c), (np.divide, b), (np.multiply, 14), (np.add, 6),
+                                            (np.power, 2, True), (np.subtract, 64), (np.divide, a)),
+                      (np.less, 0), ((np.multiply, s), (np.add, t)))
+    return _curve(RGB, out, workspace, ((np.maximum, t), (np.multiply, a), (np.add, 64), (np.log2, None),
+                                        (np.subtract, 6), (np.divide, 14), (np.multiply, b), (np.add, c)),
+                  (np.less, t), ((np.subtract, t), (np.divide, s)))
+
+
+def red_log(
+    RGB,
+    decode: bool = False,
+    black_offset: float = 10 ** ((0 - 1023) / 511),
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Red Log values \
+        This is the Red Log opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `black_offset` (float, optional): Black offet. Defaults to ~0.009955041
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.multiply, 1023), (np.subtract, 1023), (np.divide, 511),
+                                            (np.power, 10, True), (np.subtract, black_offset),
+                                            (np.divide, 1 - black_offset)))
+    return _curve(RGB, out, workspace, ((np.multiply, 1 - black_offset), (np.add, black_offset), (np.maximum, 1e-10),
+                                        (np.log10, None), (np.multiply, 511), (np.add, 1023), (np.divide, 1023)))
+
+
+def red_log_film(
+    RGB,
+    decode: bool = False,
+    black_offset: float = 10 ** ((95 - 685) / 300),
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Red Log Film values \
+        This is the Red Log Film opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `black_offset` (float, optional): Black offet. Defaults to ~0.01079775
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.multiply, 1023), (np.subtract, 685), (np.divide, 300),
+                                            (np.power, 10, True), (np.subtract, black_offset),
+                                            (np.divide, 1 - black_offset)))
+    return _curve(RGB, out, workspace, ((np.multiply, 1 - black_offset), (np.add, black_offset), (np.maximum, 1e-10),
+                                        (np.log10, None), (np.multiply, 300), (np.add, 685), (np.divide, 1023)))
+
+
+def log3_g10(
+    RGB,
+    decode: bool = False,
+    method: int = 3,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Log3G10 values \
+        This is the Log3G10 opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `method` (int, optional): Computation method. Either 1, 2 or 3 (version). Defaults to 3.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if method not in (1, 2, 3):
+        raise ValueError("Wrong method input. The method can only be an int number 1, 2 or 3!")
+    a, b, c, g = 0.224282, 155.975327, 0.01, 15.1927
+    if decode:
+        if method == 3:
+            return _curve(RGB, out, workspace, ((np.absolute, None), (np.divide, a), (np.power, 10, True),
+                                                (np.subtract, 1.0), (np.divide, b), (np.subtract, c)),
+                          (np.less, 0), ((np.divide, g), (np.subtract, c)))
+        a, b, c = (0.222497, 169.379333, 0) if method == 1 else (a, b, c)
+        return _curve(RGB, out, workspace, ((np.absolute, None), (np.divide, a), (np.power, 10.0, True),
+                                            (np.subtract, 1), (np.multiply, _sign(RGB, workspace)), (np.divide, b),
+                                            (np.subtract, c)))
+
+    if method == 1:
+        return _curve(RGB, out, workspace, ((np.absolute, None), (np.multiply, 169.379333), (np.add, 1),
+                                            (np.log10, None), (np.multiply, _sign(RGB, workspace)),
+                                            (np.multiply, 0.222497)))
+    if method == 2:
+        return _curve(RGB, out, workspace, ((np.absolute, None), (np.multiply, b), (np.add, 1), (np.log10, None),
+                                            (np.multiply, _sign(RGB, workspace, c)), (np.multiply, a)),
+                      pre=((np.add, c),))
+    return _curve(RGB, out, workspace, ((np.absolute, None), (np.multiply, b), (np.add, 1.0), (np.log10, None),
+                                        (np.multiply, a)), (np.less, 0), ((np.multiply, g),), pre=((np.add, c),))
+
+
+def log3_g12(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Log3G12 values \
+        This is the Log3G12 opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if decode:
+        return _curve(RGB, out, workspace, ((np.absolute, None), (np.divide, 0.184904), (np.power, 10.0, True),
+                                            (np.subtract, 1), (np.multiply, _sign(RGB, workspace)),
+                                            (np.divide, 347.189667)))
+    return _curve(RGB, out, workspace, ((np.absolute, None), (np.multiply, 347.189667), (np.add, 1), (np.log10, None),
+                                        (np.multiply, _sign(RGB, workspace)), (np.multiply, 0.184904)))
+
+
+def acescc(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and ACEScc values \
+        This is the ACEScc opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if decode:
+        limit = _mask(RGB, workspace, (np.less, (np.log2(65504) + 9.72) / 17.52), invert=True)
+        steps = ((np.multiply, 17.52), (np.subtract, 9.72), (np.power, 2, True))
+        res = _curve(RGB, out, workspace, steps, (np.less, (9.72 - 15) / 17.52),
+                     steps + ((np.subtract, 2 ** -16), (np.multiply, 2)))
+        np.copyto(res, 65504, where=limit)
+        return res
+
+    negative = _mask(RGB, workspace, (np.less, 0))
+    res = _curve(RGB, out, workspace, ((np.maximum, 2 ** -15), (np.log2, None), (np.add, 9.72), (np.divide, 17.52)),
+                 (np.less, 2 ** -15), ((np.maximum, 0), (np.multiply, 0.5), (np.add, 2 ** -16), (np.log2, None),
+                                       (np.add, 9.72), (np.divide, 17.52)))
+    np.copyto(res, (-16 + 9.72) / 17.52, where=negative)
+    return res
+
+
+def acescct(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and ACEScct values \
+        This is the ACEScct opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    A = 10.5402377416545
+    B = 0.0729055341958355
+    if decode:
+        return _curve(RGB, out, workspace, ((np.subtract, B), (np.divide, A)), (np.greater, 0.155251141552511),
+                      ((np.multiply, 17.52), (np.subtract, 9.72), (np.power, 2, True)))
+    return _curve(RGB, out, workspace, ((np.multiply, A), (np.add, B)), (np.greater, 0.0078125),
+                  ((np.maximum, 0.0078125), (np.log2, None), (np.add, 9.72), (np.divide, 17.52)))
+
+
+def acesproxy(
+    RGB,
+    decode: bool = False,
+    depth: int = 10,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and ACESproxy values \
+        This is the ACESproxy opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `depth` (int | float): The bit depth of the code values [10 or 12]. Defaults to 10-bit.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    RGB = _array(RGB)
+    if depth not in (10, 12):
+        raise ValueError("Depth must be integer [10 or 12]!")
+    max_value = 2 ** depth - 1
+    multiplier = 1 if depth == 10 else 4
+    CV_min = 64 * multiplier
+    CV_max = 940 * multiplier
+    steps_per_stop = 50 * multiplier
+    mid_CV_offset = 425 * multiplier
+
+    if decode:
+        return _curve(RGB, out, workspace, ((np.multiply, max_value), (np.subtract, mid_CV_offset),
+                                            (np.divide, steps_per_stop), (np.subtract, 2.5), (np.power, 2, True)))
+    black = _mask(RGB, workspace, (np.greater, 2 ** -9.72), invert=True)
+    res = _curve(RGB, out, workspace, ((np.maximum, 2 ** -9.72), (np.log2, None), (np.add, 2.5),
+                                       (np.multiply, steps_per_stop), (np.add, mid_CV_offset), (np.maximum, CV_min),
+                                       (np.minimum, CV_max)))
+    np.copyto(res, CV_min, where=black)
+    res /= max_value
+    return res
+
+
+def protune(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and Protune values \
+        This is the Protune opto-electronic/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.power, 113, True), (np.subtract, 1), (np.divide, 112)))
+    # Negative values are mapped to 0, log1p is undefined below -1
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.multiply, 112), (np.log1p, None), (np.divide, log(113))))
+
+
+def smpte240m(RGB, decode: bool = False, out: np.ndarray = None, workspace: Workspace = None, **kwargs) -> np.ndarray:
+    """### Converts between Linear and SMPTE240M values \
+        This is the SMPTE240M opto-electrical/electro-optical transfer function (OETF)/(EOTF).
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 0.0912), (np.add, 0.1115), (np.divide, 1.1115),
+                                            (np.power, 1 / 0.45)), (np.less, 0.0912), ((np.divide, 4),))
+    return _curve(RGB, out, workspace, ((np.maximum, 0.0228), (np.power, 0.45), (np.multiply, 1.1115),
+                                        (np.subtract, 0.1115)), (np.less, 0.0228), ((np.multiply, 4),))
+
+
+def pq(
+    RGB,
+    decode: bool = False,
+    depth: int = 10,
+    lut: bool = False,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and PQ values \
+        This is the SMPTE ST 2084 (Rec. 2100 PQ) electro-optical transfer function (EOTF) and its inverse.
+
+    ### Args:
+        `RGB` (array_like): The values to be converted. Linear values are normalized to 10000 cd/m2.
+                                    Integer arrays are code values of `depth` bits.
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `depth` (int, optional): The bit depth of integer code values. They are converted with a precomputed
+                                    table of every code value. Defaults to 10.
+        `lut` (bool, optional): Convert float values with a precomputed LUT over LUT_STOPS with linear
+                                    interpolation instead of the curve. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    Reference https://www.itu.int/rec/R-REC-BT.2100
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    res = _lookup(pq, RGB, decode, depth, lut, out)
+    if res is not None:
+        return res
+    m1, m2, c1, c2, c3 = PQ_CONSTANTS
+    # The ratios are rewritten as a constant plus a fraction, so they are chains of steps. With U = N ** (1 / m2):
+    # (U - c1) / (c2 - c3 * U) = (c2 / c3 - c1) / (c2 - c3 - c3 * (U - 1)) - 1 / c3 and
+    # (c1 + c2 * Y) / (1 + c3 * Y) = 1 + (c1 - c2 / c3) / (1 + c3 * Y) + (c2 / c3 - 1).
+    # Both are close to 1 near the peak where the large powers (1 / m2 and m2 ~ 79) turn the float32 error of fast
+    # math into whole code values, so the differences from 1 go through expm1 and log1p
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 1e-30), (np.minimum, 1), (np.log, None), (np.divide, m2),
+                                            (np.expm1, None), (np.multiply, -c3), (np.add, c2 - c3),
+                                            (np.divide, c2 / c3 - c1, True), (np.subtract, 1 / c3), (np.maximum, 0),
+                                            (np.power, 1 / m1)))
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.minimum, 1), (np.power, m1), (np.multiply, c3),
+                                        (np.add, 1), (np.divide, c1 - c2 / c3, True), (np.add, c2 / c3 - 1),
+                                        (np.log1p, None), (np.multiply, m2), (np.exp, None)))
+
+
+def hlg(
+    RGB,
+    decode: bool = False,
+    depth: int = 10,
+    lut: bool = False,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and HLG values \
+        This is the ARIB STD-B67 (Rec. 2100 HLG) opto-electronic transfer function (OETF) and its inverse.
+
+    ### Args:
+        `RGB` (array_like): The values to be converted. Linear values are scene light normalized to range 0-1.
+                                    Integer arrays are code values of `depth` bits.
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `depth` (int, optional): The bit depth of integer code values. They are converted with a precomputed
+                                    table of every code value. Defaults to 10.
+        `lut` (bool, optional): Convert float values with a precomputed LUT over LUT_STOPS with linear
+                                    interpolation instead of the curve. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    #### N/B: This is the scene referred OETF. The display side (OOTF with the system gamma) isn't applied.
+
+    Reference https://www.itu.int/rec/R-REC-BT.2100
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    res = _lookup(hlg, RGB, decode, depth, lut, out)
+    if res is not None:
+        return res
+    a, b, c = HLG_CONSTANTS
+    if decode:
+        return _curve(RGB, out, workspace, ((np.maximum, 0.5), (np.subtract, c), (np.divide, a), (np.exp, None),
+                                            (np.add, b), (np.divide, 12)), (np.less_equal, 0.5),
+                      ((np.maximum, 0), (np.square, None), (np.divide, 3)))
+    return _curve(RGB, out, workspace, ((np.maximum, 1 / 12), (np.multiply, 12), (np.subtract, b), (np.log, None),
+                                        (np.multiply, a), (np.add, c)), (np.less_equal, 1 / 12),
+                  ((np.maximum, 0), (np.multiply, 3), (np.sqrt, None)))
+
+
+def gamma_function(
+    RGB,
+    gamma: int | float,
+    decode: bool = False,
+    out: np.ndarray = None,
+    workspace: Workspace = None,
+    **kwargs) -> np.ndarray:
+    """### Converts between Linear and Gamma-corrected RGB values. \
+        This is a typical gamma encoding/decoding function
+
+    ### Args:
+        `RGB` (array_like): The values to be converted
+        `gamma` (int | float): The gamma exponent of the RGB value's color space.
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+        `out` (numpy.ndarray, optional): A float array with the shape of the values the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the intermediate values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: The converted values
+    """
+    return _curve(RGB, out, workspace, ((np.maximum, 0), (np.power, gamma if decode else 1 / gamma)))
+
+
+def get_transfer_function(color_space: str):
+    """### Finds the vectorized transfer function of a color space
+
+    ### Args:
+        `color_space` (str): The name of the color space as found in the color_spaces module
+
+    ### Returns:
+        Callable: A function with the signature (RGB, decode=False, **kwargs) -> numpy.ndarray
+    """
+    func = cs[color_space]["transfer function"]
+    if isinstance(func, partial):
+        return partial(globals()[func.func.__name__], **func.keywords)
+    if getattr(tf, func.__name__, None) is func:
+        return globals()[func.__name__]
+    # Scene linear color spaces use an anonymous identity function
+    return linear
@@ -0,0 +1,162 @@
+"""This module contains zero-copy views of raw pixel buffers for the batch functions.
+Anything exposing the buffer protocol (bytes, bytearray, memoryview, array.array, mmap and slices of them, decoder
+output) is viewed as an ndarray without copying. Interleaved (H, W, C), planar (C, H, W) and padded or otherwise
+strided layouts all come out as arrays with the channels on the last axis, which is what the batch functions take.
+Results are written back into caller-supplied buffers the same way.
+
+A Workspace keeps the scratch arrays of the batch functions between calls. Passing the same workspace (and `out`)
+for every frame of a stream of same-sized frames makes the steady state run without allocating arrays.
+
+Example:
+    >>> frame = view_buffer(decoder_output, shape=(1080, 1920), layout="chw")
+    >>> write_buffer(rgb_to_hsv_uint8(frame), target, shape=(1080, 1920), layout="chw")
+"""
+# pylint: disable=invalid-name
+from math import prod
+
+import numpy as np
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= Buffer layouts: channels interleaved per pixel or one plane per channel
+BUFFER_LAYOUTS = ("hwc", "chw")
+
+
+class Workspace:
+    """### Named scratch arrays reused between calls of the batch functions
+
+    An array is only (re)allocated when it's first asked for, when it's too small or when its type changes. Smaller
+    shapes (e.g. the last block of a frame) are views of the same memory. The functions taking a workspace use
+    distinct names for their intermediates (linear RGB, masks, branches), so a single workspace can be shared by
+    a whole pipeline. It must not be shared between threads.
+    """
+
+    def __init__(self):
+        self._arrays = {}
+
+    def __repr__(self) -> str:
+        return f"Workspace({len(self._arrays)} arrays, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        """### The memory held by the scratch arrays"""
+        return sum(i.nbytes for i in self._arrays.values())
+
+    def array(self, name: str, shape: tuple, dtype=np.float64) -> np.ndarray:
+        """### Returns the scratch array of a name with the given shape and type. The values are undefined"""
+        size, res = prod(shape), self._arrays.get(name)
+        if res is None or res.size < size or res.dtype != dtype:
+            res = self._arrays[name] = np.empty(size, dtype=dtype)
+        return res[:size].reshape(shape)
+
+    def clear(self):
+        """### Releases the scratch arrays"""
+        self._arrays.clear()
+
+
+def _output(out: np.ndarray | None, shape: tuple, dtype=np.float64) -> np.ndarray:
+    """### Returns the caller-supplied output array after checking it or a new one"""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if not isinstance(out, np.ndarray) or out.shape != shape or out.dtype.kind != "f" or not out.flags.writeable:
+        raise ValueError(f"Out must be a writable float array with shape {shape}!")
+    return out
+
+
+def _buffer_view(values, channels: int | None = 3):
+    """### Returns a zero-copy array of an object exposing the buffer protocol. Flat buffers are split into pixels
+    of `channels` values (kept flat for None). Everything else is returned unchanged"""
+    if isinstance(values, (np.ndarray, str, list, tuple)):
+        return values
+    try:
+        values = np.asarray(memoryview(values))
+    except TypeError:
+        return values
+    if channels and values.ndim == 1 and values.size % channels == 0:
+        return values.reshape(-1, channels)
+    return values
+
+
+def view_buffer(
+    buffer,
+    shape: tuple | None = None,
+    layout: str = "hwc",
+    channels: int = 3,
+    dtype=None,
+    strides: tuple | None = None,
+    offset: int = 0,
+    writable: bool = False) -> np.ndarray:
+    """### Views a buffer as an array with the channels on the last axis without copying it
+
+    ### Args:
+        `buffer` (Buffer): Any object exposing the buffer protocol or a numpy array
+        `shape` (tuple | None, optional): The pixel shape without the channels, e.g. (H, W) or (N,).
+                                    Defaults to None (as many pixels as fit in the buffer).
+        `layout` (str, optional): One of BUFFER_LAYOUTS. "hwc" for interleaved channels, "chw" for planar ones.
+                                    Defaults to "hwc".
+        `channels` (int, optional): The number of channels. Defaults to 3.
+        `dtype` (DTypeLike, optional): The type of the values. Defaults to None (the item format of the buffer).
+        `strides` (tuple | None, optional): The strides in bytes of the stored axes, in storage order (channels
+                                    first for planar layouts). Use for padded rows or sub-regions.
+                                    Defaults to None (contiguous).
+        `offset` (int, optional): The offset in bytes of the first value. Defaults to 0.
+        `writable` (bool, optional): Require a writable view. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: A view of the buffer with shape (*shape, channels)
+    """
+    if layout not in BUFFER_LAYOUTS:
+        raise ValueError(f"Layout can only be one of the following: {BUFFER_LAYOUTS}!")
+    if isinstance(buffer, np.ndarray) and shape is None and dtype is None and strides is None and not offset:
+        res = buffer
+    else:
+        if not isinstance(buffer, np.ndarray):
+            try:
+                buffer = memoryview(buffer)
+            except TypeError:
+                raise TypeError("Buffer must expose the buffer protocol!") from None
+        if dtype is None:
+            dtype = buffer.dtype if isinstance(buffer, np.ndarray) else buffer.format
+        dtype = np.dtype(dtype)
+        if shape is None:
+            if strides is not None:
+                raise ValueError("The shape of a strided buffer must be given!")
+            shape = ((buffer.nbytes - offset) // dtype.itemsize // channels,)
+        shape = (channels, *shape) if layout == "chw" else (*shape, channels)
+        try:
+            res = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset, strides=strides)
+        except TypeError as error:
+            raise ValueError(f"The buffer is too small for shape {shape}!") from error
+        if layout == "chw":
+            res = np.moveaxis(res, 0, -1)
+    if writable and not res.flags.writeable:
+        raise ValueError("The buffer is read-only!")
+    return res
+
+
+def write_buffer(values, buffer, **kwargs) -> np.ndarray:
+    """### Writes values into a buffer in place. Floats written to an integer buffer are rounded and clamped
+
+    ### Args:
+        `values` (array_like): The values with the channels on the last axis, e.g. a batch function result
+        `buffer` (Buffer): A writable object exposing the buffer protocol or a numpy array
+        `kwargs`: The layout of the buffer as in `view_buffer` (shape, layout, channels, dtype, strides, offset).
+                                    The shape defaults to the pixel shape of the values.
+
+    ### Returns:
+        numpy.ndarray: The view of the buffer holding the values
+    """
+    values = np.asarray(values)
+    if "shape" not in kwargs and not isinstance(buffer, np.ndarray):
+        kwargs["shape"] = values.shape[:-1]
+    kwargs.setdefault("channels", values.shape[-1])
+    view = view_buffer(buffer, writable=True, **kwargs)
+    if values.size == view.size:
+        # E.g. (N, 3) pixels of a flat input written into an (H, W, 3) image
+        values = values.reshape(view.shape)
+    if view.dtype.kind in "iu" and values.dtype.kind == "f":
+        info = np.iinfo(view.dtype)
+        values = np.clip(np.rint(values), info.min, info.max)
+    np.copyto(view, values, casting="unsafe")
+    return view
@@ -0,0 +1,278 @@
+"""This module contains an optional LRU cache in front of the scalar converters and color_utils functions.
+Applications converting the same few colors over and over (UI themes, palettes) get the results of repeated calls
+without running the conversions again. The cache is off by default and the functions are only wrapped while it is
+enabled.
+
+Example:
+    >>> with cache(maxsize=512):
+    ...     get_median_color("c0ffee", "decaff")
+    ...     get_median_color("c0ffee", "decaff")
+    >>> cache_info()["hits"]
+    1
+
+Setting the COLOR_UTILITIES_CACHE environment variable to "1" (or to a max size) enables it for the whole program.
+
+#### N/B: Calls are keyed on their normalized arguments. Values of different types (1, 1.0, True) never share \
+    an entry because they mean different things to the converters. Only the outermost call is cached, \
+    the conversions it makes internally run as usual. Calls with `seed=None` (random colors) are never cached.
+"""
+# pylint: disable=invalid-name
+import inspect
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import contextmanager
+from functools import partial, wraps
+
+import numpy as np
+
+from . import color_utils, converters, patching, xyz
+
+#= The environment variable enabling the cache for the whole program
+CACHE_ENV = "COLOR_UTILITIES_CACHE"
+
+#= Modules whose public functions are cached (the package itself is added when enabling)
+CACHED_MODULES = (converters, color_utils)
+
+DEFAULT_MAXSIZE = 1024
+
+#= Results that can be stored. Anything else (e.g. generators) is returned without caching
+_IMMUTABLE = (str, int, float, bool, complex, type(None))
+
+#= Parameters resolved to their table keys. Matched by the end of the parameter name (e.g. lab_illuminant)
+_RESOLVERS = {
+    "illuminant": xyz.illuminant_name,
+    "observer": xyz.observer_name,
+    "adaptation": xyz.adaptation_name,
+    "color_space": xyz.color_space_name,
+}
+
+_MISSING = object()
+
+
+class _Uncacheable(Exception):
+    """### Raised for arguments that can't be used as a key"""
+
+
+class _State(threading.local):
+    """### Whether the current thread is already inside a cached call"""
+
+    def __init__(self):
+        self.inside = False
+
+
+_lock = threading.RLock()
+_state = _State()
+_entries = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "skipped": 0}
+_functions = {}
+_maxsize = 0
+#= Identifies the cache among the layers of patching
+_LAYER = object()
+
+
+def _freeze(value):
+    """### Returns a hashable key of a value. Lists and tuples are the same, scalars keep their type"""
+    kind = type(value)
+    if kind is tuple or kind is list:
+        return tuple(_freeze(i) for i in value)
+    if isinstance(value, np.ndarray):
+        return value.dtype.str, value.shape, value.tobytes()
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError as error:
+        raise _Uncacheable from error
+    return kind, value
+
+
+def _copy(value):
+    """### Returns a copy of a result that the caller can't use to change the cached one"""
+    if isinstance(value, _IMMUTABLE):
+        return value
+    if isinstance(value, list):
+        return [_copy(i) for i in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(i) for i in value)
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    raise _Uncacheable
+
+
+def _key_function(func: Callable) -> Callable:
+    """### Returns a function making the cache key of the arguments of a call"""
+    params = inspect.signature(func).parameters.values()
+    varargs = any(i.kind == i.VAR_POSITIONAL for i in params)
+    # Names of illuminants, observers, etc. are resolved the same way refine_args does it ("d65" is "D65")
+    resolvers = {i.name: resolver for i in params for suffix, resolver in _RESOLVERS.items()
+                 if i.name.endswith(suffix)}
+
+    def normalize(name: str, value):
+        if value is None or name not in resolvers:
+            return _freeze(value)
+        try:
+            return resolvers[name](value)
+        except (TypeError, ValueError) as error:
+            raise _Uncacheable from error
+
+    # Keyword arguments equal to their defaults are left out of the key
+    defaults = {}
+    for i in params:
+        if i.default is not i.empty:
+            try:
+                defaults[i.name] = normalize(i.name, i.default)
+            except _Uncacheable:
+                pass
+
+    def key(args: tuple, kwargs: dict) -> tuple:
+        # A single R, G, B sequence is the same as 3 consecutive values (check_color unpacks it)
+        if varargs and len(args) == 1 and isinstance(args[0], (tuple, list)) and len(args[0]) == 3:
+            args = args[0]
+        frozen = ((k, normalize(k, v)) for k, v in kwargs.items())
+        return _freeze(args), tuple(sorted(i for i in frozen if defaults.get(i[0], _MISSING) != i[1]))
+    return key
+
+
+def _run(func: Callable, args: tuple, kwargs: dict):
+    """### Calls a function without caching the conversions it makes itself"""
+    _state.inside = True
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _state.inside = False
+
+
+def _wrap(func: Callable, name: str) -> Callable:
+    """### Returns a wrapper of a function that looks up its results in the cache"""
+    make_key = _key_function(func)
+    random = "seed" in inspect.signature(func).parameters
+    counts = _functions.setdefault(name, {"hits": 0, "misses": 0})
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _state.inside:
+            return func(*args, **kwargs)
+        if random and kwargs.get("seed") is None:
+            return _run(func, args, kwargs)
+        try:
+            key = (name, *make_key(args, kwargs))
+        except _Uncacheable:
+            with _lock:
+                _stats["skipped"] += 1
+            return func(*args, **kwargs)
+
+        with _lock:
+            if key in _entries:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                counts["hits"] += 1
+                return _copy(_entries[key])
+
+        result = _run(func, args, kwargs)
+        try:
+            stored = _copy(result)
+        except _Uncacheable:
+            with _lock:
+                _stats["skipped"] += 1
+            return result
+        with _lock:
+            _stats["misses"] += 1
+            counts["misses"] += 1
+            _entries[key] = stored
+            while len(_entries) > _maxsize:
+                _entries.popitem(last=False)
+                _stats["evictions"] += 1
+        return result
+    return wrapper
+
+
+def _targets() -> list[dict]:
+    """### Returns the dicts of the cached modules and of the package"""
+    return [vars(i) for i in (*CACHED_MODULES, sys.modules[__package__])]
+
+
+def _wrappers() -> dict:
+    """### Returns the wrapper makers by id of the public functions of the cached modules"""
+    wrappers = {}
+    for module in (*CACHED_MODULES, sys.modules[__package__]):
+        for name, func in vars(module).items():
+            if inspect.isfunction(func) and not name.startswith("_") and func.__module__ == module.__name__:
+                wrappers[id(func)] = partial(_wrap, name=f"{module.__name__}.{name}")
+    return wrappers
+
+
+def enable_cache(maxsize: int = DEFAULT_MAXSIZE):
+    """### Puts the cache in front of the converters and color_utils functions
+
+    ### Args:
+        `maxsize` (int, optional): The max number of cached results. The least recently used ones are
+                                    evicted first. Defaults to DEFAULT_MAXSIZE.
+    """
+    global _maxsize  # pylint: disable=global-statement
+    if not isinstance(maxsize, int) or maxsize < 1:
+        raise ValueError("The size of the cache must be a positive integer!")
+    with _lock:
+        _maxsize = maxsize
+        while len(_entries) > _maxsize:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+        patching.patch(_LAYER, _targets, _wrappers)
+
+
+def disable_cache():
+    """### Restores the original functions (or the wrappers of enabled profilers) and empties the cache"""
+    with _lock:
+        patching.unpatch(_LAYER)
+        _entries.clear()
+
+
+def clear_cache():
+    """### Empties the cache and resets the statistics"""
+    with _lock:
+        _entries.clear()
+        _stats.update(dict.fromkeys(_stats, 0))
+        for counts in _functions.values():
+            counts.update(hits=0, misses=0)
+
+
+def cache_enabled() -> bool:
+    """### Whether the cache is currently in front of the functions"""
+    return patching.patched(_LAYER)
+
+
+def cache_info() -> dict:
+    """### Returns the statistics of the cache
+
+    ### Returns:
+        dict: hits, misses, evictions, skipped (uncacheable calls), currsize, maxsize and the
+            hits and misses of every function that was called
+    """
+    with _lock:
+        return {**_stats, "currsize": len(_entries), "maxsize": _maxsize,
+                "functions": {k: dict(v) for k, v in _functions.items() if v["hits"] or v["misses"]}}
+
+
+@contextmanager
+def cache(maxsize: int = DEFAULT_MAXSIZE):
+    """### Enables the cache for the duration of a with block"""
+    enabled = cache_enabled()
+    enable_cache(maxsize)
+    try:
+        yield
+    finally:
+        if not enabled:
+            disable_cache()
+
+
+def _cache_environment():
+    """### Enables the cache for the whole program if the environment variable is set"""
+    value = os.environ.get(CACHE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "no"):
+        return
+    enable_cache(DEFAULT_MAXSIZE if value in ("1", "true", "yes") else int(value))
+
+
+_cache_environment()
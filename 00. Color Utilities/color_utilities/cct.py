@@ -0,0 +1,201 @@
+"""This module contains correlated color temperature (CCT) calculations.
+Every function works on arrays so whole maps of image regions can be processed at once (e.g. for auto white balance).
+CCT and Duv are found with the method of Ohno (2013) using a finely sampled Planckian locus table computed from the
+bundled color matching functions.
+
+Reference 1 https://doi.org/10.1080/15502724.2014.839020 (Ohno, Practical Use and Calculation of CCT and Duv)
+Reference 2 https://en.wikipedia.org/wiki/Color_temperature
+"""
+# pylint: disable=invalid-name, protected-access
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+
+from . import batch_converters as bc
+from . import batch_transfer_functions as btf
+from . import xyz
+from .constants import Out1
+from .spectral import CMFS, WAVELENGTHS, daylight_xy
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The range and the ratio between consecutive temperatures of the Planckian locus table
+CCT_RANGE = (1000, 100000)
+CCT_STEP = 1.0025
+
+
+def _planck_uv(temperature, observer: str) -> np.ndarray:
+    """### Returns the CIE 1960 u, v coordinates of blackbodies with shape (..., 2)"""
+    temperature = np.asarray(temperature, dtype=np.float64)[..., None]
+    # Planck's law without the constants that cancel out in the chromaticity
+    spd = WAVELENGTHS ** -5.0 / np.expm1(1.4388e7 / (WAVELENGTHS * temperature))
+    X, Y, Z = np.moveaxis(spd @ CMFS[observer], -1, 0)
+    denominator = X + 15 * Y + 3 * Z
+    return np.stack((4 * X / denominator, 6 * Y / denominator), axis=-1)
+
+
+@lru_cache(maxsize=4)
+def planckian_table(observer: str = "2") -> tuple[np.ndarray, np.ndarray]:
+    """### Returns the Planckian locus table: temperatures (geometrically spaced by CCT_STEP in CCT_RANGE)
+    and their CIE 1960 u, v coordinates with shape (N, 2)"""
+    steps = int(np.ceil(np.log(CCT_RANGE[1] / CCT_RANGE[0]) / np.log(CCT_STEP)))
+    temperatures = CCT_RANGE[0] * CCT_STEP ** np.arange(steps + 1)
+    uv = _planck_uv(temperatures, observer)
+    temperatures.flags.writeable = uv.flags.writeable = False
+    return temperatures, uv
+
+
+def xy_to_uv(xy) -> np.ndarray:
+    """### Converts CIE 1931 x, y chromaticity coordinates with shape (..., 2) to CIE 1960 u, v"""
+    x, y = np.moveaxis(np.asarray(xy, dtype=np.float64), -1, 0)
+    denominator = -2 * x + 12 * y + 3
+    return np.stack((4 * x / denominator, 6 * y / denominator), axis=-1)
+
+
+def uv_to_xy(uv) -> np.ndarray:
+    """### Converts CIE 1960 u, v chromaticity coordinates with shape (..., 2) to CIE 1931 x, y"""
+    u, v = np.moveaxis(np.asarray(uv, dtype=np.float64), -1, 0)
+    denominator = 2 * u - 8 * v + 4
+    return np.stack((3 * u / denominator, 2 * v / denominator), axis=-1)
+
+
+def _nearest(uv: np.ndarray, table: np.ndarray, chunk: int) -> np.ndarray:
+    """### Returns the indices of the nearest table points. Distances are computed in chunks to bound memory use"""
+    res = np.empty(len(uv), dtype=np.intp)
+    for start in range(0, len(uv), chunk):
+        part = uv[start:start + chunk, None, :] - table
+        res[start:start + chunk] = np.einsum("ijk,ijk->ij", part, part).argmin(axis=1)
+    return res
+
+
+def xy_to_cct(xy, observer: str = "2", chunk: int = 2048) -> np.ndarray:
+    """### Calculates the correlated color temperature and Duv of chromaticity coordinates (Ohno 2013)
+
+    ### Args:
+        `xy` (array_like): CIE 1931 x, y values with shape (..., 2)
+        `observer` (str, optional): The observer of the Planckian locus. Either "2" or "10". Defaults to "2".
+        `chunk` (int, optional): How many colors are compared to the whole table at once. Defaults to 2048.
+
+    #### N/B: Duv is positive above the Planckian locus (greenish) and negative below it (pinkish). \
+        CCT is only defined close to the locus so colors with |Duv| > 0.05 or a CCT outside of CCT_RANGE \
+        get NaN values.
+
+    ### Returns:
+        numpy.ndarray: CCT (Kelvin) and Duv values with shape (..., 2)
+    """
+    observer = xyz.observer_name(observer)
+    temperatures, table = planckian_table(observer)
+    xy = np.asarray(xy, dtype=np.float64)
+    if xy.ndim == 0 or xy.shape[-1] != 2:
+        raise ValueError("Chromaticity coordinates must have shape (..., 2)!")
+    uv = xy_to_uv(xy).reshape(-1, 2)
+
+    index = np.clip(_nearest(uv, table, chunk), 1, len(table) - 2)
+    T0, T1, T2 = temperatures[index - 1], temperatures[index], temperatures[index + 1]
+    d0, d1, d2 = (np.linalg.norm(uv - table[index + i], axis=-1) for i in (-1, 0, 1))
+
+    # Triangular solution
+    l = np.linalg.norm(table[index + 1] - table[index - 1], axis=-1)
+    x = (d0 ** 2 - d2 ** 2 + l ** 2) / (2 * l)
+    CCT = T0 + (T2 - T0) * x / l
+    v_locus = table[index - 1, 1] + (table[index + 1, 1] - table[index - 1, 1]) * x / l
+    Duv = np.sqrt(np.maximum(d0 ** 2 - x ** 2, 0)) * np.sign(uv[:, 1] - v_locus)
+
+    # Parabolic solution, more accurate far from the locus
+    X = (T2 - T1) * (T0 - T2) * (T1 - T0)
+    a = (T0 * (d2 - d1) + T1 * (d0 - d2) + T2 * (d1 - d0)) / X
+    b = -(T0 ** 2 * (d2 - d1) + T1 ** 2 * (d0 - d2) + T2 ** 2 * (d1 - d0)) / X
+    c = -(d0 * (T2 - T1) * T1 * T2 + d1 * (T0 - T2) * T0 * T2 + d2 * (T1 - T0) * T0 * T1) / X
+    parabolic = -b / (2 * a)
+    far = np.abs(Duv) >= 0.002
+    CCT = np.where(far, parabolic, CCT)
+    Duv = np.where(far, np.sign(Duv) * (a * parabolic ** 2 + b * parabolic + c), Duv)
+
+    res = np.stack((CCT, Duv), axis=-1)
+    res[(CCT < CCT_RANGE[0]) | (CCT > CCT_RANGE[1]) | (np.abs(Duv) > 0.05)] = np.nan
+    return res.reshape(*xy.shape)
+
+
+def xyz_to_cct(XYZ, observer: str = "2", chunk: int = 2048) -> np.ndarray:
+    """### Calculates the correlated color temperature and Duv of X, Y, Z values with shape (..., 3)
+
+    ### Args:
+        `XYZ` (array_like): X, Y, Z values with shape (..., 3)
+        `observer` (str, optional): The observer of the Planckian locus. Either "2" or "10". Defaults to "2".
+        `chunk` (int, optional): How many colors are compared to the whole table at once. Defaults to 2048.
+
+    ### Returns:
+        numpy.ndarray: CCT (Kelvin) and Duv values with shape (..., 2)
+    """
+    XYZ = np.asarray(XYZ, dtype=np.float64)
+    return xy_to_cct(XYZ[..., :2] / XYZ.sum(axis=-1, keepdims=True), observer, chunk)
+
+
+def cct_to_xy(cct, duv=0.0, observer: str = "2", daylight: bool = False) -> np.ndarray:
+    """### Calculates the chromaticity coordinates of correlated color temperatures
+
+    ### Args:
+        `cct` (float | array_like): Correlated color temperatures in Kelvin
+        `duv` (float | array_like, optional): Distances from the Planckian locus. Defaults to 0.0.
+        `observer` (str, optional): The observer of the Planckian locus. Either "2" or "10". Defaults to "2".
+        `daylight` (bool, optional): Use the CIE daylight locus (4000-25000 K) instead of the Planckian locus.
+                                    Duv is ignored. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: CIE 1931 x, y values with shape (..., 2)
+    """
+    if daylight:
+        return daylight_xy(cct)
+    observer = xyz.observer_name(observer)
+    cct = np.asarray(cct, dtype=np.float64)
+    uv = _planck_uv(cct, observer)
+    # Offset perpendicular to the locus. The tangent points to higher temperatures
+    tangent = _planck_uv(cct + 0.01, observer) - uv
+    tangent /= np.linalg.norm(tangent, axis=-1, keepdims=True)
+    normal = np.stack((tangent[..., 1], -tangent[..., 0]), axis=-1)
+    return uv_to_xy(uv + normal * np.asarray(duv, dtype=np.float64)[..., None])
+
+
+def cct_to_xyz(cct, duv=0.0, observer: str = "2", daylight: bool = False) -> np.ndarray:
+    """### Calculates whitepoints (X, Y, Z with Y = 1 as in xyz.ILLUMINANTS) of correlated color temperatures
+
+    ### Args:
+        `cct` (float | array_like): Correlated color temperatures in Kelvin
+        `duv` (float | array_like, optional): Distances from the Planckian locus. Defaults to 0.0.
+        `observer` (str, optional): The observer of the Planckian locus. Either "2" or "10". Defaults to "2".
+        `daylight` (bool, optional): Use the CIE daylight locus instead of the Planckian locus. Defaults to False.
+
+    ### Returns:
+        numpy.ndarray: X, Y, Z values with shape (..., 3)
+    """
+    x, y = np.moveaxis(cct_to_xy(cct, duv, observer, daylight), -1, 0)
+    return np.stack((x / y, np.ones_like(x), (1 - x - y) / y), axis=-1)
+
+
+def kelvin_to_rgb(
+    cct,
+    duv=0.0,
+    color_space: str = "sRGB",
+    depth: int = 8,
+    output: Enum = Out1.ROUND) -> np.ndarray:
+    """### Returns preview colors of light sources with given correlated color temperatures
+
+    ### Args:
+        `cct` (float | array_like): Correlated color temperatures in Kelvin
+        `duv` (float | array_like, optional): Distances from the Planckian locus. Defaults to 0.0.
+        `color_space` (str, optional): The RGB color space of the preview colors. Defaults to "sRGB".
+        `depth` (int, optional): The bit depth of the output. Defaults to 8.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.ROUND.
+
+    #### N/B: The colors are not adapted to the whitepoint of the color space (6504 K is white in sRGB). \
+        They are scaled so the brightest channel is 1 and colors outside of the gamut are clipped.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with shape (..., 3)
+    """
+    color_space = xyz.color_space_name(color_space)
+    RGB = cct_to_xyz(cct, duv) @ np.linalg.inv(xyz._rgb_to_xyz_matrix(color_space)).T
+    RGB = np.clip(RGB / RGB.max(axis=-1, keepdims=True), 0, 1)
+    return bc.return_rgb_batch(btf.get_transfer_function(color_space)(RGB), output, depth, inplace=True)
@@ -660,8 +660,22 @@ color_spaces = {
         }, #+ Calculation should be the same as override
         "transfer function": tf.rec2020},   # Color component transfer function: C'= C1/2.4 | gamma = 2.4
 
-    "__REC. 2100": {  # Source: https://en.wikipedia.org/wiki/Rec._2100
-        "illuminant": "D65",  # Source: https://en.wikipedia.org/wiki/RGB_color_spaces (UHDTV)
+    "REC. 2100 PQ": {  # Source: https://en.wikipedia.org/wiki/Rec._2100
+        "illuminant": "D65",  # Same primaries as Rec. 2020
+        "primaries": {
+            "xr": 0.708, "yr": 0.292,
+            "xg": 0.17,  "yg": 0.797,
+            "xb": 0.131, "yb": 0.046,
+        },
+        "whitepoint": (0.3127, 0.329),
+        "override_matrix": {
+            "to_rgb": ((1.71665119, -0.35567078, -0.25336628), (-0.66668435, 1.61648124, 0.01576855), (0.01763986, -0.04277061, 0.94210312)),
+            "to_xyz": ((0.63695805, 0.1446169, 0.16888098), (0.26270021, 0.67799807, 0.05930172), (0, 0.02807269, 1.06098506))
+        }, #+ Calculation should be the same as override
+        "transfer function": tf.pq},  # SMPTE ST 2084. Linear 1.0 = 10000 cd/m2
+
+    "REC. 2100 HLG": {  # Source: https://en.wikipedia.org/wiki/Rec._2100
+        "illuminant": "D65",  # Same primaries as Rec. 2020
         "primaries": {
             "xr": 0.708, "yr": 0.292,
             "xg": 0.17,  "yg": 0.797,
@@ -672,9 +686,9 @@ color_spaces = {
             "to_rgb": ((1.71665119, -0.35567078, -0.25336628), (-0.66668435, 1.61648124, 0.01576855), (0.01763986, -0.04277061, 0.94210312)),
             "to_xyz": ((0.63695805, 0.1446169, 0.16888098), (0.26270021, 0.67799807, 0.05930172), (0, 0.02807269, 1.06098506))
         }, #+ Calculation should be the same as override
-        "gamma": 2.4}, #= Rec. 2100 defines two sets of HDR transfer functions which are perceptual quantization (PQ) and hybrid log-gamma
-                        # (HLG).[3] HLG is supported in Rec. 2100 with a nominal peak luminance of 1,000 cd/m2 and a system gamma value
-                        # that can be adjusted depending on background luminance.
+        "transfer function": tf.hlg},  # ARIB STD-B67 OETF. HLG is supported in Rec. 2100 with a nominal peak
+                                       # luminance of 1,000 cd/m2 and a system gamma value that can be adjusted
+                                       # depending on background luminance (the OOTF isn't applied).
 
     "REDCOLOR": {
         "illuminant": "D65",
@@ -978,7 +992,9 @@ color_spaces.update(
         "ITU 709": color_spaces["REC. 709"],
         "BT.2020": color_spaces["REC. 2020"],
         "ITU-R BT.2020": color_spaces["REC. 2020"],
-        "__BT.2100": color_spaces["__REC. 2100"],
-        "__ITU-R BT.2100": color_spaces["__REC. 2100"],
+        "BT.2100 PQ": color_spaces["REC. 2100 PQ"],
+        "ITU-R BT.2100 PQ": color_spaces["REC. 2100 PQ"],
+        "BT.2100 HLG": color_spaces["REC. 2100 HLG"],
+        "ITU-R BT.2100 HLG": color_spaces["REC. 2100 HLG"],
     }
 )
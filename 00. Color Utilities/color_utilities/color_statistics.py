@@ -0,0 +1,404 @@
+"""This module contains streaming color statistics for collections that don't fit in memory.
+The accumulators take any number of chunks of colors one after another and never keep the colors themselves:
+- `MomentAccumulator` keeps the running mean, variance and covariance (Welford, Chan et al. for merging)
+- `QuantileAccumulator` keeps a t-digest per channel for the approximate median and percentiles
+- `HistogramAccumulator` keeps a fixed-bin histogram of all channels together (3D for colors)
+- `ColorStatistics` feeds one chunk to all of them and converts it to the statistics model only once
+
+Accumulators of the same kind (e.g. filled by different workers) can be merged and pickled.
+
+Reference 1 https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Parallel_algorithm
+Reference 2 https://arxiv.org/abs/1902.04023 (Dunning, Computing Extremely Accurate Quantiles Using t-Digests)
+"""
+# pylint: disable=invalid-name, protected-access
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+from . import batch_converters as bc
+from . import batch_transfer_functions as btf
+from . import oklab
+
+#= The models statistics can be computed in and the value ranges of their channels (used by the histograms)
+MODELS = {
+    "rgb": (lambda colors, depth: bc._colors_array(colors, depth), ((0, 1),) * 3),
+    "linear": (lambda colors, depth: btf.srgb(bc._colors_array(colors, depth), decode=True), ((0, 1),) * 3),
+    "oklab": (oklab.rgb_to_oklab_batch, ((0, 1), (-0.4, 0.4), (-0.4, 0.4))),
+}
+
+
+def _converter(model: str | Callable | None) -> Callable:
+    """### Returns the function converting chunks of colors to (N, C) values of a model"""
+    if model is None:
+        return lambda values, depth: np.asarray(values, dtype=np.float64)
+    if callable(model):
+        return lambda colors, depth: np.asarray(model(colors), dtype=np.float64)
+    if model not in MODELS:
+        raise ValueError(f"Model can only be one of the following: {tuple(MODELS)}, a function or None!")
+    return MODELS[model][0]
+
+
+class _Accumulator(ABC):
+    """### The conversion of input chunks shared by all accumulators"""
+
+    def __init__(self, model: str | Callable | None, depth: int):
+        self.model = model
+        self.depth = depth
+        self._convert = _converter(model)
+        self.count = 0
+
+    def __getstate__(self):
+        # Lambdas can't be pickled, the converter is looked up again when unpickling
+        return {k: v for k, v in vars(self).items() if k != "_convert"}
+
+    def __setstate__(self, state: dict):
+        vars(self).update(state)
+        self._convert = _converter(self.model)
+
+    def _values(self, colors) -> np.ndarray:
+        """### Returns a chunk converted to the model as an (N, C) float array"""
+        values = np.asarray(self._convert(colors, self.depth), dtype=np.float64)
+        if values.ndim == 0:
+            raise ValueError("Values must have shape (..., C)!")
+        return values.reshape(-1, values.shape[-1]) if values.ndim != 1 else values[:, None]
+
+    def _check_merge(self, other: "_Accumulator"):
+        """### Raises an error if two accumulators can't be merged"""
+        if type(other) is not type(self):
+            raise TypeError(f"Only a {type(self).__name__} can be merged into a {type(self).__name__}!")
+        if other.model != self.model:
+            raise ValueError("Accumulators of different models can't be merged!")
+
+    def update(self, colors):
+        """### Adds a chunk of colors (anything the model accepts, e.g. R, G, B triples with shape (..., 3))"""
+        self._add(self._values(colors))
+        return self
+
+    @abstractmethod
+    def _add(self, values: np.ndarray):
+        """### Adds a chunk of values converted to the model with shape (N, C)"""
+
+
+class MomentAccumulator(_Accumulator):
+    """### Running count, mean, variance, covariance, min and max of every channel
+
+    ### Args:
+        `model` (str | Callable | None, optional): One of `MODELS`, a function converting a chunk to values with
+                                    shape (..., C) or None to take the values as they are. Defaults to "rgb".
+        `depth` (int, optional): The bit depth of integer input colors. Defaults to 8.
+    """
+
+    def __init__(self, model: str | Callable | None = "rgb", depth: int = 8):
+        super().__init__(model, depth)
+        self._mean = None
+        self._comoment = None
+        self.min = self.max = None
+
+    def _combine(self, count: int, mean: np.ndarray, comoment: np.ndarray, low: np.ndarray, high: np.ndarray):
+        """### Combines the moments of another set of values with the current ones (Chan et al.)"""
+        if not count:
+            return
+        if not self.count:
+            self.count, self._mean, self._comoment, self.min, self.max = count, mean, comoment, low, high
+            return
+        if len(mean) != len(self._mean):
+            raise ValueError("Values must have the same number of channels as the ones before!")
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * (count / total)
+        self._comoment = self._comoment + comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.min, self.max = np.minimum(self.min, low), np.maximum(self.max, high)
+        self.count = total
+
+    def _add(self, values: np.ndarray):
+        if not len(values):
+            return
+        mean = values.mean(axis=0)
+        centered = values - mean
+        self._combine(len(values), mean, centered.T @ centered, values.min(axis=0), values.max(axis=0))
+
+    def merge(self, *others: "MomentAccumulator"):
+        """### Adds the moments of other accumulators to this one"""
+        for other in others:
+            self._check_merge(other)
+            self._combine(other.count, other._mean, other._comoment, other.min, other.max)
+        return self
+
+    @property
+    def mean(self) -> np.ndarray:
+        """### The mean of every channel"""
+        if not self.count:
+            raise ValueError("No values were added yet!")
+        return self._mean.copy()
+
+    def covariance(self, ddof: int = 0) -> np.ndarray:
+        """### Returns the covariance matrix of the channels (`ddof` = 1 for the sample covariance)"""
+        if self.count <= ddof:
+            raise ValueError("Not enough values for the covariance!")
+        return self._comoment / (self.count - ddof)
+
+    def variance(self, ddof: int = 0) -> np.ndarray:
+        """### Returns the variance of every channel (`ddof` = 1 for the sample variance)"""
+        return np.diag(self.covariance(ddof)).copy()
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        """### Returns the standard deviation of every channel (`ddof` = 1 for the sample one)"""
+        return np.sqrt(self.variance(ddof))
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float) -> tuple[np.ndarray, np.ndarray]:
+    """### Merges sorted centroids so every group covers at most one unit of the k1 scale function of t-digest"""
+    cumulative = np.cumsum(weights)
+    q = (cumulative - weights / 2) / cumulative[-1]
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+    groups = np.floor(k - k[0]).astype(np.intp)
+    # Groups are consecutive so the merged centroids stay sorted
+    new_weights = np.bincount(groups, weights)
+    used = new_weights > 0
+    return (np.bincount(groups, weights * means)[used] / new_weights[used]), new_weights[used]
+
+
+class QuantileAccumulator(_Accumulator):
+    """### Approximate median and percentiles of every channel kept in t-digests
+
+    ### Args:
+        `model` (str | Callable | None, optional): One of `MODELS`, a function converting a chunk to values with
+                                    shape (..., C) or None to take the values as they are. Defaults to "rgb".
+        `depth` (int, optional): The bit depth of integer input colors. Defaults to 8.
+        `compression` (float, optional): The accuracy of the digests. They keep about `compression` / 2
+                                    centroids per channel. Defaults to 200.
+
+    #### N/B: The error is smallest at the extremes and largest around the median, typically well below \
+        1% of the spread of the values for `compression` = 200.
+    """
+
+    def __init__(self, model: str | Callable | None = "rgb", depth: int = 8, compression: float = 200):
+        super().__init__(model, depth)
+        if compression < 10:
+            raise ValueError("Compression must be at least 10!")
+        self.compression = compression
+        #* Sorted centroid means and weights of every channel
+        self._centroids = None
+        self.min = self.max = None
+
+    def _combine(self, centroids: list, low: np.ndarray, high: np.ndarray, count: int):
+        """### Merges centroids of every channel into the digests"""
+        if self._centroids is None:
+            self._centroids = [(np.empty(0), np.empty(0))] * len(centroids)
+            self.min, self.max = low, high
+        elif len(centroids) != len(self._centroids):
+            raise ValueError("Values must have the same number of channels as the ones before!")
+        else:
+            self.min, self.max = np.minimum(self.min, low), np.maximum(self.max, high)
+        merged = []
+        for (means, weights), (new_means, new_weights) in zip(self._centroids, centroids):
+            means, weights = np.concatenate((means, new_means)), np.concatenate((weights, new_weights))
+            order = np.argsort(means, kind="stable")
+            merged.append(_compress(means[order], weights[order], self.compression))
+        self._centroids = merged
+        self.count += count
+
+    def _add(self, values: np.ndarray):
+        if len(values):
+            self._combine([(i, np.ones(len(i))) for i in values.T], values.min(axis=0), values.max(axis=0),
+                          len(values))
+
+    def merge(self, *others: "QuantileAccumulator"):
+        """### Adds the digests of other accumulators to this one"""
+        for other in others:
+            self._check_merge(other)
+            if other.count:
+                self._combine(other._centroids, other.min, other.max, other.count)
+        return self
+
+    def quantile(self, q: float | Iterable) -> np.ndarray:
+        """### Returns the approximate quantiles (in range 0-1) of every channel
+
+        ### Returns:
+            numpy.ndarray: Values with shape (C,) for a single quantile or (len(q), C) for many
+        """
+        if not self.count:
+            raise ValueError("No values were added yet!")
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be in range 0-1!")
+        res = []
+        for (means, weights), low, high in zip(self._centroids, self.min, self.max):
+            # Centroids sit at the middle of their weight, the extremes are known exactly
+            cumulative = np.cumsum(weights) - weights / 2
+            res.append(np.interp(q * self.count, np.r_[0, cumulative, self.count], np.r_[low, means, high]))
+        return np.stack(res, axis=-1)
+
+    def percentile(self, p: float | Iterable) -> np.ndarray:
+        """### Returns the approximate percentiles (in range 0-100) of every channel"""
+        return self.quantile(np.asarray(p, dtype=np.float64) / 100)
+
+    @property
+    def median(self) -> np.ndarray:
+        """### The approximate median of every channel"""
+        return self.quantile(0.5)
+
+
+class HistogramAccumulator(_Accumulator):
+    """### A fixed-bin histogram of all channels together (a 3D histogram of colors)
+
+    ### Args:
+        `model` (str | Callable | None, optional): One of `MODELS`, a function converting a chunk to values with
+                                    shape (..., C) or None to take the values as they are. Defaults to "rgb".
+        `depth` (int, optional): The bit depth of integer input colors. Defaults to 8.
+        `bins` (int | tuple, optional): The number of bins of every channel or of each one. Defaults to 16.
+        `ranges` (tuple, optional): (min, max) of every channel. Values outside are counted in `outside`.
+                                    Defaults to the ranges of the model (required for other models).
+    """
+
+    def __init__(
+        self,
+        model: str | Callable | None = "rgb",
+        depth: int = 8,
+        bins: int | tuple = 16,
+        ranges: tuple | None = None):
+        super().__init__(model, depth)
+        if ranges is None:
+            if not isinstance(model, str):
+                raise ValueError("Ranges are required for models other than the predefined ones!")
+            ranges = MODELS[model][1]
+        self.ranges = np.array(ranges, dtype=np.float64).reshape(-1, 2)
+        if np.any(self.ranges[:, 1] <= self.ranges[:, 0]):
+            raise ValueError("Every range must be (min, max) with min < max!")
+        self.bins = np.broadcast_to(np.asarray(bins, dtype=np.intp), len(self.ranges)).copy()
+        if np.any(self.bins < 1):
+            raise ValueError("Every channel must have at least 1 bin!")
+        self.counts = np.zeros(tuple(self.bins), dtype=np.int64)
+        self.outside = 0
+
+    def _add(self, values: np.ndarray):
+        if values.shape[1] != len(self.bins):
+            raise ValueError(f"Values must have {len(self.bins)} channels like the ranges!")
+        low, high = self.ranges[:, 0], self.ranges[:, 1]
+        inside = np.all((values >= low) & (values <= high), axis=1)
+        # The max of the range belongs to the last bin like in numpy.histogram
+        index = ((values[inside] - low) * (self.bins / (high - low))).astype(np.intp)
+        np.minimum(index, self.bins - 1, out=index)
+        flat = np.ravel_multi_index(tuple(index.T), tuple(self.bins))
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.count += len(values)
+        self.outside += len(values) - int(inside.sum())
+
+    def merge(self, *others: "HistogramAccumulator"):
+        """### Adds the counts of other histograms with the same bins and ranges to this one"""
+        for other in others:
+            self._check_merge(other)
+            if not (np.array_equal(other.bins, self.bins) and np.array_equal(other.ranges, self.ranges)):
+                raise ValueError("Only histograms with the same bins and ranges can be merged!")
+            self.counts += other.counts
+            self.count += other.count
+            self.outside += other.outside
+        return self
+
+    def edges(self) -> list[np.ndarray]:
+        """### Returns the bin edges of every channel"""
+        return [np.linspace(low, high, n + 1) for (low, high), n in zip(self.ranges, self.bins)]
+
+    def centers(self) -> list[np.ndarray]:
+        """### Returns the bin centers of every channel"""
+        return [(i[:-1] + i[1:]) / 2 for i in self.edges()]
+
+    def density(self) -> np.ndarray:
+        """### Returns the share of the counted values in every bin"""
+        total = self.counts.sum()
+        return self.counts / total if total else self.counts.astype(np.float64)
+
+    def most_common(self, n: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """### Returns the centers (shape (n, C)) and counts of the `n` fullest bins (the dominant colors)"""
+        flat = self.counts.ravel()
+        top = np.argsort(flat, kind="stable")[::-1][:n]
+        top = top[flat[top] > 0]
+        index = np.unravel_index(top, self.counts.shape)
+        return np.stack([c[i] for c, i in zip(self.centers(), index)], axis=-1), flat[top]
+
+
+class ColorStatistics(_Accumulator):
+    """### Moments, quantiles and a histogram of a collection of colors, updated chunk by chunk
+
+    ### Args:
+        `model` (str | Callable | None, optional): One of `MODELS`, a function converting a chunk to values with
+                                    shape (..., C) or None to take the values as they are. Defaults to "rgb".
+        `depth` (int, optional): The bit depth of integer input colors. Defaults to 8.
+        `compression` (float, optional): The accuracy of the quantile digests. Defaults to 200.
+        `bins` (int | tuple | None, optional): The bins of the histogram. None skips the histogram. Defaults to 16.
+        `ranges` (tuple, optional): (min, max) of every channel for the histogram. Defaults to the model ranges.
+    """
+
+    def __init__(
+        self,
+        model: str | Callable | None = "rgb",
+        depth: int = 8,
+        compression: float = 200,
+        bins: int | tuple | None = 16,
+        ranges: tuple | None = None):
+        super().__init__(model, depth)
+        self.moments = MomentAccumulator(model, depth)
+        self.quantiles = QuantileAccumulator(model, depth, compression)
+        self.histogram = None if bins is None else HistogramAccumulator(model, depth, bins, ranges)
+
+    def _parts(self) -> list[_Accumulator]:
+        return [i for i in (self.moments, self.quantiles, self.histogram) if i is not None]
+
+    def _add(self, values: np.ndarray):
+        for part in self._parts():
+            part._add(values)
+        self.count += len(values)
+
+    def merge(self, *others: "ColorStatistics"):
+        """### Adds the statistics of other collections to this one"""
+        for other in others:
+            self._check_merge(other)
+            if (self.histogram is None) != (other.histogram is None):
+                raise ValueError("Statistics with and without a histogram can't be merged!")
+            for part, other_part in zip(self._parts(), other._parts()):
+                part.merge(other_part)
+            self.count += other.count
+        return self
+
+    @property
+    def mean(self) -> np.ndarray:
+        """### The mean of every channel"""
+        return self.moments.mean
+
+    @property
+    def std(self) -> np.ndarray:
+        """### The standard deviation of every channel"""
+        return self.moments.std()
+
+    @property
+    def median(self) -> np.ndarray:
+        """### The approximate median of every channel"""
+        return self.quantiles.median
+
+    def percentile(self, p: float | Iterable) -> np.ndarray:
+        """### Returns the approximate percentiles (in range 0-100) of every channel"""
+        return self.quantiles.percentile(p)
+
+    def summary(self, percentiles: tuple = (5, 25, 50, 75, 95)) -> dict:
+        """### Returns count, mean, std, min, max and the percentiles of every channel as a dict"""
+        res = {"count": self.count, "mean": self.mean, "std": self.std, "min": self.moments.min,
+               "max": self.moments.max}
+        res |= {f"p{p:g}": value for p, value in zip(percentiles, self.percentile(percentiles))}
+        return res
+
+
+def collect_statistics(chunks: Iterable, **kwargs) -> ColorStatistics:
+    """### Returns the statistics of all chunks of colors of an iterable (e.g. a generator reading files)
+
+    ### Args:
+        `chunks` (Iterable): Chunks of colors, each one anything the model accepts
+        `kwargs`: Passed to `ColorStatistics`
+
+    ### Returns:
+        ColorStatistics: The accumulated statistics
+    """
+    stats = ColorStatistics(**kwargs)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
@@ -6,6 +6,9 @@ from . import internal_helpers as ih
 from . import converters as co
 from .constants import Out1, Out2, Out3, Color
 
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
 
 def get_color_brightness(
     *color: int | float | str | tuple | list,
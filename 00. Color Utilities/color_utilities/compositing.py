@@ -0,0 +1,234 @@
+"""This module contains vectorized alpha compositing for RGBA arrays.
+It covers the Porter-Duff operators and the common separable blend modes (multiply, screen, overlay, ...)
+as defined in the W3C Compositing and Blending specification. Colors can be given with straight or
+premultiplied alpha and can be composited in linear light using the sRGB transfer function.
+
+Reference 1 https://www.w3.org/TR/compositing-1/
+Reference 2 https://keithp.com/~keithp/porterduff/p253-porter.pdf
+"""
+# pylint: disable=invalid-name
+import numpy as np
+
+from . import batch_transfer_functions as btf
+from .buffers import _buffer_view
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= Porter-Duff operators as (Fa, Fb) factors of (alpha_src, alpha_dst)
+#= Result (premultiplied): co = Fa * cs + Fb * cd | ao = Fa * as + Fb * ad
+PORTER_DUFF = {
+    "clear":    lambda a_s, a_d: (0, 0),
+    "src":      lambda a_s, a_d: (1, 0),
+    "dst":      lambda a_s, a_d: (0, 1),
+    "src_over": lambda a_s, a_d: (1, 1 - a_s),
+    "dst_over": lambda a_s, a_d: (1 - a_d, 1),
+    "src_in":   lambda a_s, a_d: (a_d, 0),
+    "dst_in":   lambda a_s, a_d: (0, a_s),
+    "src_out":  lambda a_s, a_d: (1 - a_d, 0),
+    "dst_out":  lambda a_s, a_d: (0, 1 - a_s),
+    "src_atop": lambda a_s, a_d: (a_d, 1 - a_s),
+    "dst_atop": lambda a_s, a_d: (1 - a_d, a_s),
+    "xor":      lambda a_s, a_d: (1 - a_d, 1 - a_s),
+    "plus":     lambda a_s, a_d: (1, 1),
+}
+
+#= Separable blend modes B(cb, cs) working on straight (not premultiplied) colors
+BLEND_MODES = {
+    "normal":     lambda cb, cs: cs,
+    "multiply":   lambda cb, cs: cb * cs,
+    "screen":     lambda cb, cs: cb + cs - cb * cs,
+    "overlay":    lambda cb, cs: np.where(cb <= 0.5, 2 * cs * cb, 2 * (cb + cs - cb * cs) - 1),
+    "darken":     np.minimum,
+    "lighten":    np.maximum,
+    "difference": lambda cb, cs: np.abs(cb - cs),
+}
+
+
+def premultiply(RGBA: np.ndarray) -> np.ndarray:
+    """### Multiplies the R, G, B values of normalized RGBA colors by their alpha
+
+    ### Args:
+        `RGBA` (numpy.ndarray): Normalized colors with straight alpha and shape (..., 4)
+
+    ### Returns:
+        numpy.ndarray: A new array with premultiplied alpha
+    """
+    res = np.array(RGBA, dtype=np.float64)
+    res[..., :3] *= res[..., 3:]
+    return res
+
+
+def unpremultiply(RGBA: np.ndarray) -> np.ndarray:
+    """### Divides the R, G, B values of normalized premultiplied RGBA colors by their alpha. Fully transparent
+    colors become black
+
+    ### Args:
+        `RGBA` (numpy.ndarray): Normalized colors with premultiplied alpha and shape (..., 4)
+
+    ### Returns:
+        numpy.ndarray: A new array with straight alpha
+    """
+    res = np.array(RGBA, dtype=np.float64)
+    alpha = res[..., 3:]
+    res[..., :3] = np.divide(res[..., :3], alpha, out=np.zeros_like(res[..., :3]), where=alpha > 0)
+    return res
+
+
+def _normalized(RGBA, depth: int) -> np.ndarray:
+    """### Returns RGBA values as a normalized float array. Integer values are divided by the max value for depth"""
+    RGBA = np.asarray(_buffer_view(RGBA, 4))
+    if RGBA.ndim == 0 or RGBA.shape[-1] != 4:
+        raise ValueError("Colors must be an array of R, G, B, A values with shape (..., 4)!")
+    if RGBA.dtype.kind in "iub":
+        return RGBA / (2 ** depth - 1)
+    if RGBA.dtype.kind != "f":
+        raise TypeError("Colors must be an array of integer or float values!")
+    return RGBA.astype(np.float64)
+
+
+def _prepare(RGBA, depth: int, premultiplied: bool, linear: bool) -> np.ndarray:
+    """### Converts input RGBA to the premultiplied (linear light if requested) working form"""
+    RGBA = _normalized(RGBA, depth)
+    if not linear:
+        return RGBA if premultiplied else premultiply(RGBA)
+    RGBA = unpremultiply(RGBA) if premultiplied else RGBA.copy()
+    RGBA[..., :3] = btf.srgb(RGBA[..., :3], decode=True)
+    return premultiply(RGBA)
+
+
+def _finish(RGBA: np.ndarray, premultiplied: bool, linear: bool) -> np.ndarray:
+    """### Converts the premultiplied working form back to the requested alpha and encoding"""
+    if not linear:
+        return RGBA if premultiplied else unpremultiply(RGBA)
+    RGBA = unpremultiply(RGBA)
+    RGBA[..., :3] = btf.srgb(RGBA[..., :3])
+    return premultiply(RGBA) if premultiplied else RGBA
+
+
+def _composite(src: np.ndarray, dst: np.ndarray, operator: str, blend_mode: str, opacity: float) -> np.ndarray:
+    """### Composites two premultiplied arrays. The blend mode is applied before the Porter-Duff operator"""
+    if opacity != 1:
+        src = src * opacity
+    a_s, a_d = src[..., 3:], dst[..., 3:]
+    cs = src[..., :3]
+    if blend_mode != "normal":
+        # cs' = (1 - ad) * Cs + ad * B(Cb, Cs) with straight colors, premultiplied by as again
+        Cs = np.divide(cs, a_s, out=np.zeros_like(cs), where=a_s > 0)
+        Cb = np.divide(dst[..., :3], a_d, out=np.zeros_like(cs), where=a_d > 0)
+        cs = a_s * ((1 - a_d) * Cs + a_d * np.clip(BLEND_MODES[blend_mode](Cb, Cs), 0, 1))
+
+    Fa, Fb = PORTER_DUFF[operator](a_s, a_d)
+    res = np.empty(np.broadcast_shapes(src.shape, dst.shape))
+    res[..., :3] = Fa * cs + Fb * dst[..., :3]
+    res[..., 3:] = Fa * a_s + Fb * a_d
+    return res
+
+
+def _check_modes(operator: str, blend_mode: str) -> tuple[str, str]:
+    """### Makes sure the operator and blend mode are supported"""
+    operator, blend_mode = operator.strip().lower(), blend_mode.strip().lower()
+    if operator not in PORTER_DUFF:
+        raise ValueError(f"Operator can only be one of the following: {tuple(PORTER_DUFF)}")
+    if blend_mode not in BLEND_MODES:
+        raise ValueError(f"Blend mode can only be one of the following: {tuple(BLEND_MODES)}")
+    return operator, blend_mode
+
+
+def _output(RGBA: np.ndarray, dtype: np.dtype, depth: int) -> np.ndarray:
+    """### Returns the result in the data type of the input. Integers are rounded in the range of the bit depth"""
+    if dtype.kind in "iub":
+        return np.rint(np.clip(RGBA, 0, 1) * (2 ** depth - 1)).astype(dtype)
+    return RGBA
+
+
+def composite(
+    src,
+    dst,
+    operator: str = "src_over",
+    blend_mode: str = "normal",
+    opacity: float = 1.0,
+    premultiplied: bool = False,
+    linear: bool = False,
+    depth: int = 8) -> np.ndarray:
+    """### Composites RGBA colors (or whole images) of a source layer over a destination layer
+
+    ### Args:
+        `src` (array_like): The source (top) RGBA colors with shape (..., 4)
+        `dst` (array_like): The destination (bottom) RGBA colors. Must be broadcastable with src.
+        `operator` (str, optional): A Porter-Duff operator. Defaults to "src_over".
+        *     clear, src, dst, src_over, dst_over, src_in, dst_in, src_out, dst_out, src_atop, dst_atop, xor, plus
+        `blend_mode` (str, optional): How the colors of both layers are mixed where they overlap. Defaults to "normal".
+        *     normal, multiply, screen, overlay, darken, lighten, difference
+        `opacity` (float, optional): Multiplies the alpha of the source layer. Defaults to 1.0.
+        `premultiplied` (bool, optional): Whether input and output colors have premultiplied alpha. Defaults to False.
+        `linear` (bool, optional): Composite in linear light by decoding and encoding the colors with the sRGB
+                                    transfer function. Defaults to False.
+        `depth` (int, optional): The bit depth of integer input and output values. Defaults to 8.
+
+    #### N/B: Integer inputs are treated as values in range 0-(max value for bit depth) and the result is returned \
+        in the integer type of dst. Float inputs are treated as normalized values.
+
+    ### Returns:
+        numpy.ndarray: The composited RGBA colors
+    """
+    operator, blend_mode = _check_modes(operator, blend_mode)
+    dst = np.asarray(_buffer_view(dst, 4))
+    dtype = dst.dtype
+    res = _composite(_prepare(src, depth, premultiplied, linear), _prepare(dst, depth, premultiplied, linear),
+                     operator, blend_mode, opacity)
+    return _output(_finish(res, premultiplied, linear), dtype, depth)
+
+
+def composite_layers(
+    layers: list,
+    operator: str | list = "src_over",
+    blend_mode: str | list = "normal",
+    opacity: float | list = 1.0,
+    premultiplied: bool = False,
+    linear: bool = False,
+    depth: int = 8,
+    tile_rows: int = 256,
+    out: np.ndarray = None) -> np.ndarray:
+    """### Composites a stack of RGBA images from bottom to top, tile by tile
+
+    Only `tile_rows` rows of every layer are converted to floats at a time so large layer stacks
+    (including memory mapped ones) can be composited without holding float copies of every layer in memory.
+
+    ### Args:
+        `layers` (list): RGBA images with shape (H, W, 4) (or buffers of RGBA pixels) ordered from bottom to top
+        `operator` (str | list, optional): A Porter-Duff operator or one per layer above the bottom one.
+                                            Defaults to "src_over".
+        `blend_mode` (str | list, optional): A blend mode or one per layer above the bottom one. Defaults to "normal".
+        `opacity` (float | list, optional): An opacity or one per layer above the bottom one. Defaults to 1.0.
+        `premultiplied` (bool, optional): Whether input and output colors have premultiplied alpha. Defaults to False.
+        `linear` (bool, optional): Composite in linear light using the sRGB transfer function. Defaults to False.
+        `depth` (int, optional): The bit depth of integer input and output values. Defaults to 8.
+        `tile_rows` (int, optional): How many rows are processed at once. Defaults to 256.
+        `out` (numpy.ndarray, optional): An array to write the result to. Defaults to None (a new array).
+
+    ### Returns:
+        numpy.ndarray: The composited image in the data type of the bottom layer (or of `out`)
+    """
+    if len(layers) < 2:
+        raise ValueError("At least 2 layers are needed for compositing!")
+    count = len(layers) - 1
+    operators = [operator] * count if isinstance(operator, str) else list(operator)
+    blend_modes = [blend_mode] * count if isinstance(blend_mode, str) else list(blend_mode)
+    opacities = list(opacity) if isinstance(opacity, (list, tuple)) else [opacity] * count
+    if not len(operators) == len(blend_modes) == len(opacities) == count:
+        raise ValueError("There must be one operator, blend mode and opacity for every layer above the bottom one!")
+    modes = [_check_modes(i, j) for i, j in zip(operators, blend_modes)]
+    layers = [np.asarray(_buffer_view(i, 4)) for i in layers]
+
+    bottom = layers[0]
+    if out is None:
+        out = np.empty(bottom.shape, dtype=bottom.dtype)
+
+    for row in range(0, bottom.shape[0], tile_rows):
+        tile = slice(row, row + tile_rows)
+        res = _prepare(bottom[tile], depth, premultiplied, linear)
+        for layer, (op, mode), alpha in zip(layers[1:], modes, opacities):
+            res = _composite(_prepare(layer[tile], depth, premultiplied, linear), res, op, mode, alpha)
+        out[tile] = _output(_finish(res, premultiplied, linear), out.dtype, depth)
+    return out
@@ -11,6 +11,9 @@ from . import xyz
 from .color_spaces import color_spaces as cs
 from .constants import Color, Color_out1, Color_out_hsw, Color_geo, Out1, Out2, Out3
 
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
 
 def rgb_to_web_safe(*color: Color, output: Enum = Out1.ROUND) -> Color_out1:
     """### Converts an 8-bit RGB color to its web safe version
@@ -984,7 +987,7 @@ def rgb_to_xyz(
     matrix = cs["SRGB"]["override_matrix"]["to_xyz"]
 
     # Get the dot product of the matrix and the RGB colors
-    X, Y, Z = ((R * matrix[i][0]) + (G * matrix[i][1]) + (B * matrix[i][2]) for i in range(3))
+    X, Y, Z = ih.apply_matrix(matrix, (R, G, B))
 
     # Do chromatic adaptation if the output illuminant or observer aren't the same as the ones of the matrix
     if illuminant != "D65" or observer != "2":
@@ -1092,7 +1095,7 @@ def rgb_to_xyz_alt(
         # Generate a conversion matrix if no override matrix exists
         matrix = xyz.working_space_matrix(color_space, illuminant, observer, adaptation)
 
-    X, Y, Z = ((R * matrix[i][0]) + (G * matrix[i][1]) + (B * matrix[i][2]) for i in range(3))
+    X, Y, Z = ih.apply_matrix(matrix, (R, G, B))
 
     match output:
         case "round":
@@ -1189,7 +1192,7 @@ def xyz_to_rgb(
         matrix = xyz.working_space_matrix(color_space, illuminant, observer, adaptation, to_xyz=False)
 
     # Get the conversion matrix
-    R, G, B = ((X * matrix[i][0]) + (Y * matrix[i][1]) + (Z * matrix[i][2]) for i in range(3))
+    R, G, B = ih.apply_matrix(matrix, (X, Y, Z))
     # R, G, B = matrix @ (X, Y, Z)
     R, G, B = ih.return_scale((R, G, B), min_max=(0.0, 1.0), clamp=True, normalized_input=True, output=Out3.NORMALIZED)
 
@@ -1309,7 +1312,7 @@ def xyz_to_rgb_alt(
     matrix = cs["SRGB"]["override_matrix"]["to_rgb"]
 
     # Apply matrix to the X, Y, Z values
-    R, G, B = ((X * matrix[i][0]) + (Y * matrix[i][1]) + (Z * matrix[i][2]) for i in range(3))
+    R, G, B = ih.apply_matrix(matrix, (X, Y, Z))
 
     # Apply gamma
     R, G, B = tf.srgb((R, G, B), output=Out1.NORMALIZED)
@@ -1637,7 +1640,7 @@ def srgb_to_adobe_rgb(*color: int | float | str | tuple | list, output: Enum = O
         ( 0.01344, -0.11836,  1.01517))  #  0.0134474 -0.1183897  1.0154096"""
 
     # Apply conversion matrix
-    R, G, B = ((X * matrix[i][0]) + (Y * matrix[i][1]) + (Z * matrix[i][2]) for i in range(3))
+    R, G, B = ih.apply_matrix(matrix, (X, Y, Z))
 
     # Apply gamma to get Adobe RGB
     R, G, B = (i **  (1 / (563/256)) if i > 0 else 0 for i in (R, G, B))
@@ -1706,7 +1709,7 @@ def adobe_rgb_to_xyz(
         (0.02703, 0.07069, 0.99134))  # 0.0270343  0.0706872  0.9911085"""
 
     # Apply conversiion matrix
-    X, Y, Z = ((R * matrix[i][0]) + (G * matrix[i][1]) + (B * matrix[i][2]) for i in range(3))
+    X, Y, Z = ih.apply_matrix(matrix, (R, G, B))
 
     match output:
         case "round":
@@ -1767,11 +1770,11 @@ def rgb_to_ycbcr(*color, output: Enum = Out3.ROUND):
         # Cr = 128 + ((R<<7) - (R<<4) - (((G<<6) + (G<<5) - (G<<1)) - ((B<<4) + (B<<1))) >> 8)
     elif "ITU-R BT.709":
         matrix = ((0.2126, 0.7152, 0.0722), (-0.1146, -0.3854, 0.5), (0.5, -0.4542, -0.0458))
-        Y, Cb, Cr = ((R * matrix[i][0]) + (G * matrix[i][1]) + (B * matrix[i][2]) for i in range(3))
+        Y, Cb, Cr = ih.apply_matrix(matrix, (R, G, B))
 
     elif "SMPTE-240M":
         matrix = ((1, 0, 1.4746), (1, -0.16455312684366, -0.57135312684366), (1, 1.8814, 0))
-        Y, Cb, Cr = ((R * matrix[i][0]) + (G * matrix[i][1]) + (B * matrix[i][2]) for i in range(3))
+        Y, Cb, Cr = ih.apply_matrix(matrix, (R, G, B))
 
 
     match output:
@@ -0,0 +1,179 @@
+"""This module contains an image-level bit-depth converter with optional ordered or error-diffusion dithering.
+Plain rounding of a smooth 10/12/16-bit gradient to 8 bits gives visible bands. Dithering trades them for fine
+noise: ordered dithering adds a tiled Bayer threshold matrix before truncating and error diffusion (Floyd-Steinberg)
+pushes the rounding error of every pixel to its neighbors.
+
+Integer images without dithering go through a lookup table with an entry for every input code value. Ordered
+dithering is computed with integer arithmetic only. Error diffusion is sequential along rows (every pixel needs the
+error of the one before it), so instead of looping over pixels it walks the image in wavefronts: the pixels with
+the same 2 * row + column have all their error in by the time they are reached and are quantized together.
+
+Reference 1 https://en.wikipedia.org/wiki/Ordered_dithering
+Reference 2 https://en.wikipedia.org/wiki/Floyd%E2%80%93Steinberg_dithering
+"""
+# pylint: disable=invalid-name
+from functools import lru_cache
+
+import numpy as np
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The dithering methods
+DITHERS = (None, "ordered", "floyd-steinberg")
+
+#= Floyd-Steinberg weights of the error pushed to the (down left, down, down right, right) neighbors. The order is
+#= the order the neighbors receive it in, so the wavefront adds up the errors in the same order as a pixel loop
+FLOYD_STEINBERG = ((1, -1, 3 / 16), (1, 0, 5 / 16), (1, 1, 1 / 16), (0, 1, 7 / 16))
+
+
+def _check_depth(depth: int, name: str) -> int:
+    """### Returns a bit depth after checking it's an integer in range 1-16"""
+    if not isinstance(depth, (int, np.integer)) or not 1 <= depth <= 16:
+        raise ValueError(f"{name} depth must be an integer in range 1-16!")
+    return int(depth)
+
+
+@lru_cache(maxsize=8)
+def _depth_table(base_depth: int, target_depth: int) -> np.ndarray:
+    """### Returns round((2 ** target_depth - 1) / (2 ** base_depth - 1) * code) for every code of the base depth"""
+    T, B = 2 ** target_depth - 1, 2 ** base_depth - 1
+    # The divisor is odd so there are no ties and adding half of it before dividing is exact rounding
+    res = ((np.arange(B + 1, dtype=np.int64) * (2 * T) + B) // (2 * B)).astype(_dtype(target_depth))
+    res.flags.writeable = False
+    return res
+
+
+@lru_cache(maxsize=8)
+def bayer_matrix(size: int = 8) -> np.ndarray:
+    """### Returns the Bayer threshold matrix with values in range 0 to size ** 2 - 1
+
+    ### Args:
+        `size` (int, optional): The size of the square matrix. A power of 2. Defaults to 8.
+
+    ### Returns:
+        numpy.ndarray: A read only int64 array with shape (size, size)
+    """
+    if size < 2 or size & (size - 1):
+        raise ValueError("Bayer matrix size must be a power of 2 greater than 1!")
+    res = np.zeros((1, 1), dtype=np.int64)
+    while len(res) < size:
+        res = np.block([[4 * res, 4 * res + 2], [4 * res + 3, 4 * res + 1]])
+    res.flags.writeable = False
+    return res
+
+
+def _dtype(depth: int) -> type:
+    """### Returns the smallest unsigned integer type holding values of a bit depth"""
+    return np.uint8 if depth <= 8 else np.uint16
+
+
+def _ordered(image: np.ndarray, base_depth: int, target_depth: int, size: int, chunk: int) -> np.ndarray:
+    """### Returns floor(code * T / B + (threshold + 0.5) / size ** 2) with integer arithmetic on rows of pixels"""
+    T, B = 2 ** target_depth - 1, 2 ** base_depth - 1
+    matrix = bayer_matrix(size)
+    H, W = image.shape[:2]
+    cells = 2 * size * size
+    # (2 * threshold + 1) * B, tiled over a row block and broadcast over the channels
+    offsets = np.tile((2 * matrix + 1) * B, (1, -(-W // size)))[:, :W].reshape((size, W) + (1,) * (image.ndim - 2))
+    res = np.empty(image.shape, dtype=_dtype(target_depth))
+    rows = max(chunk // max(image[0].size, 1), 1)
+    for start in range(0, H, rows):
+        block = image[start:start + rows].astype(np.int64)
+        block *= cells * T
+        block += offsets[(np.arange(start, start + len(block)) % size)]
+        block //= cells * B
+        res[start:start + rows] = block
+    return res
+
+
+def _ordered_float(image: np.ndarray, target_depth: int, size: int) -> np.ndarray:
+    """### Returns floor(value * T + (threshold + 0.5) / size ** 2) for normalized values"""
+    matrix = (bayer_matrix(size) + 0.5) / (size * size)
+    H, W = image.shape[:2]
+    thresholds = np.tile(matrix, (-(-H // size), -(-W // size)))[:H, :W].reshape((H, W) + (1,) * (image.ndim - 2))
+    res = np.clip(image, 0, 1) * (2 ** target_depth - 1)
+    res += thresholds
+    return np.floor(res, out=res).astype(_dtype(target_depth))
+
+
+def _floyd_steinberg(values: np.ndarray, target_depth: int) -> np.ndarray:
+    """### Diffuses the rounding error of values in range 0 to 2 ** target_depth - 1 over the image in wavefronts"""
+    T = 2 ** target_depth - 1
+    H, W = values.shape[:2]
+    channels = values.reshape(H, W, -1).shape[2]
+    # A spare row below and a spare column on each side take the error pushed out of the image
+    stride = W + 2
+    work = np.zeros(((H + 1) * stride, channels))
+    work.reshape(H + 1, stride, channels)[:H, 1:W + 1] = values.reshape(H, W, channels)
+    for step in range(2 * (H - 1) + W):
+        # Pixel (y, x) gets its error from pixels of the previous 3 steps, so a step's pixels are independent.
+        # They are at y * (W + 2) + x + 1 = y * W + step + 1, so every step is a strided slice
+        first, last = max(0, (step - W + 2) // 2), min(H - 1, step // 2)
+        start = first * W + step + 1
+        stop = start + (last - first) * W + 1
+        pixels = work[start:stop:W].copy()
+        quantized = np.floor(pixels + 0.5)
+        np.clip(quantized, 0, T, out=quantized)
+        # The quantized values replace the pixels, nothing reads them again
+        work[start:stop:W] = quantized
+        pixels -= quantized
+        for dy, dx, weight in FLOYD_STEINBERG:
+            shift = dy * stride + dx
+            work[start + shift:stop + shift:W] += pixels * weight
+    res = work.reshape(H + 1, stride, channels)[:H, 1:W + 1].astype(_dtype(target_depth))
+    return res.reshape(values.shape)
+
+
+def convert_bit_depth_image(
+    image: np.ndarray,
+    base_depth: int,
+    target_depth: int,
+    dither: str | None = None,
+    bayer_size: int = 8,
+    chunk: int = 1 << 20) -> np.ndarray:
+    """### Converts an image to a different bit depth. Ex. a 12-bit graded frame to 8-bit
+
+    ### Args:
+        `image` (numpy.ndarray): Values with shape (H, W) or (H, W, C). Unsigned integers are code values of the
+                                    base depth, floats are normalized values
+        `base_depth` (int): The bit depth of integer images (range 1-16). Ignored for float images
+        `target_depth` (int): The bit depth of the output (range 1-16)
+        `dither` (str | None, optional): One of DITHERS. "ordered" adds a tiled Bayer matrix before truncating,
+                                    "floyd-steinberg" diffuses the rounding error. Defaults to None (rounding).
+        `bayer_size` (int, optional): The size of the Bayer matrix of ordered dithering. Defaults to 8.
+        `chunk` (int, optional): About how many values are processed at once by the integer kernels.
+                                    Defaults to 1 << 20.
+
+    #### N/B: Without dithering the result is the same as `convert_bit_depth` for every pixel.
+
+    ### Returns:
+        numpy.ndarray: Code values of the target depth with the shape of the image. uint8 for target depths up to 8,
+            uint16 otherwise
+    """
+    if dither not in DITHERS:
+        raise ValueError(f"Dither can only be one of the following: {DITHERS}!")
+    target_depth = _check_depth(target_depth, "Target")
+    if not isinstance(image, np.ndarray) or image.dtype.kind not in "uf":
+        raise TypeError("Image must be a numpy array of unsigned integers or floats!")
+    if image.ndim not in (2, 3):
+        raise ValueError("Image must have shape (H, W) or (H, W, C)!")
+    if chunk < 1:
+        raise ValueError("Chunk must be a positive integer!")
+
+    if image.dtype.kind == "f":
+        if dither == "ordered":
+            return _ordered_float(image, target_depth, bayer_size)
+        values = np.clip(image, 0, 1) * (2 ** target_depth - 1)
+        if dither is None:
+            return np.floor(values + 0.5, out=values).astype(_dtype(target_depth))
+        return _floyd_steinberg(values, target_depth)
+
+    base_depth = _check_depth(base_depth, "Base")
+    if image.size and image.max() >= 2 ** base_depth:
+        raise ValueError(f"Image values must be in range 0-{2 ** base_depth - 1} for {base_depth}-bit depth!")
+    if dither is None:
+        return _depth_table(base_depth, target_depth)[image]
+    if dither == "ordered":
+        return _ordered(image, base_depth, target_depth, bayer_size, chunk)
+    return _floyd_steinberg(image * ((2 ** target_depth - 1) / (2 ** base_depth - 1)), target_depth)
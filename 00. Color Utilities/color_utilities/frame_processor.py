@@ -0,0 +1,351 @@
+"""This module contains a streaming processor for sequences of raw video frames.
+Frames are read through memory mapping (one file per frame or one big file with a fixed stride), run through a
+pipeline of vectorized stages (e.g. log decode -> gamut matrix -> display encode) and written back as raw frames.
+Reading the next frame and writing the previous one happen in background threads while the current one is computed.
+
+Example:
+    >>> reader = RawFrameReader("A001.raw", (2160, 3840), dtype="uint16", depth=12)
+    >>> writer = RawFrameWriter("A001_709.raw", dtype="uint16", depth=10)
+    >>> stats = process_frames(reader, color_pipeline("ARRI WIDE GAMUT 3", "REC. 709", EI=800), writer)
+    >>> stats["fps"]
+"""
+# pylint: disable=invalid-name
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+from . import batch_transfer_functions as btf
+from . import xyz
+from .dithering import DITHERS, convert_bit_depth_image
+from .grading import GradingNode, grade_batch
+from .ycbcr import SUBSAMPLING, rgb_to_ycbcr_planes, ycbcr_planes_to_rgb
+
+#= Frame layouts: interleaved R'G'B' (H, W, 3), planar R'G'B' (3, H, W) or planar Y'CbCr with chroma subsampling
+LAYOUTS = ("interleaved", "planar", "yuv444", "yuv422", "yuv420")
+
+
+def _plane_shapes(shape: tuple, layout: str) -> list[tuple]:
+    """### Returns the shapes of the arrays stored in a frame in the order they are stored"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Layout can only be one of the following: {LAYOUTS}")
+    H, W = shape
+    if layout == "interleaved":
+        return [(H, W, 3)]
+    if layout == "planar":
+        return [(3, H, W)]
+    step_y, step_x = SUBSAMPLING[layout[3:]]
+    chroma = (-(-H // step_y), -(-W // step_x))
+    return [(H, W), chroma, chroma]
+
+
+class RawFrameReader:
+    """### Reads raw frames through memory mapping
+
+    ### Args:
+        `paths` (str | list[str]): A single file holding every frame or a list of files with one frame each
+        `shape` (tuple): The (H, W) size of the frames
+        `dtype` (str, optional): The data type of the stored values. Defaults to "uint16".
+        `depth` (int, optional): The bit depth of the stored values. Defaults to the size of the data type.
+        `layout` (str, optional): One of the LAYOUTS. Defaults to "interleaved".
+        `offset` (int, optional): Bytes to skip at the start of every file (e.g. a header). Defaults to 0.
+        `stride` (int, optional): Bytes from the start of a frame to the start of the next one in a single file.
+                                    Defaults to None (the size of a frame).
+        `K` (str | tuple, optional): The WEIGHTS preset of Y'CbCr layouts. Defaults to "ITU-R BT.709".
+        `legal` (bool, optional): Whether Y'CbCr layouts are in legal range. Defaults to True.
+
+    #### N/B: Frames are returned as normalized float R'G'B' arrays with shape (H, W, 3). A single file stays mapped \
+        until `close()`, files with one frame each are mapped only while their frame is read so long sequences \
+        don't keep every file mapped.
+    """
+
+    def __init__(
+        self,
+        paths: str | list,
+        shape: tuple,
+        dtype: str = "uint16",
+        depth: int = None,
+        layout: str = "interleaved",
+        offset: int = 0,
+        stride: int = None,
+        K: str | tuple = "ITU-R BT.709",
+        legal: bool = True):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.depth = depth or self.dtype.itemsize * 8
+        self.layout = layout
+        self.offset = offset
+        self.K = K
+        self.legal = legal
+        self.planes = _plane_shapes(self.shape, layout)
+        self.frame_size = sum(int(np.prod(i)) for i in self.planes) * self.dtype.itemsize
+        self.stride = stride or self.frame_size
+        if self.stride < self.frame_size:
+            raise ValueError("The stride can't be smaller than the size of a frame!")
+        self._maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _map(self, path: str) -> np.memmap:
+        """### Returns the byte memory map of a file. Only the map of a single file is cached"""
+        if len(self.paths) > 1:
+            return np.memmap(path, dtype=np.uint8, mode="r")
+        if path not in self._maps:
+            self._maps[path] = np.memmap(path, dtype=np.uint8, mode="r")
+        return self._maps[path]
+
+    def close(self):
+        """### Releases the cached memory map. It's unmapped once the arrays returned by `raw()` are gone"""
+        self._maps.clear()
+
+    def __len__(self) -> int:
+        if len(self.paths) > 1:
+            return len(self.paths)
+        size = len(self._map(self.paths[0])) - self.offset
+        return max(0, (size - self.frame_size) // self.stride + 1)
+
+    def raw(self, index: int) -> list[np.ndarray]:
+        """### Returns the stored arrays of a frame as read-only views of the memory map (they keep it mapped)"""
+        if not 0 <= index < len(self):
+            raise IndexError("Frame index out of range!")
+        if len(self.paths) > 1:
+            data, start = self._map(self.paths[index]), self.offset
+        else:
+            data, start = self._map(self.paths[0]), self.offset + index * self.stride
+        res = []
+        for shape in self.planes:
+            size = int(np.prod(shape)) * self.dtype.itemsize
+            res.append(data[start:start + size].view(self.dtype).reshape(shape))
+            start += size
+        return res
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        planes = self.raw(index)
+        max_value = 2 ** self.depth - 1
+        match self.layout:
+            case "interleaved":
+                return planes[0] / max_value
+            case "planar":
+                return np.moveaxis(planes[0], 0, -1) / max_value
+            case _:
+                return ycbcr_planes_to_rgb(*planes, K=self.K, in_depth=self.depth, in_legal=self.legal,
+                                           out_depth=self.depth, out_int=False)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class RawFrameWriter:
+    """### Writes normalized R'G'B' frames as raw frames
+
+    ### Args:
+        `path` (str): A single output file or a pattern with an "{index}" field for one file per frame
+        `dtype` (str, optional): The data type of the stored values. Defaults to "uint16".
+        `depth` (int, optional): The bit depth of the stored values. Defaults to the size of the data type.
+        `layout` (str, optional): One of the LAYOUTS. Defaults to "interleaved".
+        `K` (str | tuple, optional): The WEIGHTS preset of Y'CbCr layouts. Defaults to "ITU-R BT.709".
+        `legal` (bool, optional): Whether Y'CbCr layouts are written in legal range. Defaults to True.
+        `dither` (str | None, optional): One of DITHERS used for R'G'B' layouts. Defaults to None (rounding).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "uint16",
+        depth: int = None,
+        layout: str = "interleaved",
+        K: str | tuple = "ITU-R BT.709",
+        legal: bool = True,
+        dither: str | None = None):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Layout can only be one of the following: {LAYOUTS}")
+        if dither not in DITHERS:
+            raise ValueError(f"Dither can only be one of the following: {DITHERS}!")
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.depth = depth or self.dtype.itemsize * 8
+        self.layout = layout
+        self.K = K
+        self.legal = legal
+        self.dither = dither
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def encode(self, frame: np.ndarray) -> list[np.ndarray]:
+        """### Returns the arrays stored for a normalized (H, W, 3) R'G'B' frame"""
+        if self.layout.startswith("yuv"):
+            planes = rgb_to_ycbcr_planes(frame, K=self.K, in_depth=self.depth, out_depth=self.depth,
+                                         out_legal=self.legal, subsampling=self.layout[3:])
+            return [i.astype(self.dtype, copy=False) for i in planes]
+        if self.dither is None:
+            codes = np.rint(np.clip(frame, 0, 1) * (2 ** self.depth - 1)).astype(self.dtype)
+        else:
+            frame = np.asarray(frame, dtype=np.float64)
+            codes = convert_bit_depth_image(frame, self.depth, self.depth, self.dither).astype(self.dtype, copy=False)
+        return [np.moveaxis(codes, -1, 0) if self.layout == "planar" else codes]
+
+    def write(self, index: int, frame: np.ndarray):
+        """### Writes a frame. Frames must be written in order when writing to a single file"""
+        planes = self.encode(frame)
+        if "{index" in self.path:
+            with open(self.path.format(index=index), "wb") as file:
+                for plane in planes:
+                    file.write(np.ascontiguousarray(plane).tobytes())
+            return
+        if self._file is None:
+            self._file = open(self.path, "wb")  # pylint: disable=consider-using-with
+        for plane in planes:
+            self._file.write(np.ascontiguousarray(plane).tobytes())
+
+    def close(self):
+        """### Closes the output file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def color_pipeline(
+    src: str,
+    dst: str,
+    observer: str = "2",
+    adaptation: str = "bradford",
+    clamp: bool = True,
+    grade: Sequence[GradingNode] | None = None,
+    **kwargs) -> list[Callable]:
+    """### Builds the stages converting frames from one color space to another: decode -> gamut matrix -> encode
+
+    ### Args:
+        `src` (str): The color space (and transfer function) of the input frames, e.g. "ARRI WIDE GAMUT 3"
+        `dst` (str): The color space (and transfer function) of the output frames, e.g. "REC. 709"
+        `observer` (str, optional): The observer angle of the illuminants. Defaults to "2".
+        `adaptation` (str, optional): The adaptation method used if the whitepoints differ. Defaults to "bradford".
+        `clamp` (bool, optional): Clamp the linear values in range 0-1 before encoding. Defaults to True.
+        `grade` (Sequence[GradingNode], optional): Grading nodes applied in place to the linear values in the
+                                    destination gamut, before clamping. Defaults to None.
+        `kwargs`: Additional arguments passed to both transfer functions (e.g. EI for ARRI LogC)
+
+    ### Returns:
+        list[Callable]: The stages. Every stage takes a frame and returns a frame.
+    """
+    src, dst = xyz.color_space_name(src), xyz.color_space_name(dst)
+    decode, encode = btf.get_transfer_function(src), btf.get_transfer_function(dst)
+    matrix = xyz.rgb_to_rgb_matrix(src, dst, observer, adaptation).T
+
+    def gamut(frame: np.ndarray) -> np.ndarray:
+        frame = frame @ matrix
+        if grade:
+            grade_batch(frame, grade, out=frame)
+        return np.clip(frame, 0, 1, out=frame) if clamp else frame
+
+    return [lambda frame: decode(frame, decode=True, **kwargs), gamut, lambda frame: encode(frame, **kwargs)]
+
+
+def _worker(target: Callable, errors: list):
+    """### Runs a thread target and keeps its exception so it can be raised in the main thread"""
+    def run():
+        try:
+            target()
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+    return threading.Thread(target=run, daemon=True)
+
+
+def _put(items: queue.Queue, item, consumer: threading.Thread) -> bool:
+    """### Puts an item in a queue while its consumer thread is alive. Returns False if the consumer stopped"""
+    while consumer.is_alive():
+        try:
+            items.put(item, timeout=0.01)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def process_frames(
+    reader: RawFrameReader,
+    stages: list[Callable],
+    writer: RawFrameWriter,
+    frames: range = None,
+    buffers: int = 2,
+    progress: Callable = None) -> dict:
+    """### Runs every frame through the stages while the next frames are read and the previous ones written
+
+    ### Args:
+        `reader` (RawFrameReader): The source of the frames (any object with `__len__` and `__getitem__` works)
+        `stages` (list[Callable]): Functions applied to every frame in order
+        `writer` (RawFrameWriter): The destination of the frames (any object with `write(index, frame)`)
+        `frames` (range, optional): The indices of the frames to process. Defaults to None (all frames).
+        `buffers` (int, optional): How many frames can wait to be computed or written. Defaults to 2 (double buffering).
+        `progress` (Callable, optional): Called with (frame index, frames per second so far) after every frame.
+
+    ### Returns:
+        dict: frames, seconds, fps and how long the computation waited for reading and writing
+    """
+    frames = range(len(reader)) if frames is None else frames
+    done = object()
+    read_queue, write_queue = queue.Queue(buffers), queue.Queue(buffers)
+    errors = []
+    stats = {"frames": 0, "seconds": 0.0, "fps": 0.0, "read_wait": 0.0, "write_wait": 0.0}
+
+    def read():
+        try:
+            for index in frames:
+                read_queue.put((index, reader[index]))
+        finally:
+            read_queue.put(done)
+
+    def write():
+        while (item := write_queue.get()) is not done:
+            writer.write(*item)
+
+    threads = [_worker(read, errors), _worker(write, errors)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    try:
+        while True:
+            wait = time.perf_counter()
+            item = read_queue.get()
+            stats["read_wait"] += time.perf_counter() - wait
+            if item is done or errors:
+                break
+            index, frame = item
+            for stage in stages:
+                frame = stage(frame)
+            wait = time.perf_counter()
+            if not _put(write_queue, (index, frame), threads[1]):
+                break  # The writer failed
+            stats["write_wait"] += time.perf_counter() - wait
+            stats["frames"] += 1
+            if progress:
+                progress(index, stats["frames"] / (time.perf_counter() - start))
+    finally:
+        _put(write_queue, done, threads[1])
+        threads[1].join()
+        # Unblock the reader if the computation stopped early
+        while threads[0].is_alive():
+            try:
+                read_queue.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        if hasattr(writer, "close"):
+            writer.close()
+
+    if errors:
+        raise errors[0]
+    stats["seconds"] = time.perf_counter() - start
+    stats["fps"] = stats["frames"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
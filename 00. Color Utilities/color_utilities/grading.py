@@ -0,0 +1,246 @@
+"""This module contains vectorized grading operators: the ASC CDL (slope, offset, power and saturation), exposure and
+white balance gains. Every operator is a GradingNode, a callable taking R, G, B values with shape (..., 3) and
+returning the graded values, so nodes work on whole frames, are stages of `color_pipeline`/`process_frames` as they
+are and can be baked into a 3D LUT.
+A chain of nodes is applied by `grade_batch` in a single pass over one output array. Consecutive gain nodes
+(exposure, white balance and CDLs with only a slope) are folded into a single multiplication.
+
+Example:
+    >>> grade = [GradingNode.exposure(0.5), GradingNode.white_balance((1.05, 1, 0.92))]
+    >>> stats = process_frames(reader, color_pipeline("ARRI WIDE GAMUT 3", "REC. 709", grade=grade), writer)
+    >>> lut = bake_lut(GradingNode.cdl(slope=(1.1, 1, 0.9), power=1.2, saturation=0.8))
+
+Reference 1 https://en.wikipedia.org/wiki/ASC_CDL
+Reference 2 https://docs.acescentral.com/specifications/cdl (ASC CDL v1.2 transfer functions)
+"""
+# pylint: disable=invalid-name
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+from .additionals import REC709_LUMA_WEIGHTS
+from .buffers import _buffer_view, _output
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The default number of points per axis of a baked 3D LUT (the usual size of grading LUTs)
+LUT_SIZE = 33
+
+
+def _channels(value, name: str) -> np.ndarray:
+    """### Returns a value per channel from a number or an (R, G, B) triple"""
+    try:
+        res = np.broadcast_to(np.asarray(value, dtype=np.float64), (3,)).copy()
+    except (TypeError, ValueError):
+        res = None
+    if res is None or not np.all(np.isfinite(res)):
+        raise ValueError(f"{name} must be a finite number or an (R, G, B) triple!")
+    return res
+
+
+def _float_array(RGB) -> np.ndarray:
+    """### Returns R, G, B values as a float array (floats are kept as they are)"""
+    RGB = np.asarray(_buffer_view(RGB))
+    if RGB.dtype.kind != "f":
+        RGB = RGB.astype(np.float64)
+    if RGB.ndim == 0 or RGB.shape[-1] != 3:
+        raise ValueError("Values must have shape (..., 3)!")
+    return RGB
+
+
+class GradingNode:
+    """### A grading operator applied to R, G, B values with shape (..., 3)
+
+    Create them with the constructors (`GradingNode.cdl(...)`, `GradingNode.exposure(1)`) and apply one or a sequence
+    of them with `grade_batch`. A node is also a pipeline stage: `node(frame)` returns the graded frame.
+
+    ### Args:
+        `func` (Callable): Takes the float values and an output array of the same shape (which may be the values
+                            themselves) and writes the graded values into it
+        `name` (str, optional): A description shown by repr. Defaults to "custom".
+        `gain` (numpy.ndarray, optional): The per channel gain if the node only multiplies. Defaults to None.
+    """
+
+    def __init__(self, func: Callable, name: str = "custom", gain: np.ndarray | None = None):
+        self.func = func
+        self.name = name
+        self.gain = gain
+
+    def __repr__(self) -> str:
+        return f"GradingNode({self.name})"
+
+    def __call__(self, RGB, out: np.ndarray | None = None) -> np.ndarray:
+        return grade_batch(RGB, (self,), out)
+
+    @classmethod
+    def _multiply(cls, gain: np.ndarray, name: str) -> "GradingNode":
+        """### Returns a node multiplying every channel by its gain"""
+        return cls(lambda RGB, out: np.multiply(RGB, gain, out=out), name, gain)
+
+    @classmethod
+    def cdl(
+        cls,
+        slope=1.0,
+        offset=0.0,
+        power=1.0,
+        saturation: float = 1.0,
+        clamp: bool = True) -> "GradingNode":
+        """### The ASC CDL: out = (in * slope + offset) ** power, then saturation around the Rec. 709 luma
+
+        ### Args:
+            `slope` (float | tuple, optional): The gain per channel (>= 0). Defaults to 1.0.
+            `offset` (float | tuple, optional): Added to every channel after the slope. Defaults to 0.0.
+            `power` (float | tuple, optional): The exponent per channel (> 0). Defaults to 1.0.
+            `saturation` (float, optional): 0 gives the luma, 1 leaves the colors unchanged. Defaults to 1.0.
+            `clamp` (bool, optional): Clamp in range 0-1 after the power and after the saturation as in the
+                                    ASC CDL v1.2. Without clamping negative values skip the power and values
+                                    above 1 are kept (for scene linear data). Defaults to True.
+
+        ### Returns:
+            GradingNode: The CDL node
+        """
+        slope, offset, power = _channels(slope, "Slope"), _channels(offset, "Offset"), _channels(power, "Power")
+        if np.any(slope < 0) or np.any(power <= 0) or not saturation >= 0:
+            raise ValueError("Slope and saturation must be non-negative and power must be positive!")
+        name = f"cdl {tuple(slope)} {tuple(offset)} {tuple(power)} {saturation}"
+        if not offset.any() and np.all(power == 1) and saturation == 1 and not clamp:
+            return cls._multiply(slope, name)
+        weights = np.array(REC709_LUMA_WEIGHTS)
+
+        def cdl(RGB: np.ndarray, out: np.ndarray):
+            np.multiply(RGB, slope, out=out)
+            out += offset
+            if clamp:
+                np.clip(out, 0, 1, out=out)
+                if np.any(power != 1):
+                    np.power(out, power, out=out)
+            elif np.any(power != 1):
+                np.power(out, power, out=out, where=out > 0)
+            if saturation != 1:
+                luma = (out @ weights)[..., None]
+                out -= luma
+                out *= saturation
+                out += luma
+                if clamp:
+                    np.clip(out, 0, 1, out=out)
+        return cls(cdl, name)
+
+    @classmethod
+    def exposure(cls, stops: float) -> "GradingNode":
+        """### Multiplies linear values by 2 ** stops. +1 stop doubles the light"""
+        return cls._multiply(_channels(2.0 ** stops, "Stops"), f"exposure {stops:+}")
+
+    @classmethod
+    def white_balance(cls, gains=None, neutral=None) -> "GradingNode":
+        """### Multiplies every linear channel by its gain
+
+        ### Args:
+            `gains` (tuple, optional): The (R, G, B) gains. Defaults to None.
+            `neutral` (tuple, optional): Linear R, G, B of something that should be gray. The gains make it
+                                    neutral while keeping its green channel. Used if `gains` is None.
+
+        ### Returns:
+            GradingNode: The white balance node
+        """
+        if gains is None:
+            if neutral is None:
+                raise ValueError("Either the gains or a neutral color must be given!")
+            neutral = _channels(neutral, "Neutral")
+            if np.any(neutral <= 0):
+                raise ValueError("The neutral color must have positive values!")
+            gains = neutral[1] / neutral
+        gains = _channels(gains, "Gains")
+        if np.any(gains < 0):
+            raise ValueError("Gains must be non-negative!")
+        return cls._multiply(gains, f"white_balance {tuple(gains)}")
+
+
+def grade_batch(RGB, nodes: GradingNode | Sequence[GradingNode], out: np.ndarray | None = None) -> np.ndarray:
+    """### Applies a grading node or a chain of them to an array of colors
+
+    ### Args:
+        `RGB` (array_like): R, G, B values with shape (..., 3). Normalized values (or scene linear ones for
+                                    exposure and white balance). Integers are taken as they are.
+        `nodes` (GradingNode | Sequence[GradingNode]): Applied in order
+        `out` (numpy.ndarray, optional): A float array with the shape of the values for the result. It can be the
+                                    values themselves to grade them in place. Defaults to None (a new array).
+
+    ### Returns:
+        numpy.ndarray: The graded values
+    """
+    if isinstance(nodes, GradingNode):
+        nodes = (nodes,)
+    RGB = _float_array(RGB)
+    res = _output(out, RGB.shape, RGB.dtype)
+    src, gain = RGB, None
+    for node in (*nodes, None):
+        if node is not None and not isinstance(node, GradingNode):
+            raise TypeError("Nodes must be GradingNode instances!")
+        if node is not None and node.gain is not None:
+            gain = node.gain if gain is None else gain * node.gain
+            continue
+        if gain is not None:
+            np.multiply(src, gain, out=res)
+            src, gain = res, None
+        if node is not None:
+            node.func(src, res)
+            src = res
+    if src is not res:
+        np.copyto(res, src)
+    return res
+
+
+def bake_lut(
+    nodes: GradingNode | Sequence[GradingNode],
+    size: int = LUT_SIZE,
+    domain: tuple = (0.0, 1.0)) -> np.ndarray:
+    """### Bakes a grading node or a chain of them into a 3D LUT
+
+    ### Args:
+        `nodes` (GradingNode | Sequence[GradingNode]): Applied in order
+        `size` (int, optional): The number of points per axis. Defaults to LUT_SIZE.
+        `domain` (tuple, optional): The (min, max) input value of every axis. Defaults to (0.0, 1.0).
+
+    ### Returns:
+        numpy.ndarray: The graded grid with shape (size, size, size, 3), indexed [R, G, B]
+    """
+    if size < 2:
+        raise ValueError("LUT size must be at least 2!")
+    axis = np.linspace(*domain, size)
+    grid = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    return grade_batch(grid, nodes, out=grid)
+
+
+def apply_lut(RGB, lut: np.ndarray, domain: tuple = (0.0, 1.0), out: np.ndarray | None = None) -> np.ndarray:
+    """### Applies a 3D LUT with trilinear interpolation. Values outside of the domain are clamped to it
+
+    ### Args:
+        `RGB` (array_like): R, G, B values with shape (..., 3)
+        `lut` (numpy.ndarray): A LUT with shape (size, size, size, 3) indexed [R, G, B], e.g. from `bake_lut`
+        `domain` (tuple, optional): The (min, max) input value of every axis of the LUT. Defaults to (0.0, 1.0).
+        `out` (numpy.ndarray, optional): A float array with the shape of the values for the result.
+                                    Defaults to None (a new array).
+
+    ### Returns:
+        numpy.ndarray: The values looked up in the LUT
+    """
+    lut = np.asarray(lut)
+    size = lut.shape[0]
+    if lut.shape != (size, size, size, 3) or size < 2:
+        raise ValueError("LUT must have shape (size, size, size, 3) with size of at least 2!")
+    RGB = _float_array(RGB)
+    res = _output(out, RGB.shape, RGB.dtype)
+    position = (RGB - domain[0]) * ((size - 1) / (domain[1] - domain[0]))
+    np.clip(position, 0, size - 1, out=position)
+    index = np.minimum(position.astype(np.intp), size - 2)
+    position -= index
+    flat = lut.reshape(-1, 3)
+    base = (index[..., 0] * size + index[..., 1]) * size + index[..., 2]
+    res[...] = 0
+    # The 8 corners of the cell around every value, weighted by how close the value is to them
+    for corner in range(8):
+        r, g, b = corner >> 2, corner >> 1 & 1, corner & 1
+        weight = np.prod(np.where((r, g, b), position, 1 - position), axis=-1)
+        res += flat[base + (r * size + g) * size + b] * weight[..., None]
+    return res
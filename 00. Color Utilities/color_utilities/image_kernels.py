@@ -0,0 +1,232 @@
+"""This module contains integer-only RGB <-> HSV/HSL kernels for 8-bit images.
+Images are uint8 arrays with shape (..., 3) (e.g. (H, W, 3)). Hue is in range 0-179 (two degrees per step, fits
+in uint8) or 0-359 (uint16), saturation, value and lightness are in range 0-255. Nothing is promoted to floats:
+the divisions come from small lookup tables or are done with integers and every result is rounded exactly
+(half to even, like round() does), so the values match `rgb_to_hsv` and `rgb_to_hsl` rounded to the same ranges.
+
+The pixels are processed in chunks so the int32 scratch arrays stay small whatever the size of the image.
+"""
+# pylint: disable=invalid-name
+from functools import lru_cache
+
+import numpy as np
+
+from .buffers import _buffer_view
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The supported hue ranges and the integer types of their output
+HUE_RANGES = {180: np.uint8, 360: np.uint16}
+
+
+def _round_div(numerator: np.ndarray, denominator: np.ndarray | int) -> np.ndarray:
+    """### Divides integer arrays (positive denominator) rounding half to even"""
+    q, r = np.divmod(numerator, denominator)
+    r <<= 1
+    q += (r > denominator) | ((r == denominator) & (q & 1 == 1))
+    return q
+
+
+def _table(values: np.ndarray, dtype: type) -> np.ndarray:
+    """### Returns a read only flat lookup table"""
+    res = values.astype(dtype).ravel()
+    res.flags.writeable = False
+    return res
+
+
+@lru_cache(maxsize=2)
+def _hue_table(hue_range: int) -> np.ndarray:
+    """### Returns round(hue_range / 6 * diff / delta) indexed by (diff + 255) * 256 + delta"""
+    diff = np.arange(-255, 256)[:, None]
+    delta = np.arange(256)
+    return _table(np.where(delta == 0, 0, _round_div(diff * (hue_range // 6), np.maximum(delta, 1))), np.int16)
+
+
+@lru_cache(maxsize=1)
+def _hsv_saturation_table() -> np.ndarray:
+    """### Returns round(255 * delta / max) indexed by max * 256 + delta"""
+    Cmax = np.arange(256)[:, None]
+    delta = np.arange(256)
+    return _table(np.where(Cmax == 0, 0, _round_div(255 * delta, np.maximum(Cmax, 1))), np.uint8)
+
+
+@lru_cache(maxsize=1)
+def _hsl_saturation_table() -> np.ndarray:
+    """### Returns round(255 * delta / (255 - |max + min - 255|)) indexed by (max + min) * 256 + delta"""
+    total = np.arange(511)[:, None]
+    delta = np.arange(256)
+    denominator = 255 - np.abs(total - 255)
+    S = np.where(denominator == 0, 0, _round_div(255 * delta, np.maximum(denominator, 1)))
+    return _table(np.minimum(S, 255), np.uint8)
+
+
+def _check_hue_range(hue_range: int) -> type:
+    """### Returns the output integer type of a hue range"""
+    if hue_range not in HUE_RANGES:
+        raise ValueError(f"Hue range can only be one of the following: {tuple(HUE_RANGES)}!")
+    return HUE_RANGES[hue_range]
+
+
+def _check_image(image: np.ndarray, dtypes: tuple, name: str) -> np.ndarray:
+    """### Returns an image as (N, 3) pixels after checking its type and shape"""
+    if not isinstance(image, np.ndarray) or image.dtype not in dtypes:
+        raise TypeError(f"{name} image must be a numpy array of type {' or '.join(np.dtype(i).name for i in dtypes)}!")
+    if image.ndim == 0 or image.shape[-1] != 3:
+        raise ValueError(f"{name} image must have shape (..., 3)!")
+    return image.reshape(-1, 3)
+
+
+def _run(kernel, pixels: np.ndarray, dtype: type, shape: tuple, chunk: int, *args) -> np.ndarray:
+    """### Runs a kernel over chunks of pixels and returns the result with the shape of the image"""
+    if chunk < 1:
+        raise ValueError("Chunk must be a positive integer!")
+    res = np.empty(pixels.shape, dtype=dtype)
+    for start in range(0, len(pixels), chunk):
+        kernel(pixels[start:start + chunk], res[start:start + chunk], *args)
+    return res.reshape(shape)
+
+
+def _hue(R: np.ndarray, G: np.ndarray, B: np.ndarray, hue_range: int) -> tuple[np.ndarray, ...]:
+    """### Returns the hue, max, min and delta of int32 R, G, B arrays"""
+    Cmax = np.maximum(np.maximum(R, G), B)
+    Cmin = np.minimum(np.minimum(R, G), B)
+    delta = Cmax - Cmin
+    # Same priority as get_hue: red, green, then blue
+    red = R == Cmax
+    green = ~red & (G == Cmax)
+    blue = ~(red | green)
+    diff = np.where(red, G - B, np.where(green, B - R, R - G))
+    H = _hue_table(hue_range)[(diff + 255) * 256 + delta].astype(np.int32)
+    H += green * (hue_range // 3) + blue * (hue_range * 2 // 3)
+    # Negative red hues wrap around. Like the round output of rgb_to_hsv the last step never rounds up to 0
+    H += (red & (diff < 0)) * hue_range
+    np.minimum(H, hue_range - 1, out=H)
+    return H, Cmax, Cmin, delta
+
+
+def _rgb_to_hsv_kernel(pixels: np.ndarray, out: np.ndarray, hue_range: int):
+    """### Writes the H, S, V values of a chunk of uint8 pixels"""
+    H, Cmax, _, delta = _hue(*(pixels[:, i].astype(np.int32) for i in range(3)), hue_range)
+    out[:, 0] = H
+    out[:, 1] = _hsv_saturation_table()[Cmax * 256 + delta]
+    out[:, 2] = Cmax
+
+
+def _rgb_to_hsl_kernel(pixels: np.ndarray, out: np.ndarray, hue_range: int):
+    """### Writes the H, S, L values of a chunk of uint8 pixels"""
+    H, Cmax, Cmin, delta = _hue(*(pixels[:, i].astype(np.int32) for i in range(3)), hue_range)
+    total = Cmax + Cmin
+    out[:, 0] = H
+    out[:, 1] = _hsl_saturation_table()[total * 256 + delta]
+    # (max + min) / 2 rounded half to even
+    half = total >> 1
+    out[:, 2] = half + (total & half & 1)
+
+
+def _hsv_to_rgb_kernel(pixels: np.ndarray, out: np.ndarray, hue_range: int):
+    """### Writes the R, G, B values of a chunk of H, S, V pixels"""
+    H, S, V = (pixels[:, i].astype(np.int32) for i in range(3))
+    # channel = V - V * S * clip(min(k, 4 - k), 0, 1) with k = (n + H / 60) % 6 in 8-bit units
+    unit = hue_range // 6
+    full, VS = V * (255 * unit), V * S
+    for channel, n in enumerate((5, 3, 1)):
+        k = H + n * unit
+        k %= 6 * unit
+        t = np.minimum(k, 4 * unit - k)
+        np.clip(t, 0, unit, out=t)
+        out[:, channel] = _round_div(full - VS * t, 255 * unit)
+
+
+def _hsl_to_rgb_kernel(pixels: np.ndarray, out: np.ndarray, hue_range: int):
+    """### Writes the R, G, B values of a chunk of H, S, L pixels"""
+    H, S, L = (pixels[:, i].astype(np.int32) for i in range(3))
+    # channel = L - S * min(L, 1 - L) * clip(min(k - 3, 9 - k), -1, 1) with k = (n + H / 30) % 12 in 8-bit units
+    unit = hue_range // 12
+    full, a = L * (255 * unit), S * np.minimum(L, 255 - L)
+    for channel, n in enumerate((0, 8, 4)):
+        k = H + n * unit
+        k %= 12 * unit
+        t = np.minimum(k - 3 * unit, 9 * unit - k)
+        np.clip(t, -unit, unit, out=t)
+        out[:, channel] = _round_div(full - a * t, 255 * unit)
+
+
+def _check_hsw(image: np.ndarray, hue_range: int, name: str) -> np.ndarray:
+    """### Returns an H, S, W image as (N, 3) pixels after checking its values"""
+    pixels = _check_image(image, (np.uint8, np.uint16), name)
+    if pixels.size and (pixels[:, 0].max() >= hue_range or pixels[:, 1:].max() > 255):
+        raise ValueError(f"Hue must be in range 0-{hue_range - 1} and the other channels in range 0-255!")
+    return pixels
+
+
+def rgb_to_hsv_uint8(image: np.ndarray, hue_range: int = 180, chunk: int = 65536) -> np.ndarray:
+    """### Converts an 8-bit RGB image to HSV with integer arithmetic only
+
+    ### Args:
+        `image` (numpy.ndarray | Buffer): uint8 R, G, B values with shape (..., 3) or a flat buffer of them
+        `hue_range` (int, optional): 180 (H in range 0-179, two degrees per step) or 360 (H in degrees).
+                                    Defaults to 180.
+        `chunk` (int, optional): How many pixels are processed at once. Defaults to 65536.
+
+    ### Returns:
+        numpy.ndarray: H, S, V values (S and V in range 0-255) with the shape of the image. \
+            uint8 for hue range 180, uint16 for hue range 360
+    """
+    dtype = _check_hue_range(hue_range)
+    image = _buffer_view(image)
+    pixels = _check_image(image, (np.uint8,), "RGB")
+    return _run(_rgb_to_hsv_kernel, pixels, dtype, image.shape, chunk, hue_range)
+
+
+def rgb_to_hsl_uint8(image: np.ndarray, hue_range: int = 180, chunk: int = 65536) -> np.ndarray:
+    """### Converts an 8-bit RGB image to HSL with integer arithmetic only
+
+    ### Args:
+        `image` (numpy.ndarray | Buffer): uint8 R, G, B values with shape (..., 3) or a flat buffer of them
+        `hue_range` (int, optional): 180 (H in range 0-179, two degrees per step) or 360 (H in degrees).
+                                    Defaults to 180.
+        `chunk` (int, optional): How many pixels are processed at once. Defaults to 65536.
+
+    ### Returns:
+        numpy.ndarray: H, S, L values (S and L in range 0-255) with the shape of the image. \
+            uint8 for hue range 180, uint16 for hue range 360
+    """
+    dtype = _check_hue_range(hue_range)
+    image = _buffer_view(image)
+    pixels = _check_image(image, (np.uint8,), "RGB")
+    return _run(_rgb_to_hsl_kernel, pixels, dtype, image.shape, chunk, hue_range)
+
+
+def hsv_to_rgb_uint8(image: np.ndarray, hue_range: int = 180, chunk: int = 65536) -> np.ndarray:
+    """### Converts an integer HSV image (as returned by `rgb_to_hsv_uint8`) to 8-bit RGB
+
+    ### Args:
+        `image` (numpy.ndarray): uint8 or uint16 H, S, V values with shape (..., 3)
+        `hue_range` (int, optional): The hue range of the input, either 180 or 360. Defaults to 180.
+        `chunk` (int, optional): How many pixels are processed at once. Defaults to 65536.
+
+    ### Returns:
+        numpy.ndarray: uint8 R, G, B values with the shape of the image
+    """
+    _check_hue_range(hue_range)
+    image = _buffer_view(image)
+    pixels = _check_hsw(image, hue_range, "HSV")
+    return _run(_hsv_to_rgb_kernel, pixels, np.uint8, image.shape, chunk, hue_range)
+
+
+def hsl_to_rgb_uint8(image: np.ndarray, hue_range: int = 180, chunk: int = 65536) -> np.ndarray:
+    """### Converts an integer HSL image (as returned by `rgb_to_hsl_uint8`) to 8-bit RGB
+
+    ### Args:
+        `image` (numpy.ndarray): uint8 or uint16 H, S, L values with shape (..., 3)
+        `hue_range` (int, optional): The hue range of the input, either 180 or 360. Defaults to 180.
+        `chunk` (int, optional): How many pixels are processed at once. Defaults to 65536.
+
+    ### Returns:
+        numpy.ndarray: uint8 R, G, B values with the shape of the image
+    """
+    _check_hue_range(hue_range)
+    image = _buffer_view(image)
+    pixels = _check_hsw(image, hue_range, "HSL")
+    return _run(_hsl_to_rgb_kernel, pixels, np.uint8, image.shape, chunk, hue_range)
@@ -241,6 +241,20 @@ def check_xyz(XYZ, normalized: bool = False, big_float: bool = True):
     return (X/100, Y/100, Z/100) if normalized else (X, Y, Z)
 
 
+def apply_matrix(matrix, vals: tuple | list) -> tuple[float, float, float]:
+    """### Multiplies three values by a 3x3 matrix (e.g. R, G, B to X, Y, Z)
+
+    ### Args:
+        `matrix` (tuple | list | numpy.ndarray): The 3x3 matrix
+        `vals` (tuple | list): The three values
+
+    ### Returns:
+        tuple: The three converted values
+    """
+    A, B, C = vals
+    return tuple((A * matrix[i][0]) + (B * matrix[i][1]) + (C * matrix[i][2]) for i in range(3))
+
+
 def return_rgb(
     RGB: tuple | list,
     output: Enum,
@@ -0,0 +1,299 @@
+"""This module contains the OKLab and OKLCh perceptual color spaces (scalar and array versions) and the
+gradients, nearest color search and sorting built on them.
+OKLab goes straight from linear sRGB through two 3x3 matrices and a cube root. There is no chromatic adaptation
+and no reference white division so it's a lot cheaper than CIELab while being at least as perceptually uniform.
+
+Reference 1 https://bottosson.github.io/posts/oklab/
+Reference 2 https://www.w3.org/TR/css-color-4/#ok-lab
+"""
+# pylint: disable=invalid-name, protected-access
+from enum import Enum
+from math import atan2, copysign, cos, degrees, hypot, radians, sin
+
+import numpy as np
+
+from . import batch_converters as bc
+from . import batch_transfer_functions as btf
+from . import internal_helpers as ih
+from .buffers import Workspace, _buffer_view, _output
+from .constants import Out1
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= Linear sRGB -> LMS cone responses and cube rooted LMS -> OKLab
+M_RGB_TO_LMS = np.array((
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005)))
+M_LMS_TO_OKLAB = np.array((
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660)))
+#= The inverse matrices as published (more precise than inverting the ones above)
+M_OKLAB_TO_LMS = np.array((
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480)))
+M_LMS_TO_RGB = np.array((
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010)))
+
+for _matrix in (M_RGB_TO_LMS, M_LMS_TO_OKLAB, M_OKLAB_TO_LMS, M_LMS_TO_RGB):
+    _matrix.flags.writeable = False
+
+#= Matrices as tuples are faster for the scalar functions
+_RGB_TO_LMS, _LMS_TO_OKLAB, _OKLAB_TO_LMS, _LMS_TO_RGB = (
+    tuple(tuple(float(j) for j in i) for i in m) for m in (M_RGB_TO_LMS, M_LMS_TO_OKLAB, M_OKLAB_TO_LMS, M_LMS_TO_RGB))
+
+#= Values the colors can be sorted by
+SORT_KEYS = ("lightness", "chroma", "hue")
+
+
+def _check_lab(values: tuple, name: str) -> tuple[float, float, float]:
+    """### Returns the three values of a scalar OKLab/OKLCh color passed as 3 values or one sequence"""
+    if len(values) == 1 and isinstance(values[0], (tuple, list)):
+        values = values[0]
+    if len(values) != 3 or not all(isinstance(i, (int, float)) for i in values):
+        raise ValueError(f"{name} color must be 3 int or float values or a tuple/list containing them!")
+    return tuple(float(i) for i in values)
+
+
+def rgb_to_oklab(*color, depth: int = 8) -> tuple[float, float, float]:
+    """### Takes an sRGB color and returns its OKLab values
+
+    ### Args:
+        `color` (Color): String "c0ffee", "#decaff", consecutive values either int in range 0-255 or float in \
+                range 0-1 or an RGB list/tuple(R, G, B) with the same values
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+
+    ### Returns:
+        tuple[float, float, float]: L in range 0-1, a and b roughly in range -0.4-0.4
+    """
+    RGB = ih.check_color(color, depth=depth, normalized=True)
+    # sRGB decode. Same as transfer_functions.srgb without checking the color again
+    RGB = (((i + 0.055) / 1.055) ** 2.4 if i > 0.04045 else i / 12.92 for i in RGB)
+    LMS = (copysign(abs(i) ** (1 / 3), i) for i in ih.apply_matrix(_RGB_TO_LMS, RGB))
+    return ih.apply_matrix(_LMS_TO_OKLAB, LMS)
+
+
+def oklab_to_rgb(*Lab, depth: int = 8, output: Enum = Out1.ROUND):
+    """### Takes an OKLab color and returns its sRGB values. Colors outside of the sRGB gamut are clipped
+
+    ### Args:
+        `Lab` (int | float | tuple | list): L in range 0-1, a and b roughly in range -0.4-0.4 as 3 consecutive
+                                            values or a tuple/list containing them
+        `depth` (int | float): The bit depth of the output RGB values. Defaults to 8-bit (range 0-255)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.ROUND.
+
+    ### Returns:
+        str | tuple[int, int, int] | tuple[float, float, float]: Red, Green, Blue
+    """
+    LMS = (i ** 3 for i in ih.apply_matrix(_OKLAB_TO_LMS, _check_lab(Lab, "OKLab")))
+    RGB = (max(min(i, 1.0), 0.0) for i in ih.apply_matrix(_LMS_TO_RGB, LMS))
+    RGB = (1.055 * i ** (1 / 2.4) - 0.055 if i > 0.0031308 else i * 12.92 for i in RGB)
+    return ih.return_rgb(tuple(RGB), output=output, depth=depth, normalized_input=True)
+
+
+def oklab_to_oklch(*Lab) -> tuple[float, float, float]:
+    """### Converts an OKLab color to OKLCh (Lightness, Chroma, hue in degrees 0-360)"""
+    L, a, b = _check_lab(Lab, "OKLab")
+    return L, hypot(a, b), degrees(atan2(b, a)) % 360
+
+
+def oklch_to_oklab(*LCh) -> tuple[float, float, float]:
+    """### Converts an OKLCh color (Lightness, Chroma, hue in degrees) to OKLab"""
+    L, C, h = _check_lab(LCh, "OKLCh")
+    return L, C * cos(radians(h)), C * sin(radians(h))
+
+
+def rgb_to_oklch(*color, depth: int = 8) -> tuple[float, float, float]:
+    """### Takes an sRGB color and returns its OKLCh values
+
+    ### Args:
+        `color` (Color): String "c0ffee", "#decaff", consecutive values either int in range 0-255 or float in \
+                range 0-1 or an RGB list/tuple(R, G, B) with the same values
+        `depth` (int | float): The bit depth of the input RGB values. Defaults to 8-bit (range 0-255)
+
+    ### Returns:
+        tuple[float, float, float]: L in range 0-1, C roughly in range 0-0.4, h in degrees 0-360
+    """
+    return oklab_to_oklch(rgb_to_oklab(*color, depth=depth))
+
+
+def oklch_to_rgb(*LCh, depth: int = 8, output: Enum = Out1.ROUND):
+    """### Takes an OKLCh color and returns its sRGB values. Colors outside of the sRGB gamut are clipped
+
+    ### Args:
+        `LCh` (int | float | tuple | list): L in range 0-1, C roughly in range 0-0.4, h in degrees
+        `depth` (int | float): The bit depth of the output RGB values. Defaults to 8-bit (range 0-255)
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.ROUND.
+
+    ### Returns:
+        str | tuple[int, int, int] | tuple[float, float, float]: Red, Green, Blue
+    """
+    return oklab_to_rgb(oklch_to_oklab(*LCh), depth=depth, output=output)
+
+
+def rgb_to_oklab_batch(colors, depth: int = 8, out: np.ndarray = None, workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of sRGB colors and returns their OKLab values
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `depth` (int, optional): The bit depth of integer input values. Defaults to 8.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the linear and LMS values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: L, a, b values with shape (..., 3)
+    """
+    ws = Workspace() if workspace is None else workspace
+    colors = bc._colors_array(colors, depth, ws)
+    linear = btf.srgb(colors, decode=True, out=ws.array("linear", colors.shape, colors.dtype), workspace=ws)
+    LMS = np.matmul(linear, M_RGB_TO_LMS.T, out=ws.array("LMS", colors.shape))
+    return np.matmul(np.cbrt(LMS, out=LMS), M_LMS_TO_OKLAB.T, out=_output(out, colors.shape))
+
+
+def oklab_to_rgb_batch(
+    Lab,
+    depth: int = 8,
+    output: Enum = Out1.NORMALIZED,
+    out: np.ndarray = None,
+    workspace: Workspace = None) -> np.ndarray:
+    """### Takes an array of OKLab colors and returns their sRGB values. Colors outside of the gamut are clipped
+
+    ### Args:
+        `Lab` (array_like): L, a, b values with shape (..., 3)
+        `depth` (int, optional): The bit depth of the output values. Defaults to 8.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.NORMALIZED.
+        `out` (numpy.ndarray, optional): A float array with the shape of the input the result is written into.
+                                    Only for normalized and direct output. Defaults to None (a new array).
+        `workspace` (Workspace, optional): Scratch arrays for the LMS and linear values reused between calls.
+                                    Defaults to None.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with shape (..., 3) (without the last axis for hex output)
+    """
+    bc._check_out(out, output)
+    ws = Workspace() if workspace is None else workspace
+    Lab = np.asarray(_buffer_view(Lab), dtype=np.float64)
+    LMS = np.matmul(Lab, M_OKLAB_TO_LMS.T, out=ws.array("LMS", Lab.shape))
+    RGB = np.matmul(np.power(LMS, 3, out=LMS), M_LMS_TO_RGB.T, out=ws.array("linear", Lab.shape))
+    np.clip(RGB, 0, 1, out=RGB)
+    return bc.return_rgb_batch(btf.srgb(RGB, out=out, workspace=ws), output, depth, inplace=True)
+
+
+def oklab_to_oklch_batch(Lab) -> np.ndarray:
+    """### Converts an array of OKLab colors to OKLCh (Lightness, Chroma, hue in degrees 0-360)"""
+    Lab = np.asarray(_buffer_view(Lab), dtype=np.float64)
+    a, b = Lab[..., 1], Lab[..., 2]
+    return np.stack((Lab[..., 0], np.hypot(a, b), np.degrees(np.arctan2(b, a)) % 360), axis=-1)
+
+
+def oklch_to_oklab_batch(LCh) -> np.ndarray:
+    """### Converts an array of OKLCh colors (Lightness, Chroma, hue in degrees) to OKLab"""
+    LCh = np.asarray(_buffer_view(LCh), dtype=np.float64)
+    h = np.radians(LCh[..., 2])
+    return np.stack((LCh[..., 0], LCh[..., 1] * np.cos(h), LCh[..., 1] * np.sin(h)), axis=-1)
+
+
+def rgb_to_oklch_batch(colors, depth: int = 8) -> np.ndarray:
+    """### Takes an array of sRGB colors and returns their OKLCh values with shape (..., 3)"""
+    return oklab_to_oklch_batch(rgb_to_oklab_batch(colors, depth))
+
+
+def oklch_to_rgb_batch(LCh, depth: int = 8, output: Enum = Out1.NORMALIZED) -> np.ndarray:
+    """### Takes an array of OKLCh colors and returns their sRGB values. Colors outside of the gamut are clipped"""
+    return oklab_to_rgb_batch(oklch_to_oklab_batch(LCh), depth, output)
+
+
+def oklab_gradient(
+    color1: str | tuple | list,
+    color2: str | tuple | list,
+    depth: int = 8,
+    steps: int = 4,
+    include_inputs: bool = False,
+    polar: bool = False,
+    output: Enum = Out1.HEX) -> list:
+    """### Calculates len(steps) perceptually equally spaced colors between color1 and color2
+    Same as color_utils.get_gradient but the colors are interpolated in OKLab (or OKLCh) instead of sRGB.
+
+    ### Args:
+        `color1, color2` (str | tuple | list): Hex strings or R, G, B sequences of ints in range 0-255 or floats 0-1
+        `depth` (int | float): The bit depth of the input and output RGB values. Defaults to 8-bit (range 0-255)
+        `steps` (int, optional): The number of new colors to be generated. Defaults to 4
+        `include_inputs` (bool, optional): If true, the input colors will be included in the final list.
+        `polar` (bool, optional): Interpolate the hue along the shorter arc in OKLCh instead of a straight line
+                                    in OKLab. Keeps the colors saturated between distant hues. Defaults to False.
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.HEX.
+
+    ### Returns:
+        list: The colors in the requested output type
+    """
+    Lab = rgb_to_oklab_batch([ih.check_color(i, depth=depth, normalized=True) for i in (color1, color2)])
+    t = np.linspace(0, 1, steps + 2)[:, None]
+    if polar:
+        LCh = oklab_to_oklch_batch(Lab)
+        # The difference of the hues in range -180-180 is the shorter way around the hue circle
+        LCh[1, 2] = LCh[0, 2] + (LCh[1, 2] - LCh[0, 2] + 180) % 360 - 180
+        res = oklch_to_rgb_batch(LCh[0] + t * (LCh[1] - LCh[0]), depth, output)
+    else:
+        res = oklab_to_rgb_batch(Lab[0] + t * (Lab[1] - Lab[0]), depth, output)
+    res = res.tolist() if output in (Out1.HEX, Out1.HEXP) else [tuple(i) for i in res.tolist()]
+    return res if include_inputs else res[1:-1]
+
+
+def nearest_color(colors, palette, depth: int = 8, chunk: int = 4096) -> np.ndarray:
+    """### Finds the perceptually closest palette color (smallest distance in OKLab) for every color
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (..., 3) or hex strings
+        `palette` (array_like): The R, G, B triples or hex strings to choose from with shape (N, 3) or (N,)
+        `depth` (int, optional): The bit depth of integer input values. Defaults to 8.
+        `chunk` (int, optional): How many colors are compared to the whole palette at once. Defaults to 4096.
+
+    ### Returns:
+        numpy.ndarray: The index of the closest palette color for every color with the shape of the colors
+                        without the last axis. E.g. `palette[nearest_color(image, palette)]` quantizes an image.
+    """
+    Lab = rgb_to_oklab_batch(colors, depth)
+    shape = Lab.shape[:-1]
+    Lab = Lab.reshape(-1, 3)
+    table = rgb_to_oklab_batch(palette, depth).reshape(-1, 3)
+    res = np.empty(len(Lab), dtype=np.intp)
+    # |x - p|² = |x|² - 2x·p + |p|² where |x|² is the same for every palette color
+    norms = np.einsum("ij,ij->i", table, table)
+    for start in range(0, len(Lab), chunk):
+        res[start:start + chunk] = (norms - 2 * Lab[start:start + chunk] @ table.T).argmin(axis=1)
+    return res.reshape(shape)
+
+
+def sort_colors(colors, by: str = "hue", depth: int = 8, reverse: bool = False) -> np.ndarray:
+    """### Returns the order of colors sorted by their perceptual lightness, chroma or hue (in OKLCh)
+
+    ### Args:
+        `colors` (array_like): R, G, B triples with shape (N, 3) or hex strings with shape (N,)
+        `by` (str, optional): One of the SORT_KEYS: "lightness", "chroma" or "hue". Defaults to "hue".
+        `depth` (int, optional): The bit depth of integer input values. Defaults to 8.
+        `reverse` (bool, optional): Sort in descending order. Defaults to False.
+
+    #### N/B: Colors with (almost) no chroma have no meaningful hue. They are put first when sorting by hue, \
+        ordered by lightness.
+
+    ### Returns:
+        numpy.ndarray: The indices that sort the colors. E.g. `np.asarray(colors)[sort_colors(colors)]`
+    """
+    if by not in SORT_KEYS:
+        raise ValueError(f"Colors can only be sorted by one of the following: {SORT_KEYS}")
+    L, C, h = np.moveaxis(rgb_to_oklch_batch(colors, depth).reshape(-1, 3), -1, 0)
+    match by:
+        case "lightness":
+            order = np.argsort(L, kind="stable")
+        case "chroma":
+            order = np.argsort(C, kind="stable")
+        case _:
+            order = np.lexsort((L, np.where(C < 1e-4, -1, h)))
+    return order[::-1] if reverse else order
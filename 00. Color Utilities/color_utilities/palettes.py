@@ -0,0 +1,197 @@
+"""This module contains a constrained random palette generator.
+Candidates are drawn in batches in OKLCh within the requested hue range, lightness band and chroma range. Then the
+ones outside of the gamut of the color space or with too little contrast against a background are rejected. The
+palette is picked from the rest with farthest-point sampling. Every new color is the candidate farthest from the
+colors picked so far, so the palette is as distinct as the candidates allow. A uniform grid over the candidates
+limits each update to the ones close enough to be affected.
+
+Reference 1 https://en.wikipedia.org/wiki/Farthest-first_traversal
+Reference 2 https://www.w3.org/TR/WCAG21/#dfn-contrast-ratio
+"""
+# pylint: disable=invalid-name, protected-access
+from enum import Enum
+
+import numpy as np
+
+from . import batch_converters as bc
+from . import batch_transfer_functions as btf
+from . import xyz
+from .constants import Out1
+from .oklab import M_LMS_TO_RGB, M_OKLAB_TO_LMS
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The widest OKLCh chroma of the color spaces in color_spaces (Rec. 2020 greens reach about 0.37)
+MAX_CHROMA = 0.5
+
+#= The min number of candidates drawn per batch and the max number of batches before giving up
+BATCH_SIZE = 4096
+MAX_BATCHES = 64
+
+
+class _GridIndex:
+    """### A uniform grid over 3D points answering which points may lie within a radius of a position"""
+
+    def __init__(self, points: np.ndarray, cell: float):
+        self.cell = cell
+        self.low = points.min(axis=0)
+        coords = ((points - self.low) // cell).astype(np.int64)
+        self.shape = coords.max(axis=0) + 1
+        self.cells = int(self.shape.prod())
+        keys = np.ravel_multi_index(tuple(coords.T), tuple(self.shape))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def query(self, position: np.ndarray, radius: float) -> np.ndarray | None:
+        """### Returns the indices of the points in the cells touching the sphere or None if it covers many of them"""
+        low = np.maximum(((position - radius - self.low) // self.cell).astype(np.int64), 0)
+        high = np.minimum(((position + radius - self.low) // self.cell).astype(np.int64), self.shape - 1)
+        span = high - low + 1
+        if span.prod() * 8 > self.cells:
+            return None
+        # Cells with the same first two coordinates and consecutive third ones are contiguous in the sorted keys
+        first = ((np.arange(low[0], high[0] + 1)[:, None] * self.shape[1] + np.arange(low[1], high[1] + 1))
+                 * self.shape[2] + low[2]).ravel()
+        starts = np.searchsorted(self.keys, first)
+        lengths = np.searchsorted(self.keys, first + span[2]) - starts
+        # Concatenated ranges [start, end) without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.order[np.arange(len(offsets)) + offsets]
+
+
+def _farthest_points(points: np.ndarray, n: int, min_distance: float) -> tuple[np.ndarray, float]:
+    """### Picks `n` points with farthest-point sampling
+
+    ### Returns:
+        tuple[numpy.ndarray, float]: The indices of the picked points and the smallest distance between them
+    """
+    # Cells about the size of the expected final spacing so late updates only touch a few cells
+    volume = np.prod(np.maximum(np.ptp(points, axis=0), 1e-6))
+    index = _GridIndex(points, max((volume / n) ** (1 / 3), 1e-6))
+    #* Squared distances to the closest picked point
+    distances = np.full(len(points), np.inf)
+    picked = np.empty(n, dtype=np.intp)
+    closest = np.inf
+    current = 0  # The candidates are random so the first one is as good as any
+    for i in range(n):
+        picked[i] = current
+        position = points[current]
+        near = index.query(position, np.sqrt(closest)) if np.isfinite(closest) else None
+        if near is None:
+            diff = points - position
+            np.minimum(distances, np.einsum("ij,ij->i", diff, diff), out=distances)
+        elif len(near):
+            diff = points[near] - position
+            distances[near] = np.minimum(distances[near], np.einsum("ij,ij->i", diff, diff))
+        current = int(distances.argmax())
+        if i + 1 < n:
+            closest = distances[current]
+            if closest < min_distance ** 2 or closest == 0:
+                raise ValueError(f"Only {i + 1} colors satisfying all constraints are at least {min_distance} "
+                                 "apart! Loosen the constraints or lower the minimum distance.")
+    return picked, float(np.sqrt(closest))
+
+
+def _relative_luminance(linear: np.ndarray, color_space: str) -> np.ndarray:
+    """### Returns the relative luminance (Y) of linear R, G, B values of a color space"""
+    return linear @ xyz._rgb_to_xyz_matrix(color_space)[1]
+
+
+def _candidates(
+    rng: np.random.Generator,
+    count: int,
+    hue_range: tuple,
+    lightness: tuple,
+    chroma: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """### Returns random OKLab colors within the constraints and their linear sRGB values"""
+    L = rng.uniform(*lightness, count)
+    # Uniform over the area of the chroma ring instead of bunching up around the gray axis
+    C = np.sqrt(rng.uniform(chroma[0] ** 2, chroma[1] ** 2, count))
+    if hue_range is None:
+        h = rng.uniform(0, 2 * np.pi, count)
+    else:
+        span = (hue_range[1] - hue_range[0]) % 360 or 360
+        h = np.radians(hue_range[0] + rng.uniform(0, span, count))
+    Lab = np.stack((L, C * np.cos(h), C * np.sin(h)), axis=-1)
+    LMS = Lab @ M_OKLAB_TO_LMS.T
+    return Lab, (LMS * LMS * LMS) @ M_LMS_TO_RGB.T
+
+
+def generate_palette(
+    n: int,
+    min_distance: float = 0.0,
+    hue_range: tuple | list | None = None,
+    lightness: tuple | list = (0.0, 1.0),
+    chroma: tuple | list = (0.0, MAX_CHROMA),
+    color_space: str = "sRGB",
+    background=None,
+    min_contrast: float = 1.0,
+    depth: int = 8,
+    candidates: int | None = None,
+    seed: int = None,
+    output: Enum = Out1.HEX) -> np.ndarray:
+    """### Generates `n` random, mutually distinct colors satisfying all constraints
+
+    ### Args:
+        `n` (int): How many colors to generate
+        `min_distance` (float, optional): The minimum OKLab distance (ΔEOK) between any two colors. About 0.02
+                                    is just noticeable, 0.1 is clearly different. Defaults to 0.0.
+        `hue_range` (tuple | list | None, optional): (from, to) OKLCh hue in degrees. Ranges can wrap around
+                                    like (330, 30). Defaults to None (every hue).
+        `lightness` (tuple | list, optional): (min, max) OKLab L in range 0-1. Defaults to (0.0, 1.0).
+        `chroma` (tuple | list, optional): (min, max) OKLCh chroma. Defaults to (0.0, MAX_CHROMA).
+        `color_space` (str, optional): The RGB color space whose gamut the colors must be in and of the
+                                    output values. Defaults to "sRGB".
+        `background` (Color, optional): A color in `color_space` the palette must contrast with. Defaults to None.
+        `min_contrast` (float, optional): The minimum WCAG contrast ratio against the background (e.g. 4.5
+                                    for AA text). Defaults to 1.0.
+        `depth` (int, optional): The bit depth of the background and of the output. Defaults to 8.
+        `candidates` (int, optional): How many valid candidates the palette is picked from. More candidates
+                                    give a more even palette. Defaults to max(10 * n, 4096).
+        `seed` (int, optional): Use if you want to get the same colors every time. Defaults to None (different).
+        `output` (Enum, optional): Out1 enum options available. Defaults to Out1.HEX.
+
+    #### N/B: The colors are in the order they were picked. Every color is the most distinct one from all \
+        colors before it so the first k colors of a palette are also a good palette of k colors.
+
+    ### Returns:
+        numpy.ndarray: R, G, B values with shape (n, 3) (or (n,) for hex output)
+    """
+    if n < 1:
+        raise ValueError("The number of colors must be a positive integer!")
+    if not 0 <= lightness[0] <= lightness[1] <= 1:
+        raise ValueError("Lightness must be a (min, max) range within 0-1!")
+    if not 0 <= chroma[0] <= chroma[1]:
+        raise ValueError("Chroma must be a (min, max) range of non-negative values!")
+    color_space = xyz.color_space_name(color_space)
+    to_space = xyz.rgb_to_rgb_matrix("sRGB", color_space).T
+    encode = btf.get_transfer_function(color_space)
+    if background is not None:
+        background_Y = _relative_luminance(encode(bc._colors_array(background, depth), decode=True), color_space)
+    candidates = max(10 * n, BATCH_SIZE) if candidates is None else max(candidates, n)
+
+    rng = np.random.default_rng(seed)
+    found_Lab, found_RGB, total, drawn = [], [], 0, 0
+    for _ in range(MAX_BATCHES):
+        # Draw as many as the share of valid candidates so far suggests are still missing
+        rate = max(total / drawn, 0.01) if drawn else 1.0
+        count = min(max(BATCH_SIZE, int((candidates - total) / rate * 1.2)), 64 * BATCH_SIZE)
+        Lab, linear = _candidates(rng, count, hue_range, lightness, chroma)
+        drawn += count
+        linear = linear @ to_space
+        valid = np.all((linear >= -1e-9) & (linear <= 1 + 1e-9), axis=1)
+        if background is not None:
+            Y = _relative_luminance(linear, color_space)
+            valid &= (np.maximum(Y, background_Y) + 0.05) / (np.minimum(Y, background_Y) + 0.05) >= min_contrast
+        found_Lab.append(Lab[valid])
+        found_RGB.append(linear[valid])
+        total += int(valid.sum())
+        if total >= candidates:
+            break
+    if total < n:
+        raise ValueError(f"Only {total} colors satisfying all constraints were found! Loosen the constraints.")
+
+    picked, _ = _farthest_points(np.concatenate(found_Lab)[:candidates], n, min_distance)
+    RGB = np.clip(np.concatenate(found_RGB)[picked], 0, 1)
+    return bc.return_rgb_batch(encode(RGB), output, depth, inplace=True)
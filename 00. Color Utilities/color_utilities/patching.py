@@ -0,0 +1,86 @@
+"""This module contains the function patching shared by the opt-in layers: the cache and the profilers.
+A layer replaces functions of the package modules (and the transfer functions of the color spaces) with wrappers.
+The wrappers of all enabled layers are stacked in the order the layers were enabled and every change rebuilds the
+stacks from the original functions, so the layers can be enabled and disabled in any order.
+"""
+import threading
+from collections.abc import Callable
+from functools import partial
+
+_lock = threading.RLock()
+
+#* (id of the target, name): (target, name, original value, patched value). Targets are module or color space dicts
+_slots = {}
+
+#* The enabled layers in order: [layer, targets, {id of an original function: makes the wrapper of a function}, made]
+_layers = []
+
+
+def _restore():
+    """### Puts the original values back unless they were replaced by something else since"""
+    for target, name, original, patched in _slots.values():
+        if target.get(name) is patched:
+            target[name] = original
+    _slots.clear()
+
+
+def _stack(value: Callable, maker: Callable, made: dict) -> Callable:
+    """### Returns the wrapper of a layer around a value (the original or the wrapper of the layer below it).
+    Wrappers are reused so a function keeps its wrapper while the layers below it don't change"""
+    if (found := made.get(id(value))) is None:
+        found = made[id(value)] = (value, maker(value))
+    return found[1]
+
+
+def _apply():
+    """### Wraps the original functions with the wrappers of every enabled layer"""
+    for targets in {id(j): j for i in _layers for j in i[1]}.values():
+        for name, original in list(targets.items()):
+            func, args = (original.func, original) if isinstance(original, partial) else (original, None)
+            value = func
+            for _, _, makers, made in _layers:
+                if (maker := makers.get(id(func))) is not None:
+                    value = _stack(value, maker, made)
+            if value is not func:
+                # Color spaces keep their transfer functions with bound arguments
+                value = partial(value, *args.args, **args.keywords) if args is not None else value
+                targets[name] = value
+                _slots[id(targets), name] = (targets, name, original, value)
+
+
+def patch(layer, targets: Callable, wrappers: Callable):
+    """### Enables a layer on top of the enabled ones. Does nothing if it is already enabled
+
+    ### Args:
+        `layer` (object): Identifies the layer
+        `targets` (Callable): Returns the dicts (module or color space dicts) whose values are replaced
+        `wrappers` (Callable): Returns {id of an original function: a function returning its wrapper of a function}.
+                                    Both are called while the original functions are in place.
+    """
+    with _lock:
+        if patched(layer):
+            return
+        _restore()
+        try:
+            _layers.append([layer, list(targets()), wrappers(), {}])
+        finally:
+            _apply()
+
+
+def unpatch(layer):
+    """### Disables a layer. The wrappers of the other layers stay in place"""
+    with _lock:
+        if patched(layer):
+            _restore()
+            _layers[:] = [i for i in _layers if i[0] is not layer]
+            _apply()
+
+
+def patched(layer) -> bool:
+    """### Whether a layer is enabled"""
+    return any(i[0] is layer for i in _layers)
+
+
+def layers() -> list:
+    """### Returns the enabled layers from the first enabled to the last one"""
+    return [i[0] for i in _layers]
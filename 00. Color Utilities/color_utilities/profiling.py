@@ -0,0 +1,269 @@
+"""This module contains opt-in profiling of the conversion functions.
+Calls and time are counted per public function and per internal stage of a conversion: input validation,
+transfer function, matrix, chromatic adaptation and output formatting. The functions are only wrapped while a
+profiler is enabled so there is no overhead at all otherwise.
+
+Example:
+    >>> with profile() as prof:
+    ...     rgb_to_xyz(10, 20, 30)
+    >>> print(prof.table())
+    >>> pstats.Stats(prof).sort_stats("tottime").print_stats(10)
+
+Setting the COLOR_UTILITIES_PROFILE environment variable to "1" profiles the whole program and prints the table
+on exit. Any other value is used as a path where the pstats data is saved as well.
+
+Modules set `_PROFILED = True` to have all of their public functions profiled.
+
+#### N/B: Functions imported by name (from color_utilities import rgb_to_hsl) before enabling a profiler \
+    are not profiled. Import them after enabling it or call them through the package.
+"""
+# pylint: disable=invalid-name
+import atexit
+import inspect
+import marshal
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from functools import partial, wraps
+from types import ModuleType
+
+from . import batch_converters, batch_transfer_functions, internal_helpers, patching, transfer_functions, xyz
+from .color_spaces import color_spaces as cs
+
+#= The environment variable enabling a profiler for the whole program
+PROFILE_ENV = "COLOR_UTILITIES_PROFILE"
+
+#= The internal stages of a conversion and the functions doing them. None means every public function
+STAGES = {
+    "validation": ((internal_helpers, ("check_color", "check_hsw", "check_xyz")),),
+    "transfer function": ((transfer_functions, None), (batch_transfer_functions, None)),
+    "matrix": ((internal_helpers, ("apply_matrix",)), (xyz, ("working_space_matrix", "rgb_to_rgb_matrix"))),
+    "chromatic adaptation": ((xyz, ("apply_chromatic_adaptation", "get_adaptation_matrix")),),
+    "output": ((internal_helpers, ("return_rgb", "return_hsw", "return_scale")),
+               (batch_converters, ("return_rgb_batch", "return_hsw_batch", "return_scale_batch", "rgb_to_hex_batch"))),
+}
+
+#= Functions that only look something up and aren't worth profiling
+_SKIP = ("get_transfer_function",)
+
+
+def _public_functions(module: ModuleType) -> dict:
+    """### Returns the public functions defined in a module"""
+    return {name: func for name, func in vars(module).items() if callable(func) and not name.startswith("_")
+            and getattr(func, "__module__", None) == module.__name__ and not isinstance(func, type)
+            and name not in _SKIP}
+
+
+def public_modules() -> list[ModuleType]:
+    """### Returns the loaded modules of the package that set `_PROFILED = True`. Their public functions are
+    profiled as a whole (the package itself is added when enabling)"""
+    prefix = f"{__package__}."
+    return [module for name, module in sorted(sys.modules.items())
+            if name.startswith(prefix) and getattr(module, "_PROFILED", False)]
+
+
+def _key(func: Callable) -> tuple[str, int, str]:
+    """### Returns the (file, line, function name) key pstats uses for a function"""
+    code = inspect.unwrap(func).__code__
+    return code.co_filename, code.co_firstlineno, func.__name__
+
+
+class _Stack(threading.local):
+    """### The instrumented calls running in the current thread"""
+
+    def __init__(self):
+        self.frames = []
+        self.depth = {}
+
+
+class Profiler:
+    """### Counts calls and accumulates time of the conversion functions while enabled
+
+    #### N/B: Profilers can be nested, a call is recorded by every enabled profiler. A profiler can be enabled \
+        and disabled many times and keeps accumulating until `reset()` is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stack = _Stack()
+        #* key: [calls, primitive calls, self time, total time, callers]
+        self._entries = {}
+        self._labels = {}
+        self._stages = {}
+        self.stats = {}
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    @property
+    def enabled(self) -> bool:
+        """### Whether the functions are currently wrapped by this profiler"""
+        return patching.patched(self)
+
+    def _wrap(self, func: Callable, stage: str, label: str) -> Callable:
+        """### Returns a wrapper of a function that records its calls"""
+        key = _key(func)
+        self._labels[key], self._stages[key] = label, stage
+        self._entries.setdefault(key, [0, 0, 0.0, 0.0, {}])
+        stack = self._stack
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            frames, depth = stack.frames, stack.depth
+            caller = frames[-1][0] if frames else None
+            recursion = depth.get(key, 0)
+            depth[key] = recursion + 1
+            frame = [key, 0.0]  # Time spent in other instrumented functions
+            frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                frames.pop()
+                depth[key] = recursion
+                if frames:
+                    frames[-1][1] += elapsed
+                self._record(key, caller, elapsed, elapsed - frame[1], not recursion)
+        return wrapper
+
+    def _record(self, key: tuple, caller: tuple | None, total: float, own: float, primitive: bool):
+        """### Adds a finished call to the entry of the function and to the one of its caller"""
+        with self._lock:
+            targets = [self._entries[key]]
+            if caller is not None:
+                targets.append(targets[0][4].setdefault(caller, [0, 0, 0.0, 0.0]))
+            for entry in targets:
+                entry[0] += 1
+                entry[2] += own
+                if primitive:
+                    entry[1] += 1
+                    entry[3] += total
+
+    @staticmethod
+    def _targets() -> list[dict]:
+        """### Returns the dicts of the modules to patch and of the color spaces (they keep their transfer functions)"""
+        modules = {id(i): i for group in STAGES.values() for i, _ in group}
+        modules |= {id(i): i for i in (*public_modules(), sys.modules[__package__])}
+        color_spaces = {id(i): i for i in cs.values() if isinstance(i, dict)}
+        return [vars(i) for i in modules.values()] + list(color_spaces.values())
+
+    def _wrappers(self) -> dict:
+        """### Returns the wrapper makers by id of the original functions"""
+        wrappers = {}
+        for stage, group in STAGES.items():
+            for module, names in group:
+                funcs = _public_functions(module)
+                for name in funcs if names is None else names:
+                    wrappers[id(funcs[name])] = partial(self._wrap, stage=stage, label=f"{module.__name__}.{name}")
+        for module in (*public_modules(), sys.modules[__package__]):
+            for name, func in _public_functions(module).items():
+                if id(func) not in wrappers:
+                    wrappers[id(func)] = partial(self._wrap, stage="public", label=f"{module.__name__}.{name}")
+        return wrappers
+
+    def enable(self):
+        """### Wraps the conversion functions so every call gets recorded"""
+        patching.patch(self, self._targets, self._wrappers)
+
+    def disable(self):
+        """### Restores the original functions (or the wrappers of the other enabled profilers)"""
+        patching.unpatch(self)
+
+    def reset(self):
+        """### Discards everything recorded so far"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry[:] = [0, 0, 0.0, 0.0, {}]
+
+    def functions(self) -> list[dict]:
+        """### Returns the recorded functions with name, stage, calls, total (cumulative) and self seconds"""
+        with self._lock:
+            return [{"function": self._labels[key], "stage": self._stages[key], "calls": entry[0],
+                     "total": entry[3], "self": entry[2]} for key, entry in self._entries.items() if entry[0]]
+
+    def stage_totals(self) -> dict:
+        """### Returns calls and seconds spent in every stage. Public functions count their own code only
+
+        #### N/B: The stages add up to the total time of the outermost profiled calls.
+        """
+        res = {i: {"calls": 0, "seconds": 0.0} for i in (*STAGES, "public")}
+        for row in self.functions():
+            res[row["stage"]]["calls"] += row["calls"]
+            res[row["stage"]]["seconds"] += row["self"]
+        return res
+
+    def table(self, sort: str = "total", limit: int = 20) -> str:
+        """### Returns the recorded data as a text table
+
+        ### Args:
+            `sort` (str, optional): Sort the functions by "total", "self" or "calls". Defaults to "total".
+            `limit` (int, optional): How many functions to show. Defaults to 20 (None shows every function).
+
+        ### Returns:
+            str: A table of the functions followed by a table of the stages
+        """
+        if sort not in ("total", "self", "calls"):
+            raise ValueError('Sort can only be one of the following: ("total", "self", "calls")')
+        rows = sorted(self.functions(), key=lambda i: i[sort], reverse=True)[:limit]
+        width = max([len(i["function"]) for i in rows] + [len("function")])
+        lines = [f"{'function':<{width}}  {'stage':<20}  {'calls':>9}  {'total s':>10}  {'self s':>10}  "
+                 f"{'per call µs':>11}"]
+        for i in rows:
+            lines.append(f"{i['function']:<{width}}  {i['stage']:<20}  {i['calls']:>9}  {i['total']:>10.4f}  "
+                         f"{i['self']:>10.4f}  {i['total'] / i['calls'] * 1e6:>11.2f}")
+        stages = self.stage_totals()
+        overall = sum(i["seconds"] for i in stages.values()) or 1.0
+        lines += ["", f"{'stage':<20}  {'calls':>9}  {'seconds':>10}  {'share':>6}"]
+        for name, i in stages.items():
+            lines.append(f"{name:<20}  {i['calls']:>9}  {i['seconds']:>10.4f}  {i['seconds'] / overall:>6.1%}")
+        return "\n".join(lines)
+
+    def create_stats(self):
+        """### Fills `stats` with the recorded data in the format of pstats (pstats.Stats(profiler) works)"""
+        with self._lock:
+            self.stats = {key: (entry[1], entry[0], entry[2], entry[3], {k: tuple(v) for k, v in entry[4].items()})
+                          for key, entry in self._entries.items() if entry[0]}
+
+    def dump_stats(self, path: str):
+        """### Saves the recorded data as a pstats file (readable by pstats, snakeviz, etc.)"""
+        self.create_stats()
+        with open(path, "wb") as file:
+            marshal.dump(self.stats, file)
+
+
+def profile() -> Profiler:
+    """### Returns a new profiler to be used as a context manager: `with profile() as prof:`"""
+    return Profiler()
+
+
+def get_profiler() -> Profiler | None:
+    """### Returns the last enabled profiler (e.g. the one enabled by the environment variable) or None"""
+    return next((i for i in reversed(patching.layers()) if isinstance(i, Profiler)), None)
+
+
+def _profile_environment() -> Profiler | None:
+    """### Enables a profiler for the whole program if the environment variable is set"""
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    profiler = Profiler()
+    profiler.enable()
+
+    def report():
+        profiler.disable()
+        print(profiler.table(), file=sys.stderr)
+        if value.lower() not in ("1", "true", "yes"):
+            profiler.dump_stats(value)
+
+    atexit.register(report)
+    return profiler
+
+
+_profile_environment()
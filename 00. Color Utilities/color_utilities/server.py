@@ -0,0 +1,269 @@
+"""This module contains a long-running local color conversion server built on asyncio.
+Many small conversion requests coming in at the same time are coalesced into micro-batches for the
+vectorized converters, repeated conversions are served from a cache and latency percentiles are tracked.
+
+Protocol: newline delimited JSON over a Unix domain socket or localhost TCP. Every request is a JSON object:
+    {"id": 1, "op": "convert_rgb", "colors": [[255, 0, 0]], "params": {"src": "SRGB", "dst": "REC. 2020"}}
+and gets a response with the same id: {"id": 1, "result": [[...]]} or {"id": 1, "error": "..."}.
+Use {"id": 2, "op": "stats"} to get the latency percentiles and cache/batching statistics.
+
+Run with: python -m color_utilities.server --unix /tmp/color_utilities.sock
+"""
+# pylint: disable=invalid-name
+import argparse
+import asyncio
+import json
+import socket
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from . import batch_converters as bc
+from .constants import Out1
+
+#= The default longest request line in bytes (the asyncio default of 64 KiB fits only about 4000 colors)
+MAX_LINE = 1 << 26
+
+#+ Every operation must take an array of colors with shape (N, 3) as first argument and return N results
+BATCH_OPERATIONS = {
+    "convert_rgb": bc.convert_rgb,
+}
+
+
+def _params(params: dict) -> dict:
+    """### Converts JSON request parameters to the keyword arguments of the batch functions"""
+    params = dict(params)
+    params.update(params.pop("kwargs", {}))
+    if isinstance(params.get("output"), str):
+        try:
+            params["output"] = Out1[params["output"].upper()]
+        except KeyError as error:
+            raise ValueError(f"Output can only be one of {[i.name.lower() for i in Out1]}!") from error
+    return params
+
+
+class ConversionServer:
+    """### An asyncio server that micro-batches color conversion requests
+
+    ### Args:
+        `batch_window` (float, optional): Seconds to wait for more requests before a batch is converted. Defaults to 0.002.
+        `max_batch` (int, optional): Number of colors that triggers a conversion without waiting. Defaults to 65536.
+        `cache_size` (int, optional): Number of requests whose results are cached. 0 disables the cache. Defaults to 4096.
+        `latency_samples` (int, optional): Number of the latest request latencies kept for statistics. Defaults to 10000.
+        `max_line` (int, optional): The longest request line in bytes. Longer ones get an error response and the
+                                    connection is closed. Defaults to MAX_LINE.
+    """
+
+    def __init__(
+        self,
+        batch_window: float = 0.002,
+        max_batch: int = 65536,
+        cache_size: int = 4096,
+        latency_samples: int = 10000,
+        max_line: int = MAX_LINE):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self.max_line = max_line
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._latencies = deque(maxlen=latency_samples)
+        self._counters = {"requests": 0, "errors": 0, "cache_hits": 0, "batches": 0, "batched_requests": 0}
+
+    def stats(self) -> dict:
+        """### Returns request counters and latency percentiles in milliseconds"""
+        res = dict(self._counters)
+        res["mean_batch_size"] = res["batched_requests"] / res["batches"] if res["batches"] else 0
+        if self._latencies:
+            p50, p90, p99 = np.percentile(self._latencies, (50, 90, 99)) * 1000
+            res["latency_ms"] = {"p50": p50, "p90": p90, "p99": p99, "max": max(self._latencies) * 1000}
+        return res
+
+    async def convert(self, op: str, colors, params: dict = None):
+        """### Converts colors with a batch operation, sharing the call with other concurrent requests
+
+        ### Args:
+            `op` (str): The name of the operation in BATCH_OPERATIONS
+            `colors` (array_like): The colors to convert with shape (N, 3) or (3,)
+            `params` (dict, optional): Keyword arguments for the operation. Defaults to None.
+
+        ### Returns:
+            list: The converted colors
+        """
+        if op not in BATCH_OPERATIONS:
+            raise ValueError(f'Operation "{op}" is not supported! Please choose from: {list(BATCH_OPERATIONS)}')
+        params = params or {}
+        colors = np.asarray(colors)
+        single = colors.ndim == 1
+        colors = np.atleast_2d(colors)
+        if colors.ndim != 2 or colors.shape[1] != 3:
+            raise ValueError("Colors must be a list of R, G, B triples!")
+
+        # Integer and float colors mean different things so they can't share a batch
+        key = (op, json.dumps(params, sort_keys=True), colors.dtype.kind)
+        cache_key = (key, colors.tobytes())
+        if self.cache_size and cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            self._counters["cache_hits"] += 1
+            res = self._cache[cache_key]
+        else:
+            res = await self._submit(key, colors, params)
+            if self.cache_size:
+                self._cache[cache_key] = res
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return res[0] if single else res
+
+    def _submit(self, key: tuple, colors: np.ndarray, params: dict) -> asyncio.Future:
+        """### Adds colors to the pending batch of their key and schedules its conversion"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key not in self._pending:
+            self._pending[key] = {"params": params, "items": [], "size": 0,
+                                  "timer": loop.call_later(self.batch_window, self._flush, key)}
+        batch = self._pending[key]
+        batch["items"].append((colors, future))
+        batch["size"] += len(colors)
+        if batch["size"] >= self.max_batch:
+            batch["timer"].cancel()
+            self._flush(key)
+        return future
+
+    def _flush(self, key: tuple):
+        """### Converts all pending colors of a key in one call and resolves their futures"""
+        batch = self._pending.pop(key)
+        self._counters["batches"] += 1
+        self._counters["batched_requests"] += len(batch["items"])
+        asyncio.get_running_loop().create_task(self._run_batch(key[0], batch))
+
+    async def _run_batch(self, op: str, batch: dict):
+        """### Runs the batch operation in a worker thread so the event loop keeps accepting requests"""
+        colors, futures = zip(*batch["items"])
+        try:
+            func, params = BATCH_OPERATIONS[op], _params(batch["params"])
+            res = await asyncio.to_thread(func, np.concatenate(colors), **params)
+            res = res.tolist()
+        except Exception as error:  # pylint: disable=broad-except
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        start = 0
+        for color, future in zip(colors, futures):
+            if not future.done():
+                future.set_result(res[start:start + len(color)])
+            start += len(color)
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock):
+        """### Handles a single request line and writes the response"""
+        start = time.perf_counter()
+        response = {}
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            if request.get("op") == "stats":
+                response["result"] = self.stats()
+            else:
+                self._counters["requests"] += 1
+                response["result"] = await self.convert(request.get("op"), request["colors"], request.get("params"))
+                self._latencies.append(time.perf_counter() - start)
+        except Exception as error:  # pylint: disable=broad-except
+            self._counters["errors"] += 1
+            response["error"] = f"{type(error).__name__}: {error}"
+        async with lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """### Reads request lines from a client. Requests are handled concurrently so a client can pipeline them"""
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line is over the limit of the reader. The rest of it can't be skipped reliably
+                    self._counters["errors"] += 1
+                    async with lock:
+                        writer.write(json.dumps({"id": None, "error": f"ValueError: Request lines can't be longer "
+                                                 f"than {self.max_line} bytes!"}).encode() + b"\n")
+                        await writer.drain()
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(self._respond(line, writer, lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def start(self, path: str = None, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """### Starts listening on a Unix domain socket if `path` is given or on a localhost TCP port otherwise
+
+        ### Args:
+            `path` (str, optional): The path of the Unix domain socket. Defaults to None.
+            `host` (str, optional): The host for a TCP server. Defaults to "127.0.0.1".
+            `port` (int, optional): The port for a TCP server. 0 picks a free port. Defaults to 8765.
+
+        ### Returns:
+            asyncio.AbstractServer: The started server
+        """
+        if path:
+            return await asyncio.start_unix_server(self.handle_connection, path=path, limit=self.max_line)
+        return await asyncio.start_server(self.handle_connection, host=host, port=port, limit=self.max_line)
+
+
+def request(payloads: list[dict], path: str = None, host: str = "127.0.0.1", port: int = 8765) -> list[dict]:
+    """### A minimal blocking client. Sends all requests at once and waits for all responses
+
+    ### Args:
+        `payloads` (list[dict]): The requests to send. An "id" is added to the ones that don't have it.
+        `path` (str, optional): The path of the Unix domain socket. Defaults to None.
+        `host` (str, optional): The host of a TCP server. Defaults to "127.0.0.1".
+        `port` (int, optional): The port of a TCP server. Defaults to 8765.
+
+    ### Returns:
+        list[dict]: The responses in the order of the requests
+    """
+    payloads = [{"id": n, **i} for n, i in enumerate(payloads)]
+    with socket.socket(socket.AF_UNIX if path else socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.connect(path or (host, port))
+        sock.sendall(b"".join(json.dumps(i).encode() + b"\n" for i in payloads))
+        responses = {}
+        with sock.makefile("rb") as file:
+            while len(responses) < len(payloads) and (line := file.readline()):
+                response = json.loads(line)
+                responses[response["id"]] = response
+    return [responses.get(i["id"]) for i in payloads]
+
+
+def main():
+    """### Runs the server from the command line"""
+    parser = argparse.ArgumentParser(description="Local color conversion server")
+    parser.add_argument("--unix", help="Path of a Unix domain socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-window", type=float, default=0.002, help="Seconds to wait for a batch to fill")
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--max-line", type=int, default=MAX_LINE, help="The longest request line in bytes")
+    args = parser.parse_args()
+
+    async def run():
+        server = await ConversionServer(args.batch_window, cache_size=args.cache_size, max_line=args.max_line).start(
+            args.unix, args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""This module contains the CIE standard observers and spectral integration.
+Batches of spectral measurements (reflectance of swatches or spectral power of light sources) are turned into XYZ
+with a single matrix product. Every combination of wavelengths, illuminant and observer gets its own precomputed
+(wavelengths, 3) weighting matrix with resampling, illuminant and color matching functions folded in.
+
+Reference 1 CIE 15:2004 Colorimetry, 3rd edition
+Reference 2 http://cvrl.ucl.ac.uk/
+Reference 3 https://www.astm.org/e0308-18.html
+"""
+# pylint: disable=invalid-name
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+
+from .constants import Out3
+from .xyz import ILLUMINANTS, Illuminant, Observer, get_adaptation_matrix, illuminant_name, observer_name
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= Wavelengths (nm) of the bundled color matching functions
+WAVELENGTHS = np.arange(380, 781, 5)
+
+#= CIE 1931 2° and CIE 1964 10° standard observers. x̄, ȳ, z̄ values for WAVELENGTHS
+CMFS = {
+    "2": np.array((
+    (0.001368, 0.000039, 0.006450),
+    (0.002236, 0.000064, 0.010550),
+    (0.004243, 0.000120, 0.020050),
+    (0.007650, 0.000217, 0.036210),
+    (0.014310, 0.000396, 0.067850),
+    (0.023190, 0.000640, 0.110200),
+    (0.043510, 0.001210, 0.207400),
+    (0.077630, 0.002180, 0.371300),
+    (0.134380, 0.004000, 0.645600),
+    (0.214770, 0.007300, 1.039050),
+    (0.283900, 0.011600, 1.385600),
+    (0.328500, 0.016840, 1.622960),
+    (0.348280, 0.023000, 1.747060),
+    (0.348060, 0.029800, 1.782600),
+    (0.336200, 0.038000, 1.772110),
+    (0.318700, 0.048000, 1.744100),
+    (0.290800, 0.060000, 1.669200),
+    (0.251100, 0.073900, 1.528100),
+    (0.195360, 0.090980, 1.287640),
+    (0.142100, 0.112600, 1.041900),
+    (0.095640, 0.139020, 0.812950),
+    (0.057950, 0.169300, 0.616200),
+    (0.032010, 0.208020, 0.465180),
+    (0.014700, 0.258600, 0.353300),
+    (0.004900, 0.323000, 0.272000),
+    (0.002400, 0.407300, 0.212300),
+    (0.009300, 0.503000, 0.158200),
+    (0.029100, 0.608200, 0.111700),
+    (0.063270, 0.710000, 0.078250),
+    (0.109600, 0.793200, 0.057250),
+    (0.165500, 0.862000, 0.042160),
+    (0.225750, 0.914850, 0.029840),
+    (0.290400, 0.954000, 0.020300),
+    (0.359700, 0.980300, 0.013400),
+    (0.433450, 0.994950, 0.008750),
+    (0.512050, 1.000000, 0.005750),
+    (0.594500, 0.995000, 0.003900),
+    (0.678400, 0.978600, 0.002750),
+    (0.762100, 0.952000, 0.002100),
+    (0.842500, 0.915400, 0.001800),
+    (0.916300, 0.870000, 0.001650),
+    (0.978600, 0.816300, 0.001400),
+    (1.026300, 0.757000, 0.001100),
+    (1.056700, 0.694900, 0.001000),
+    (1.062200, 0.631000, 0.000800),
+    (1.045600, 0.566800, 0.000600),
+    (1.002600, 0.503000, 0.000340),
+    (0.938400, 0.441200, 0.000240),
+    (0.854450, 0.381000, 0.000190),
+    (0.751400, 0.321000, 0.000100),
+    (0.642400, 0.265000, 0.000050),
+    (0.541900, 0.217000, 0.000030),
+    (0.447900, 0.175000, 0.000020),
+    (0.360800, 0.138200, 0.000010),
+    (0.283500, 0.107000, 0.000000),
+    (0.218700, 0.081600, 0.000000),
+    (0.164900, 0.061000, 0.000000),
+    (0.121200, 0.044580, 0.000000),
+    (0.087400, 0.032000, 0.000000),
+    (0.063600, 0.023200, 0.000000),
+    (0.046770, 0.017000, 0.000000),
+    (0.032900, 0.011920, 0.000000),
+    (0.022700, 0.008210, 0.000000),
+    (0.015840, 0.005723, 0.000000),
+    (0.011359, 0.004102, 0.000000),
+    (0.008111, 0.002929, 0.000000),
+    (0.005790, 0.002091, 0.000000),
+    (0.004109, 0.001484, 0.000000),
+    (0.002899, 0.001047, 0.000000),
+    (0.002049, 0.000740, 0.000000),
+    (0.001440, 0.000520, 0.000000),
+    (0.001000, 0.000361, 0.000000),
+    (0.000690, 0.000249, 0.000000),
+    (0.000476, 0.000172, 0.000000),
+    (0.000332, 0.000120, 0.000000),
+    (0.000235, 0.000085, 0.000000),
+    (0.000166, 0.000060, 0.000000),
+    (0.000117, 0.000042, 0.000000),
+    (0.000083, 0.000030, 0.000000),
+    (0.000059, 0.000021, 0.000000),
+    (0.000042, 0.000015, 0.000000),
+    )),
+    "10": np.array((
+    (0.000160, 0.000017, 0.000705),
+    (0.000662, 0.000072, 0.002928),
+    (0.002362, 0.000253, 0.010482),
+    (0.007242, 0.000769, 0.032344),
+    (0.019110, 0.002004, 0.086011),
+    (0.043400, 0.004509, 0.197120),
+    (0.084736, 0.008756, 0.389366),
+    (0.140638, 0.014456, 0.656760),
+    (0.204492, 0.021391, 0.972542),
+    (0.264737, 0.029497, 1.282500),
+    (0.314679, 0.038676, 1.553480),
+    (0.357719, 0.049602, 1.798500),
+    (0.383734, 0.062077, 1.967280),
+    (0.386726, 0.074704, 2.027300),
+    (0.370702, 0.089456, 1.994800),
+    (0.342957, 0.106256, 1.900700),
+    (0.302273, 0.128201, 1.745370),
+    (0.254085, 0.152761, 1.554900),
+    (0.195618, 0.185190, 1.317560),
+    (0.132349, 0.219940, 1.030200),
+    (0.080507, 0.253589, 0.772125),
+    (0.041072, 0.297665, 0.570060),
+    (0.016172, 0.339133, 0.415254),
+    (0.005132, 0.395379, 0.302356),
+    (0.003816, 0.460777, 0.218502),
+    (0.015444, 0.531360, 0.159249),
+    (0.037465, 0.606741, 0.112044),
+    (0.071358, 0.685660, 0.082248),
+    (0.117749, 0.761757, 0.060709),
+    (0.172953, 0.823330, 0.043050),
+    (0.236491, 0.875211, 0.030451),
+    (0.304213, 0.923810, 0.020584),
+    (0.376772, 0.961988, 0.013676),
+    (0.451584, 0.982200, 0.007918),
+    (0.529826, 0.991761, 0.003988),
+    (0.616053, 0.999110, 0.001091),
+    (0.705224, 0.997340, 0.000000),
+    (0.793832, 0.982380, 0.000000),
+    (0.878655, 0.955552, 0.000000),
+    (0.951162, 0.915175, 0.000000),
+    (1.014160, 0.868934, 0.000000),
+    (1.074300, 0.825623, 0.000000),
+    (1.118520, 0.777405, 0.000000),
+    (1.134300, 0.720353, 0.000000),
+    (1.123990, 0.658341, 0.000000),
+    (1.089100, 0.593878, 0.000000),
+    (1.030480, 0.527963, 0.000000),
+    (0.950740, 0.461834, 0.000000),
+    (0.856297, 0.398057, 0.000000),
+    (0.754930, 0.339554, 0.000000),
+    (0.647467, 0.283493, 0.000000),
+    (0.535110, 0.228254, 0.000000),
+    (0.431567, 0.179828, 0.000000),
+    (0.343690, 0.140211, 0.000000),
+    (0.268329, 0.107633, 0.000000),
+    (0.204300, 0.081187, 0.000000),
+    (0.152568, 0.060281, 0.000000),
+    (0.112210, 0.044096, 0.000000),
+    (0.081261, 0.031800, 0.000000),
+    (0.057930, 0.022602, 0.000000),
+    (0.040851, 0.015905, 0.000000),
+    (0.028623, 0.011130, 0.000000),
+    (0.019941, 0.007749, 0.000000),
+    (0.013842, 0.005375, 0.000000),
+    (0.009577, 0.003718, 0.000000),
+    (0.006605, 0.002565, 0.000000),
+    (0.004553, 0.001768, 0.000000),
+    (0.003145, 0.001222, 0.000000),
+    (0.002175, 0.000846, 0.000000),
+    (0.001506, 0.000586, 0.000000),
+    (0.001045, 0.000407, 0.000000),
+    (0.000727, 0.000284, 0.000000),
+    (0.000508, 0.000199, 0.000000),
+    (0.000356, 0.000140, 0.000000),
+    (0.000251, 0.000098, 0.000000),
+    (0.000178, 0.000070, 0.000000),
+    (0.000126, 0.000050, 0.000000),
+    (0.000090, 0.000036, 0.000000),
+    (0.000065, 0.000025, 0.000000),
+    (0.000046, 0.000018, 0.000000),
+    (0.000033, 0.000013, 0.000000),
+    )),
+}
+
+#= CIE daylight components S0, S1, S2 for the wavelengths 300-830 nm in 10 nm steps
+DAYLIGHT_WAVELENGTHS = np.arange(300, 831, 10)
+DAYLIGHT_COMPONENTS = np.array((
+    (  0.04,   0.02,   0.00),
+    (  6.00,   4.50,   2.00),
+    ( 29.60,  22.40,   4.00),
+    ( 55.30,  42.00,   8.50),
+    ( 57.30,  40.60,   7.80),
+    ( 61.80,  41.60,   6.70),
+    ( 61.50,  38.00,   5.30),
+    ( 68.80,  42.40,   6.10),
+    ( 63.40,  38.50,   3.00),
+    ( 65.80,  35.00,   1.20),
+    ( 94.80,  43.40,  -1.10),
+    (104.80,  46.30,  -0.50),
+    (105.90,  43.90,  -0.70),
+    ( 96.80,  37.10,  -1.20),
+    (113.90,  36.70,  -2.60),
+    (125.60,  35.90,  -2.90),
+    (125.50,  32.60,  -2.80),
+    (121.30,  27.90,  -2.60),
+    (121.30,  24.30,  -2.60),
+    (113.50,  20.10,  -1.80),
+    (113.10,  16.20,  -1.50),
+    (110.80,  13.20,  -1.30),
+    (106.50,   8.60,  -1.20),
+    (108.80,   6.10,  -1.00),
+    (105.30,   4.20,  -0.50),
+    (104.40,   1.90,  -0.30),
+    (100.00,   0.00,   0.00),
+    ( 96.00,  -1.60,   0.20),
+    ( 95.10,  -3.50,   0.50),
+    ( 89.10,  -3.50,   2.10),
+    ( 90.50,  -5.80,   3.20),
+    ( 90.30,  -7.20,   4.10),
+    ( 88.40,  -8.60,   4.70),
+    ( 84.00,  -9.50,   5.10),
+    ( 85.10, -10.90,   6.70),
+    ( 81.90, -10.70,   7.30),
+    ( 82.60, -12.00,   8.60),
+    ( 84.90, -14.00,   9.80),
+    ( 81.30, -13.60,  10.20),
+    ( 71.90, -12.00,   8.30),
+    ( 74.30, -13.30,   9.60),
+    ( 76.40, -12.90,   8.50),
+    ( 63.30, -10.60,   7.00),
+    ( 71.70, -11.60,   7.60),
+    ( 77.00, -12.20,   8.00),
+    ( 65.20, -10.20,   6.70),
+    ( 47.70,  -7.80,   5.20),
+    ( 68.60, -11.20,   7.40),
+    ( 65.00, -10.40,   6.80),
+    ( 66.00, -10.60,   7.00),
+    ( 61.00,  -9.70,   6.40),
+    ( 53.30,  -8.30,   5.50),
+    ( 58.90,  -9.30,   6.10),
+    ( 61.90,  -9.80,   6.50),
+))
+
+#= Correlated color temperatures of the CIE daylight illuminants (c2 changed from 1.438e-2 to 1.4388e-2)
+DAYLIGHT_CCT = {"D50": 5003, "D55": 5503, "D65": 6504, "D75": 7504}
+
+for _table in (WAVELENGTHS, *CMFS.values(), DAYLIGHT_WAVELENGTHS, DAYLIGHT_COMPONENTS):
+    _table.flags.writeable = False
+
+
+def _wavelengths(wavelengths) -> np.ndarray:
+    """### Returns the wavelengths as a float array and makes sure they are increasing"""
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    if wavelengths.ndim != 1 or len(wavelengths) < 2 or np.any(np.diff(wavelengths) <= 0):
+        raise ValueError("Wavelengths must be a 1D sequence of at least 2 increasing values!")
+    return wavelengths
+
+
+def resample(values, wavelengths, target=WAVELENGTHS) -> np.ndarray:
+    """### Linearly interpolates spectral data to new wavelengths. Outside the measured range the nearest
+    measured value is used (as recommended by CIE 15)
+
+    ### Args:
+        `values` (array_like): Spectral data with shape (..., len(wavelengths))
+        `wavelengths` (array_like): The wavelengths of the data in nm
+        `target` (array_like, optional): The new wavelengths. Defaults to WAVELENGTHS.
+
+    ### Returns:
+        numpy.ndarray: Spectral data with shape (..., len(target))
+    """
+    return np.asarray(values, dtype=np.float64) @ _resampling_matrix(tuple(_wavelengths(wavelengths)), tuple(target))
+
+
+@lru_cache(maxsize=64)
+def _resampling_matrix(src: tuple, dst: tuple) -> np.ndarray:
+    """### Returns the (len(src), len(dst)) matrix doing linear interpolation from src to dst wavelengths"""
+    return np.stack([np.interp(dst, src, column) for column in np.eye(len(src))])
+
+
+def planck_spd(temperature: float, wavelengths=WAVELENGTHS) -> np.ndarray:
+    """### Calculates the relative spectral power of a blackbody (Planckian radiator), normalized to 100 at 560 nm
+
+    ### Args:
+        `temperature` (float): The temperature in Kelvin
+        `wavelengths` (array_like, optional): The wavelengths in nm. Defaults to WAVELENGTHS.
+
+    ### Returns:
+        numpy.ndarray: The relative spectral power for every wavelength
+    """
+    c2 = 1.4388e7  # nm * K
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    return 100 * (560 / wavelengths) ** 5 * np.expm1(c2 / (560 * temperature)) / np.expm1(c2 / (wavelengths * temperature))
+
+
+def daylight_xy(cct) -> np.ndarray:
+    """### Calculates the CIE 1931 chromaticity coordinates of CIE daylight from its correlated color temperature
+
+    ### Args:
+        `cct` (float | array_like): Correlated color temperatures in Kelvin in range 4000-25000
+
+    ### Returns:
+        numpy.ndarray: x, y values with shape (..., 2)
+    """
+    cct = np.asarray(cct, dtype=np.float64)
+    if np.any((cct < 4000) | (cct > 25000)):
+        raise ValueError("The correlated color temperature of daylight must be in range 4000-25000 K!")
+    x = np.where(cct <= 7000,
+                 -4.6070e9 / cct ** 3 + 2.9678e6 / cct ** 2 + 0.09911e3 / cct + 0.244063,
+                 -2.0064e9 / cct ** 3 + 1.9018e6 / cct ** 2 + 0.24748e3 / cct + 0.237040)
+    return np.stack((x, -3 * x ** 2 + 2.870 * x - 0.275), axis=-1)
+
+
+def daylight_spd(cct: float, wavelengths=WAVELENGTHS) -> np.ndarray:
+    """### Calculates the relative spectral power of a CIE daylight illuminant from its correlated color temperature
+
+    ### Args:
+        `cct` (float): The correlated color temperature in Kelvin in range 4000-25000
+        `wavelengths` (array_like, optional): The wavelengths in nm. Defaults to WAVELENGTHS.
+
+    ### Returns:
+        numpy.ndarray: The relative spectral power for every wavelength (100 at 560 nm)
+    """
+    x, y = daylight_xy(cct)
+    M = 0.0241 + 0.2562 * x - 0.7341 * y
+    M1 = (-1.3515 - 1.7703 * x + 5.9114 * y) / M
+    M2 = (0.0300 - 31.4424 * x + 30.0717 * y) / M
+    S0, S1, S2 = DAYLIGHT_COMPONENTS.T
+    return np.interp(wavelengths, DAYLIGHT_WAVELENGTHS, S0 + M1 * S1 + M2 * S2)
+
+
+def illuminant_spd(illuminant: str | Illuminant, wavelengths=WAVELENGTHS) -> np.ndarray:
+    """### Returns the relative spectral power of a standard illuminant
+
+    ### Args:
+        `illuminant` (str | Illuminant): Either "A", "E", "D50", "D55", "D65" or "D75"
+        `wavelengths` (array_like, optional): The wavelengths in nm. Defaults to WAVELENGTHS.
+
+    ### Returns:
+        numpy.ndarray: The relative spectral power for every wavelength
+    """
+    illuminant = illuminant_name(illuminant)
+    if illuminant == "A":
+        return planck_spd(2856, wavelengths)
+    if illuminant == "E":
+        return np.full(np.shape(wavelengths), 100.0)
+    if illuminant in DAYLIGHT_CCT:
+        return daylight_spd(DAYLIGHT_CCT[illuminant], wavelengths)
+    raise ValueError(f"Spectral data is only available for illuminants {('A', 'E', *DAYLIGHT_CCT)}!")
+
+
+@lru_cache(maxsize=64)
+def _weights(wavelengths: tuple, illuminant: str, observer: str, reflectance: bool) -> np.ndarray:
+    """### Returns the (len(wavelengths), 3) matrix integrating spectral data to XYZ (Y of the white = 1)"""
+    cmfs = CMFS[observer]
+    if reflectance:
+        cmfs = cmfs * illuminant_spd(illuminant)[:, None]
+    # A perfect reflector (or an equal energy emitter) has Y = 1
+    cmfs = cmfs / cmfs[:, 1].sum()
+    weights = _resampling_matrix(wavelengths, tuple(WAVELENGTHS)) @ cmfs
+    weights.flags.writeable = False
+    return weights
+
+
+def spectral_to_xyz(
+    data,
+    wavelengths=WAVELENGTHS,
+    illuminant: str | Illuminant = "D65",
+    observer: str | int | Observer = "2",
+    reflectance: bool = True,
+    adaptation: str = "bradford",
+    output: Enum = Out3.NORMALIZED) -> np.ndarray:
+    """### Integrates batches of spectral data to CIE XYZ with a single matrix product
+
+    ### Args:
+        `data` (array_like): Spectral data with shape (N, len(wavelengths)) or (len(wavelengths),). Reflectance or
+                            transmittance factors in range 0-1 or relative spectral power.
+        `wavelengths` (array_like, optional): The measured wavelengths in nm. Data is linearly resampled to the
+                                        5 nm steps of the color matching functions. Defaults to WAVELENGTHS.
+        `illuminant` (str, optional): The illuminant lighting the samples. Defaults to "D65".
+        `observer` (str | int, optional): The standard observer. Either 2 (CIE 1931) or 10 (CIE 1964). Defaults to "2".
+        `reflectance` (bool, optional): Whether the data is reflectance (lit by the illuminant) or the spectral
+                                        power of light sources (the illuminant is ignored). Defaults to True.
+        `adaptation` (str, optional): The adaptation method for illuminants without bundled spectral data.
+                                        Defaults to "bradford".
+        `output` (Enum, optional): Out3 enum options available. Defaults to Out3.NORMALIZED.
+        *     normalized returns floats where Y of a perfect reflector (or an equal energy emitter) is 1
+        *     round returns integers where Y of a perfect reflector is 100
+        *     direct returns floats where Y of a perfect reflector is 100
+
+    #### N/B: Illuminants with spectral data: A, E, D50, D55, D65, D75. For the rest of the illuminants in \
+        xyz.ILLUMINANTS the values are calculated under D65 and chromatically adapted to their whitepoint.
+
+    ### Returns:
+        numpy.ndarray: X, Y, Z values with shape (N, 3) or (3,)
+    """
+    observer, illuminant = observer_name(observer), illuminant_name(illuminant)
+    if illuminant not in ILLUMINANTS[observer]:
+        raise ValueError(f"Illuminant can only be one of the following: {tuple(ILLUMINANTS[observer])}")
+
+    wavelengths = _wavelengths(wavelengths)
+    data = np.asarray(data, dtype=np.float64)
+    if data.shape[-1] != len(wavelengths):
+        raise ValueError(f"The last axis of the data must have {len(wavelengths)} values (one per wavelength)!")
+
+    with_spd = not reflectance or illuminant in ("A", "E", *DAYLIGHT_CCT)
+    XYZ = data @ _weights(tuple(wavelengths), illuminant if with_spd else "D65", observer, reflectance)
+    if not with_spd:
+        white = CMFS[observer].T @ illuminant_spd("D65")
+        XYZ = XYZ @ get_adaptation_matrix(white / white[1], np.array(ILLUMINANTS[observer][illuminant]), adaptation).T
+
+    match output:
+        case Out3.NORMALIZED:
+            return XYZ
+        case Out3.ROUND:
+            return np.rint(XYZ * 100).astype(np.int64)
+        case _:
+            return XYZ * 100
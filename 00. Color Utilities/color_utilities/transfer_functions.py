@@ -7,6 +7,12 @@ from . import internal_helpers as ih
 from . import alexa_transfer_function_helpers as atfh
 from .constants import Out1
 
+#= SMPTE ST 2084 (PQ) constants m1, m2, c1, c2, c3
+PQ_CONSTANTS = (2610 / 16384, 2523 / 4096 * 128, 3424 / 4096, 2413 / 4096 * 32, 2392 / 4096 * 32)
+
+#= ARIB STD-B67 (HLG) constants a, b, c
+HLG_CONSTANTS = (0.17883277, 1 - 4 * 0.17883277, 0.5 - 0.17883277 * log(4 * 0.17883277))
+
 
 def srgb(
     RGB: tuple | list, depth: int = 8, decode: bool = False, output: Enum = Out1.DIRECT, **kwargs):
@@ -936,6 +942,51 @@ def smpte240m(RGB: tuple | list, decode: bool = False, **kwargs):
     return [4 * i if i < 0.0228 else 1.1115 * i** 0.45 - 0.1115 for i in RGB]
 
 
+def pq(RGB: tuple | list, decode: bool = False, **kwargs):
+    """### Converts between Linear and PQ values \
+        This is the SMPTE ST 2084 (Rec. 2100 PQ) electro-optical transfer function (EOTF) and its inverse.
+
+    ### Args:
+        `RGB` (tuple | list): The R, G, B values to be converted. Linear values are normalized to 10000 cd/m2
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+
+    Reference https://www.itu.int/rec/R-REC-BT.2100
+
+    ### Returns:
+        tuple[R, G, B]
+    """
+    m1, m2, c1, c2, c3 = PQ_CONSTANTS
+    if decode:  # Linearize / Decoding EOTF
+        RGB = (min(max(i, 0), 1) ** (1 / m2) for i in RGB)
+        return [(max(i - c1, 0) / (c2 - c3 * i)) ** (1 / m1) for i in RGB]
+
+    # Encoding EOTF Inverse
+    RGB = (min(max(i, 0), 1) ** m1 for i in RGB)
+    return [((c1 + c2 * i) / (1 + c3 * i)) ** m2 for i in RGB]
+
+
+def hlg(RGB: tuple | list, decode: bool = False, **kwargs):
+    """### Converts between Linear and HLG values \
+        This is the ARIB STD-B67 (Rec. 2100 HLG) opto-electronic transfer function (OETF) and its inverse.
+
+    ### Args:
+        `RGB` (tuple | list): The R, G, B values to be converted. Linear values are scene light in range 0-1
+        `decode` (bool, optional): Decode, convert the values to linear. Defaults to False.
+
+    Reference https://www.itu.int/rec/R-REC-BT.2100
+
+    ### Returns:
+        tuple[R, G, B]
+    """
+    a, b, c = HLG_CONSTANTS
+    RGB = (max(i, 0) for i in RGB)
+    if decode:  # Linearize / Decoding OETF Inverse
+        return [i * i / 3 if i <= 0.5 else (exp((i - c) / a) + b) / 12 for i in RGB]
+
+    # Encoding OETF
+    return [(3 * i) ** 0.5 if i <= 1 / 12 else a * log(12 * i - b) + c for i in RGB]
+
+
 def gamma_function(
     RGB: tuple | list, gamma: int | float, decode: bool = False, depth: int = 8,  output: Enum = Out1.NORMALIZED):
     """### Converts between Linear and Gamma-corrected RGB values. \
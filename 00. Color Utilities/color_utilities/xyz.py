@@ -8,6 +8,11 @@ It contains a few functions and a number of constants regarding different color
 # More information: https://www.easyrgb.com/en/math.php
 
 
+import re
+import sys
+from enum import Enum
+from functools import lru_cache
+
 import numpy
 from numpy.linalg import pinv
 
@@ -145,6 +150,111 @@ ADAPTATION_MATRICES = { # Also known as CATs (Chromatic Adaptation Tables)
 }
 
 
+def _identifier(name: str) -> str:
+    """### Turns a name like "ITU-R BT.709" into a valid enum member name (ITU_R_BT_709)"""
+    return re.sub(r"\W+", "_", name).strip("_").upper()
+
+
+def _canonical_color_spaces() -> dict:
+    """### Maps an identifier to every color space name. Aliases map to the first name of the same color space"""
+    canonical, res = {}, {}
+    for name, props in cs.items():
+        if not name.startswith("__"):
+            res.setdefault(_identifier(name), canonical.setdefault(id(props), name))
+    return res
+
+
+#* Identifiers accepted everywhere instead of strings. Their values are the keys in the respective tables
+#* so they resolve without any string processing. E.g. Illuminant.D65, Observer.CIE1964, ColorSpace.REC_2020
+class Observer(str, Enum):
+    """The observer angle: CIE 1931 2° or CIE 1964 10° standard observer"""
+    CIE1931 = "2"
+    CIE1964 = "10"
+
+
+Illuminant = Enum("Illuminant", {_identifier(i): i for i in ILLUMINANTS["2"]}, module=__name__, type=str)
+Illuminant.__doc__ = "The illuminants in ILLUMINANTS"
+Adaptation = Enum("Adaptation", {_identifier(i): i for i in ADAPTATION_MATRICES}, module=__name__, type=str)
+Adaptation.__doc__ = "The chromatic adaptation methods in ADAPTATION_MATRICES"
+ColorSpace = Enum("ColorSpace", _canonical_color_spaces(), module=__name__, type=str)
+ColorSpace.__doc__ = "The color spaces in color_spaces. Aliases of the same color space are aliases of the same member"
+
+
+def illuminant_name(illuminant: str | Illuminant) -> str:
+    """### Returns the key of an illuminant in ILLUMINANTS. Strings are parsed once and cached
+
+    ### Args:
+        `illuminant` (str | Illuminant): The illuminant. Strings are case insensitive.
+
+    ### Returns:
+        str: The name of the illuminant as it's written in ILLUMINANTS
+    """
+    if isinstance(illuminant, Illuminant):
+        return illuminant.value
+    if not isinstance(illuminant, str):
+        raise TypeError("Iluminant must be a string type!")
+    return _illuminant_name(illuminant)
+
+
+@lru_cache(maxsize=1024)
+def _illuminant_name(illuminant: str) -> str:
+    """### Parses an illuminant string"""
+    name = illuminant.upper().strip()
+    if name not in ILLUMINANTS["2"]:
+        raise ValueError(f'Illuminant "{name}" is not supported! Please choose from:\n{list(ILLUMINANTS["2"])}')
+    return sys.intern(name)
+
+
+def observer_name(observer: str | int | float | Observer) -> str:
+    """### Returns the key of an observer in ILLUMINANTS ("2" or "10"). Other inputs are parsed once and cached
+
+    ### Args:
+        `observer` (str | int | float | Observer): The observer angle
+
+    ### Returns:
+        str: Either "2" or "10"
+    """
+    if isinstance(observer, Observer):
+        return observer.value
+    if not isinstance(observer, (str, int, float)):
+        raise TypeError("Observer must be [str | int | float] type!")
+    return _observer_name(observer)
+
+
+@lru_cache(maxsize=64)
+def _observer_name(observer: str | int | float) -> str:
+    """### Parses an observer angle"""
+    name = str(int(observer)) if isinstance(observer, (int, float)) else observer.strip().rstrip("°")
+    if name not in ILLUMINANTS:
+        raise ValueError(f"Observer can only be one of the following: {tuple(ILLUMINANTS)}")
+    return sys.intern(name)
+
+
+def adaptation_name(adaptation: str | Adaptation) -> str:
+    """### Returns the key of an adaptation method in ADAPTATION_MATRICES. Strings are parsed once and cached
+
+    ### Args:
+        `adaptation` (str | Adaptation): The adaptation method. Strings are case insensitive.
+
+    ### Returns:
+        str: The name of the adaptation method as it's written in ADAPTATION_MATRICES
+    """
+    if isinstance(adaptation, Adaptation):
+        return adaptation.value
+    if not isinstance(adaptation, str):
+        raise TypeError("Adaptation must be a string type!")
+    return _adaptation_name(adaptation)
+
+
+@lru_cache(maxsize=256)
+def _adaptation_name(adaptation: str) -> str:
+    """### Parses an adaptation method string"""
+    name = adaptation.lower().strip()
+    if name not in ADAPTATION_MATRICES:
+        raise ValueError(f"Adaptation methods can only be one of the following: {tuple(ADAPTATION_MATRICES)}")
+    return sys.intern(name)
+
+
 def get_adaptation_matrix(wp_src: tuple | list, wp_dst: tuple | list, adaptation: str = "bradford"):
     """### Calculate the correct transformation matrix based on origin and target
     illuminants. The observer angle must be the same between illuminants.
@@ -258,21 +368,22 @@ def apply_chromatic_adaptation(
     ### Returns:
         numpy.ndarray: 1x3 matrix (array) containing the new X, Y, Z values
     """
-    # It's silly to have to do this, but some people may want to call this
-    # function directly, so we'll protect them from messing up upper/lower case.
-    adaptation = adaptation.lower()
-
-    # Get white-points for illuminant
-    wp_src = ILLUMINANTS[observer][orig_illum]
-    wp_dst = ILLUMINANTS[observer][targ_illum]
-
-    # Retrieve the appropriate transformation matrix from the constants.
-    transform_matrix = get_adaptation_matrix(wp_src, wp_dst, adaptation)
+    # Names (or enum members) are resolved once and the matrix of every combination is only calculated once
+    transform_matrix = _illuminant_adaptation_matrix(
+        illuminant_name(orig_illum), illuminant_name(targ_illum), observer_name(observer), adaptation_name(adaptation))
 
     # Perform the adaptation via matrix multiplication.
     return transform_matrix @ XYZ
 
 
+@lru_cache(maxsize=1024)
+def _illuminant_adaptation_matrix(orig_illum: str, targ_illum: str, observer: str, adaptation: str) -> numpy.ndarray:
+    """### Returns the read-only adaptation matrix between two illuminants"""
+    M = get_adaptation_matrix(ILLUMINANTS[observer][orig_illum], ILLUMINANTS[observer][targ_illum], adaptation)
+    M.flags.writeable = False
+    return M
+
+
 def refine_args(
     *,
     illuminant: str = None,
@@ -282,53 +393,31 @@ def refine_args(
     """### Makes sure the input arguments are the correct type. Appropriate errors are raised otherwise
 
     ### Args:
-        `illuminant` (str): The illuminant should be an all caps string
-        `observer` (int | float | str): The observer angle should be a string
-        `color_space` (str): The color space should be an all caps string
-        `adaptation` (str): The adaptation method should be all lowercase string
+        `illuminant` (str | Illuminant): The illuminant. Returned as its key in ILLUMINANTS
+        `observer` (int | float | str | Observer): The observer angle. Returned as a string
+        `color_space` (str | ColorSpace): The color space. Returned as its key in color_spaces
+        `adaptation` (str | Adaptation): The adaptation method. Returned as its key in ADAPTATION_MATRICES
 
     ### All arguments default to None so the function can be used for any combination of them
 
     ### Returns:
         tuple: All taken arguments + rgb_illum which is the default illuminant for the chosen color_space
     """
-    # Check if illuminant is correct type and among of available illuminants
+    # Strings are parsed once (and cached), enum members resolve directly to their table keys
     if illuminant:
-        if not isinstance(illuminant, str):
-            raise TypeError("Iluminant must be a string type!")
-        illuminant = illuminant.upper().strip()
-        acc_tristimulus = list(ILLUMINANTS['2'])
-        if illuminant not in acc_tristimulus:
-            raise ValueError(f'Illuminant "{illuminant}" is not supported! Please choose from:\n{acc_tristimulus}')
-
-    # Check (and fix) the observer angle type
+        illuminant = illuminant_name(illuminant)
     if observer:
-        if not isinstance(observer, (str, int, float)):
-            raise TypeError("Observer must be [str | int | float] type!")
-        if isinstance(observer, (int, float)):
-            observer = str(int(observer))
+        observer = observer_name(observer)
+    if adaptation:
+        adaptation = adaptation_name(adaptation)
 
     # Create an empty variable in case there's no color space input
     rgb_illum = None
 
-    # Check adaptation input
-    if adaptation:
-        adaptation = adaptation.lower().strip()
-        if adaptation not in ADAPTATION_MATRICES:
-            raise ValueError(f"Adaptation methods can only be one of the following: {tuple(ADAPTATION_MATRICES)}")
-
-    # Check color space input
+    # Find the iluminant of the requested color space
     if color_space:
-        color_space = color_space.upper().strip()
-
-        # Find the iluminant of the requested color space
-        if rgb_illum := cs.get(color_space):
-            rgb_illum = rgb_illum["illuminant"]
-        else:
-            msg = [i for i in cs if not i.startswith("__")]
-            msg.sort()
-            raise ValueError(f'The "{color_space}" color space is not supported! '
-                            f'Please choose one of the following:\n{msg}')
+        color_space = color_space_name(color_space)
+        rgb_illum = cs[color_space]["illuminant"]
 
     return (i for i in (illuminant, observer, color_space, adaptation, rgb_illum) if i)
 
@@ -442,3 +531,98 @@ def working_space_matrix(
 
     # Return the proper matrix
     return tuple(tuple(i) for i in convert_to_illum) if to_xyz else tuple(tuple(i) for i in pinv(convert_to_illum))
+
+
+def color_space_name(color_space: str | ColorSpace) -> str:
+    """### Finds the key of a color space in the color_spaces dictionary regardless of letter case.
+    Strings are parsed once and cached
+
+    ### Args:
+        `color_space` (str | ColorSpace): The name of the color space
+
+    ### Returns:
+        str: The name of the color space as it's written in the color_spaces dictionary
+    """
+    if isinstance(color_space, ColorSpace):
+        return color_space.value
+    if not isinstance(color_space, str):
+        raise TypeError("Color space must be a string type!")
+    return _color_space_name(color_space)
+
+
+@lru_cache(maxsize=1024)
+def _color_space_name(color_space: str) -> str:
+    """### Parses a color space string"""
+    color_space = color_space.strip()
+    if color_space in cs:
+        return sys.intern(color_space)
+    names = {i.upper(): i for i in cs}
+    if color_space.upper() in names:
+        return names[color_space.upper()]
+    msg = sorted(i for i in cs if not i.startswith("__"))
+    raise ValueError(f'The "{color_space}" color space is not supported! '
+                    f'Please choose one of the following:\n{msg}')
+
+
+def color_space_whitepoint(color_space: str | ColorSpace, observer: str | Observer = "2") -> tuple:
+    """### Returns the tristimulus values of the whitepoint of a given color space
+
+    ### Args:
+        `color_space` (str | ColorSpace): The color space whose whitepoint is needed
+        `observer` (str | Observer, optional): The observer angle of the illuminant. Defaults to "2".
+
+    #### N/B: Color spaces with an illuminant that's not in ILLUMINANTS (ACES, DCI-P3, etc.) \
+        have their whitepoint calculated from the x, y chromaticity coordinates of the color space.
+
+    ### Returns:
+        tuple[float, float, float]: X, Y, Z of the whitepoint with Y = 1
+    """
+    color_space = color_space_name(color_space)
+    if wp := ILLUMINANTS[observer_name(observer)].get(cs[color_space]["illuminant"]):
+        return wp
+    x, y = cs[color_space]["whitepoint"]
+    return x / y, 1.0, (1 - x - y) / y
+
+
+def _rgb_to_xyz_matrix(color_space: str) -> numpy.ndarray:
+    """### Returns the override RGB -> XYZ matrix of a color space if there is one or calculates it from its primaries"""
+    if matrix := cs[color_space]["override_matrix"].get("to_xyz"):
+        return numpy.array(matrix)
+
+    xr, yr, xg, yg, xb, yb = tuple(cs[color_space]["primaries"].values())
+    XYZ = numpy.array([(i / j, 1, (1 - i - j) / j) for i, j in ((xr, yr), (xg, yg), (xb, yb))]).T
+    return XYZ * (pinv(XYZ) @ color_space_whitepoint(color_space))
+
+
+@lru_cache(maxsize=256)
+def rgb_to_rgb_matrix(
+    src: str,
+    dst: str,
+    observer: str = "2",
+    adaptation: str = "bradford") -> numpy.ndarray:
+    """### Calculates a single matrix converting linear R, G, B values from one color space to another
+
+    The matrix is the product of the source RGB -> XYZ matrix, the chromatic adaptation matrix between the
+    whitepoints of both color spaces (if they differ) and the XYZ -> target RGB matrix. Results are cached
+    so every (src, dst, observer, adaptation) combination is only calculated once.
+
+    ### Args:
+        `src` (str): The color space of the input values
+        `dst` (str): The color space of the output values
+        `observer` (str, optional): The observer angle of the illuminants. Defaults to "2".
+        `adaptation` (str, optional): The adaptation method (matrix) to be used for the conversion. Defaults to "bradford".
+
+    ### Returns:
+        numpy.ndarray: A read-only 3x3 matrix to be applied to linear R, G, B values
+    """
+    src, dst = color_space_name(src), color_space_name(dst)
+    observer, adaptation = observer_name(observer), adaptation_name(adaptation)
+
+    # The target matrix is inverted instead of using its "to_rgb" override so that src == dst gives identity
+    M = _rgb_to_xyz_matrix(src)
+    wp_src, wp_dst = color_space_whitepoint(src, observer), color_space_whitepoint(dst, observer)
+    if not numpy.allclose(wp_src, wp_dst, atol=1e-4):
+        M = get_adaptation_matrix(wp_src, wp_dst, adaptation) @ M
+    M = pinv(_rgb_to_xyz_matrix(dst)) @ M
+    M.flags.writeable = False
+    return M
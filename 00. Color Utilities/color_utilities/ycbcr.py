@@ -0,0 +1,273 @@
+"""This module contains frame level Y'CbCr encoding and decoding with chroma subsampling.
+Whole frames (interleaved (H, W, 3) or planar (3, H, W) R'G'B' arrays) are converted at once to Y, Cb and Cr planes
+under any of the `WEIGHTS` presets, in legal or full range and at any input/output bit depth.
+
+Reference 1 https://en.wikipedia.org/wiki/YCbCr
+Reference 2 https://www.itu.int/rec/R-REC-BT.709
+Reference 3 https://www.itu.int/rec/T-REC-T.871
+"""
+# pylint: disable=invalid-name
+import numpy as np
+
+from .converters import WEIGHTS
+
+#= The public functions are profiled as a whole by profiling.Profiler
+_PROFILED = True
+
+#= The step between chroma samples along (rows, columns) for every subsampling scheme
+SUBSAMPLING = {"444": (1, 1), "422": (1, 2), "420": (2, 2)}
+
+
+def _weights(K: str | tuple | list) -> tuple[float, float, float]:
+    """### Returns Kr, Kg, Kb from a `WEIGHTS` preset name or from (Kr, Kb) values"""
+    if isinstance(K, str):
+        if K not in WEIGHTS:
+            raise ValueError(f"K can only be one of the following presets: {tuple(WEIGHTS)} or (Kr, Kb) values!")
+        K = WEIGHTS[K]
+    Kr, Kb = K
+    return Kr, 1 - Kr - Kb, Kb
+
+
+def _ycbcr_matrix(K: str | tuple | list) -> np.ndarray:
+    """### Returns the matrix converting normalized R'G'B' to Y' in range 0-1 and Pb, Pr in range -0.5-0.5"""
+    Kr, Kg, Kb = _weights(K)
+    return np.array((
+        (Kr, Kg, Kb),
+        (-0.5 * Kr / (1 - Kb), -0.5 * Kg / (1 - Kb), 0.5),
+        (0.5, -0.5 * Kg / (1 - Kr), -0.5 * Kb / (1 - Kr))))
+
+
+def _code_ranges(depth: int, legal: bool) -> tuple[np.ndarray, np.ndarray]:
+    """### Returns the scale and offset mapping Y' (0-1) and Pb, Pr (-0.5-0.5) to Y, Cb, Cr code values
+
+    #### N/B: Full range chroma is centered at 2**(depth-1) (as in JFIF) so achromatic colors have an exact code value.
+    """
+    if legal:
+        step = 2 ** (depth - 8)
+        scale = np.array((219, 224, 224)) * step
+        offset = np.array((16, 128, 128)) * step
+    else:
+        max_value = 2 ** depth - 1
+        scale = np.array((max_value,) * 3)
+        offset = np.array((0, 2 ** (depth - 1), 2 ** (depth - 1)))
+    return scale.astype(np.float64), offset.astype(np.float64)
+
+
+def _rgb_range(depth: int, legal: bool) -> tuple[float, float]:
+    """### Returns the code values of R'G'B' black and white"""
+    if legal:
+        return 16 * 2 ** (depth - 8), 235 * 2 ** (depth - 8)
+    return 0, 2 ** depth - 1
+
+
+def _code_dtype(depth: int) -> type:
+    """### Returns the smallest unsigned integer type holding code values of the given bit depth"""
+    if depth > 32:
+        raise ValueError("Integer code values can have at most 32 bits!")
+    return np.uint8 if depth <= 8 else np.uint16 if depth <= 16 else np.uint32
+
+
+def _quantize(values: np.ndarray, depth: int, clamp: bool) -> np.ndarray:
+    """### Rounds code values (in place) and returns them as unsigned integers"""
+    np.rint(values, out=values)
+    if clamp:
+        np.clip(values, 0, 2 ** depth - 1, out=values)
+    return values.astype(_code_dtype(depth))
+
+
+def subsample_chroma(plane: np.ndarray, subsampling: str = "420", method: str = "point") -> np.ndarray:
+    """### Reduces the resolution of a chroma plane
+
+    ### Args:
+        `plane` (numpy.ndarray): A full resolution chroma plane with shape (H, W)
+        `subsampling` (str, optional): Either "444", "422" or "420". Defaults to "420".
+        `method` (str, optional): Either "point" or "average". Defaults to "point".
+        *     point keeps every n-th (co-sited) sample and returns a zero-copy view of the plane
+        *     average returns a new plane with the mean of every block of samples (odd edges are replicated)
+
+    ### Returns:
+        numpy.ndarray: The subsampled plane
+    """
+    if subsampling not in SUBSAMPLING:
+        raise ValueError(f"Subsampling can only be one of the following: {tuple(SUBSAMPLING)}")
+    step_y, step_x = SUBSAMPLING[subsampling]
+    match method:
+        case "point":
+            return plane[::step_y, ::step_x]
+        case "average":
+            if step_y == step_x == 1:
+                return plane
+            H, W = plane.shape
+            pad = ((0, -H % step_y), (0, -W % step_x))
+            blocks = np.pad(plane, pad, mode="edge").astype(np.float64)
+            return blocks.reshape(blocks.shape[0] // step_y, step_y, blocks.shape[1] // step_x, step_x).mean(axis=(1, 3))
+        case _:
+            raise ValueError('Method can only be either "point" or "average"!')
+
+
+def upsample_chroma(plane: np.ndarray, shape: tuple, method: str = "linear") -> np.ndarray:
+    """### Restores a subsampled chroma plane to full resolution
+
+    ### Args:
+        `plane` (numpy.ndarray): A subsampled chroma plane
+        `shape` (tuple): The (H, W) shape of the luma plane
+        `method` (str, optional): Either "nearest" or "linear". Defaults to "linear".
+        *     nearest repeats every sample
+        *     linear interpolates between co-sited samples (the inverse of "point" subsampling)
+
+    ### Returns:
+        numpy.ndarray: A float plane with the given shape
+    """
+    plane = np.asarray(plane, dtype=np.float64)
+    H, W = shape
+    if plane.shape == (H, W):
+        return plane
+    step_y, step_x = -(-H // plane.shape[0]), -(-W // plane.shape[1])
+    match method:
+        case "nearest":
+            return plane.repeat(step_y, axis=0).repeat(step_x, axis=1)[:H, :W]
+        case "linear":
+            for axis, (size, step) in enumerate(((H, step_y), (W, step_x))):
+                if step == 1:
+                    continue
+                positions = np.arange(size) / step
+                low = np.minimum(positions.astype(np.intp), plane.shape[axis] - 1)
+                high = np.minimum(low + 1, plane.shape[axis] - 1)
+                weight = (positions - low).reshape((-1, 1) if axis == 0 else (1, -1))
+                plane = plane.take(low, axis=axis) * (1 - weight) + plane.take(high, axis=axis) * weight
+            return plane
+        case _:
+            raise ValueError('Method can only be either "nearest" or "linear"!')
+
+
+def rgb_to_ycbcr_planes(
+    frame,
+    K: str | tuple = "ITU-R BT.709",
+    in_depth: int = 8,
+    in_legal: bool = False,
+    out_depth: int = 8,
+    out_legal: bool = True,
+    subsampling: str = "444",
+    method: str = "point",
+    planar: bool = False,
+    out_int: bool = True,
+    clamp: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """### Converts a whole R'G'B' frame to Y, Cb, Cr planes
+
+    ### Args:
+        `frame` (array_like): Interleaved (H, W, 3) or planar (3, H, W) R'G'B' values. Integers are treated as
+                            `in_depth` code values, floats as normalized values (code value / max value for bit depth)
+        `K` (str | tuple, optional): A `WEIGHTS` preset or (Kr, Kb) luma weights. Defaults to "ITU-R BT.709".
+        `in_depth` (int, optional): The bit depth of the input. Defaults to 8.
+        `in_legal` (bool, optional): Whether the input R'G'B' is in legal (video) range. Defaults to False.
+        `out_depth` (int, optional): The bit depth of the output. Defaults to 8.
+        `out_legal` (bool, optional): Whether to return legal range Y'CbCr. Defaults to True.
+        `subsampling` (str, optional): Either "444", "422" or "420". Defaults to "444".
+        `method` (str, optional): The chroma subsampling method. Either "point" or "average". Defaults to "point".
+        `planar` (bool, optional): Whether the frame is planar (3, H, W). Defaults to False (interleaved).
+        `out_int` (bool, optional): Return unsigned integer code values. Otherwise floats normalized by the
+                                    max value for `out_depth`. Defaults to True.
+        `clamp` (bool, optional): Clamp integer output to the range of `out_depth`. Defaults to True.
+
+    #### N/B: All planes are computed in a single (3, H, W) buffer. With "point" subsampling the returned planes \
+        are zero-copy views of it.
+
+    ### Returns:
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: Y, Cb, Cr planes
+    """
+    frame = np.asarray(frame)
+    if frame.ndim != 3 or frame.shape[0 if planar else -1] != 3:
+        raise ValueError(f"The frame must have shape {'(3, H, W)' if planar else '(H, W, 3)'}!")
+    if subsampling not in SUBSAMPLING:
+        raise ValueError(f"Subsampling can only be one of the following: {tuple(SUBSAMPLING)}")
+    if method not in ("point", "average"):
+        raise ValueError('Method can only be either "point" or "average"!')
+
+    # Fold the input range normalization into the matrix so the frame is touched only once
+    RGB_min, RGB_max = _rgb_range(in_depth, in_legal)
+    if frame.dtype.kind == "f":
+        RGB_min, RGB_max = (i / (2 ** in_depth - 1) for i in (RGB_min, RGB_max))
+    elif frame.dtype.kind not in "iu":
+        raise TypeError("The frame must contain integer or float values!")
+    matrix = _ycbcr_matrix(K) / (RGB_max - RGB_min)
+    scale, offset = _code_ranges(out_depth, out_legal)
+    matrix *= scale[:, None]
+    offset = offset - matrix.sum(axis=1) * RGB_min
+
+    YCC = np.tensordot(matrix, frame, axes=([1], [0 if planar else 2]))
+    YCC += offset[:, None, None]
+    if not out_int:
+        YCC /= 2 ** out_depth - 1
+
+    if method == "average" and subsampling != "444":
+        Y = YCC[0]
+        Cb, Cr = (subsample_chroma(YCC[i], subsampling, method) for i in (1, 2))
+        if out_int:
+            return tuple(_quantize(np.array(i), out_depth, clamp) for i in (Y, Cb, Cr))
+        return Y, Cb, Cr
+
+    if out_int:
+        YCC = _quantize(YCC, out_depth, clamp)
+    return YCC[0], subsample_chroma(YCC[1], subsampling), subsample_chroma(YCC[2], subsampling)
+
+
+def ycbcr_planes_to_rgb(
+    Y,
+    Cb,
+    Cr,
+    K: str | tuple = "ITU-R BT.709",
+    in_depth: int = 8,
+    in_legal: bool = True,
+    out_depth: int = 8,
+    out_legal: bool = False,
+    method: str = "linear",
+    planar: bool = False,
+    out_int: bool = True,
+    clamp: bool = True) -> np.ndarray:
+    """### Converts Y, Cb, Cr planes (with any chroma subsampling) back to an R'G'B' frame
+
+    ### Args:
+        `Y` (array_like): The luma plane with shape (H, W)
+        `Cb` (array_like): The blue difference plane. Full or subsampled resolution.
+        `Cr` (array_like): The red difference plane. Same shape as Cb.
+        `K` (str | tuple, optional): A `WEIGHTS` preset or (Kr, Kb) luma weights. Defaults to "ITU-R BT.709".
+        `in_depth` (int, optional): The bit depth of the Y'CbCr values. Defaults to 8.
+        `in_legal` (bool, optional): Whether the Y'CbCr values are in legal range. Defaults to True.
+        `out_depth` (int, optional): The bit depth of the output. Defaults to 8.
+        `out_legal` (bool, optional): Whether to return legal range R'G'B'. Defaults to False.
+        `method` (str, optional): The chroma upsampling method. Either "nearest" or "linear". Defaults to "linear".
+        `planar` (bool, optional): Return a planar (3, H, W) frame. Defaults to False (interleaved (H, W, 3)).
+        `out_int` (bool, optional): Return unsigned integer code values. Otherwise normalized floats. Defaults to True.
+        `clamp` (bool, optional): Clamp integer output to the range of `out_depth`. Defaults to True.
+
+    #### N/B: Integer planes are treated as `in_depth` code values, float planes as normalized code values.
+
+    ### Returns:
+        numpy.ndarray: The R'G'B' frame
+    """
+    Y = np.asarray(Y)
+    if Y.ndim != 2:
+        raise ValueError("The Y plane must have shape (H, W)!")
+    if np.shape(Cb) != np.shape(Cr):
+        raise ValueError("Cb and Cr planes must have the same shape!")
+
+    YCC = np.empty((3, *Y.shape))
+    YCC[0] = Y
+    YCC[1] = upsample_chroma(Cb, Y.shape, method)
+    YCC[2] = upsample_chroma(Cr, Y.shape, method)
+    if Y.dtype.kind == "f":
+        YCC *= 2 ** in_depth - 1
+
+    scale, offset = _code_ranges(in_depth, in_legal)
+    RGB_min, RGB_max = _rgb_range(out_depth, out_legal)
+    matrix = np.linalg.inv(_ycbcr_matrix(K)) / scale * (RGB_max - RGB_min)
+    YCC -= offset[:, None, None]
+
+    if planar:
+        RGB = np.tensordot(matrix, YCC, axes=1)
+    else:
+        RGB = np.tensordot(YCC, matrix, axes=([0], [1]))
+    RGB += RGB_min
+    if out_int:
+        return _quantize(RGB, out_depth, clamp)
+    return RGB / (2 ** out_depth - 1)
@@ -1,8 +1,14 @@
 """A tester module for all functions"""
+import array as py_array
 import math
+import os
+import pickle
+import tempfile
+import tracemalloc
 import unittest
 
 from collections.abc import Sequence
+import numpy as np
 
 from .constants import *
 from color_utilities import *
@@ -235,6 +241,1073 @@ class TestRGBConverters(unittest.TestCase):
 
 
 
+class TestBatchConverters(unittest.TestCase):
+    """A tester class for the vectorized converters and transfer functions"""
+
+    def test_transfer_functions_round_trip(self):
+        """Test encode->decode of every vectorized transfer function"""
+        values = np.linspace(0.05, 1, 20)
+        for name in ("srgb", "rec601", "rec2020", "romm", "eci", "rimm", "erimm", "blackmagic", "davinci", "slog3",
+                     "vlog", "flog", "nlog", "arri_log_c3", "arri_log_c4", "red_log_film", "acescc", "acescct"):
+            func = getattr(batch_transfer_functions, name)
+            self.assertTrue(np.allclose(func(func(values), decode=True), values), name)
+
+    def test_transfer_functions_match_scalar(self):
+        """Test vectorized transfer functions against the scalar ones"""
+        color = (0.1, 0.5, 0.9)
+        self.assertTrue(np.allclose(batch_transfer_functions.srgb(color), srgb(color, output=Out3.NORMALIZED)))
+        self.assertTrue(np.allclose(batch_transfer_functions.srgb(color, decode=True),
+                                    (0.010022825574869, 0.214041140482233, 0.787412289395617)))
+        self.assertTrue(np.allclose(batch_transfer_functions.arri_log_c3(color), arri_log_c3(color)))
+        self.assertTrue(np.allclose(batch_transfer_functions.slog3(color, decode=True), slog3(color, decode=True)))
+
+    def test_convert_rgb(self):
+        """Test RGB->RGB color space conversion"""
+        colors = [(255, 0, 0), (0, 255, 0), (255, 255, 255)]
+        self.assertEqual(convert_rgb(colors, "SRGB", "ADOBE RGB", output=Out1.ROUND).tolist(),
+                         [[219, 0, 0], [144, 255, 60], [255, 255, 255]])
+        self.assertEqual(convert_rgb(colors, "SRGB", "PROPHOTO", output=Out1.HEX).tolist(),
+                         ["b3461a", "8aed4e", "ffffff"])
+
+        frame = np.random.default_rng(0).random((4, 5, 3))
+        there = convert_rgb(frame, "ARRI WIDE GAMUT 3", "REC. 2020")
+        self.assertEqual(there.shape, frame.shape)
+        self.assertTrue(np.allclose(convert_rgb(there, "REC. 2020", "ARRI WIDE GAMUT 3"), frame))
+        self.assertTrue(np.allclose(convert_rgb(frame, "ACEScg", "acescg"), frame))
+        self.assertRaises(ValueError, convert_rgb, frame, "SRGB", "NOT A COLOR SPACE")
+        self.assertRaises(ValueError, convert_rgb, [1, 2], "SRGB", "REC. 709")
+
+    def test_output_formatters(self):
+        """Test the array formatters against the scalar ones"""
+        codes = np.random.default_rng(1).integers(0, 4096, (50, 3))
+        self.assertEqual(rgb_to_hex_batch(codes, depth=12).tolist(),
+                         [rgb_to_hex(*i, depth=12) for i in codes.tolist()])
+        self.assertEqual(return_rgb_batch(codes / 4095, Out1.HEX, depth=12).tolist(),
+                         [return_rgb(i, Out1.HEX, depth=12) for i in codes.tolist()])
+        self.assertRaises(ValueError, rgb_to_hex_batch, [[256, 0, 0]])
+        # The scalar formatter still reads floats in range 0-1 as normalized values
+        self.assertEqual(return_rgb((0.2, 0.5, 0.9), Out1.HEX), "3380e6")
+
+        values = np.array([[-0.3, 0.55, 1.4]])
+        result = return_rgb_batch(values, Out1.ROUND, inplace=True)
+        self.assertEqual(result.tolist(), [[0, 140, 255]])
+        self.assertEqual(values.tolist(), [[0.0, 140.0, 255.0]])
+        for output in Out3:
+            self.assertTrue(np.allclose(return_scale_batch([-30, 55.5, 140], output, clamp=True),
+                                        return_scale([-30, 55.5, 140], output, clamp=True)))
+        self.assertEqual(return_hsw_batch([[370, 0.5, 1.2]], Out2.ROUND).tolist(), [[10, 50, 100]])
+
+
+class TestConversionServer(unittest.TestCase):
+    """A tester class for the local conversion server"""
+
+    def test_long_line(self):
+        """Test that a request line over the limit gets an error response instead of a dropped connection"""
+        import asyncio
+        import json
+        from color_utilities.server import ConversionServer
+
+        async def run():
+            server = await ConversionServer(max_line=1024).start(port=0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                colors = [[255, 0, 0]] * 1000
+                writer.write(json.dumps({"id": 1, "op": "convert_rgb", "colors": colors}).encode() + b"\n")
+                await writer.drain()
+                line = await asyncio.wait_for(reader.readline(), 5)
+                writer.close()
+                return json.loads(line)
+
+        response = asyncio.run(run())
+        self.assertIsNone(response["id"])
+        self.assertIn("1024", response["error"])
+
+    def test_batched_requests(self):
+        """Test that concurrent requests are batched, cached and give the same results as convert_rgb"""
+        import asyncio
+        import threading
+        from color_utilities.server import ConversionServer, request
+
+        loop = asyncio.new_event_loop()
+        conversion_server = ConversionServer(batch_window=0.05)
+        server = loop.run_until_complete(conversion_server.start(port=0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            port = server.sockets[0].getsockname()[1]
+            params = {"src": "SRGB", "dst": "REC. 2020", "output": "round"}
+            payloads = [{"op": "convert_rgb", "colors": [[i, 0, 255 - i]], "params": params} for i in range(0, 256, 32)]
+            payloads += [payloads[0], {"op": "convert_rgb", "colors": [[1, 2]], "params": params}]
+            responses = request(payloads, port=port)
+            responses += request([payloads[0], {"op": "stats"}], port=port)
+
+            for payload, response in zip(payloads[:-1], responses):
+                self.assertEqual(response["result"], convert_rgb(payload["colors"], output=Out1.ROUND,
+                                                                 src="SRGB", dst="REC. 2020").tolist())
+            self.assertIn("error", responses[-3])
+            stats = responses[-1]["result"]
+            self.assertLess(stats["batches"], len(payloads) - 1)
+            self.assertGreaterEqual(stats["cache_hits"], 1)
+            self.assertIn("p99", stats["latency_ms"])
+        finally:
+            async def shutdown():
+                server.close()
+                tasks = [i for i in asyncio.all_tasks() if i is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+class TestBatchColorSchemes(unittest.TestCase):
+    """A tester class for the array versions of the color schemes
+
+    ## N/B: The scalar schemes round the intermediate HSL values so results may differ by a few code values."""
+
+    colors = [COLORS[i]['rgb'] for i in ('blue', 'purple', 'yellow', 'amber', 'tan')]
+
+    def assert_close_to_scalar(self, block, func, **kwargs):
+        """Compare an (N, k, 3) block with the scalar function applied to every base color"""
+        expected = [[hex_to_rgb(j) for j in func(i, **kwargs)] for i in self.colors]
+        self.assertTrue(np.allclose(block, expected, atol=3))
+
+    def test_hsl_hsv_round_trip(self):
+        """Test RGB<->HSL and RGB<->HSV batch conversion"""
+        colors = np.random.default_rng(0).integers(0, 256, (1000, 3))
+        self.assertTrue(np.array_equal(hsl_to_rgb_batch(rgb_to_hsl_batch(colors), output=Out1.ROUND), colors))
+        self.assertTrue(np.array_equal(hsv_to_rgb_batch(rgb_to_hsv_batch(colors), output=Out1.ROUND), colors))
+        self.assertTrue(np.allclose(rgb_to_hsl_batch(self.colors[0], output=Out2.DIRECT),
+                                    rgb_to_hsl(self.colors[0], output=Out2.DIRECT)))
+
+    def test_schemes(self):
+        """Test the batch schemes against the scalar ones"""
+        self.assert_close_to_scalar(complementary_color_batch(self.colors, output=Out1.ROUND),
+                                    lambda i: [complementary_color(i)])
+        self.assert_close_to_scalar(triadic_scheme_batch(self.colors, output=Out1.ROUND), triadic_scheme)
+        self.assert_close_to_scalar(triadic_scheme_batch(self.colors, angle=60, complementary=False,
+                                                         output=Out1.ROUND),
+                                    triadic_scheme, angle=60, complementary=False)
+        self.assert_close_to_scalar(tetradic_scheme_batch(self.colors, output=Out1.ROUND), tetradic_scheme)
+        self.assertEqual(monochrome_scheme_alt_batch(self.colors, output=Out1.HEX).tolist(),
+                         [monochrome_scheme_alt(i) for i in self.colors])
+
+    def test_random_schemes(self):
+        """Test shapes and seeding of the random batch schemes"""
+        block = monochrome_scheme_batch(self.colors, new_colors=6, seed=1)
+        self.assertEqual(block.shape, (5, 6, 3))
+        self.assertTrue(np.array_equal(block, monochrome_scheme_batch(self.colors, new_colors=6, seed=1)))
+        self.assertTrue(np.allclose(rgb_to_hsl_batch(block)[..., 0], rgb_to_hsl_batch(self.colors)[:, None, 0]))
+
+        block = analogous_scheme_batch(self.colors, output_colors=5, seed=2, mode="hsv", output=Out1.ROUND)
+        self.assertEqual(block.shape, (5, 5, 3))
+        self.assertEqual(block[:, 2].tolist(), [list(i) for i in self.colors])
+        self.assertRaises(ValueError, monochrome_scheme_batch, self.colors, mode="hsp")
+
+    def test_contrast_matrix(self):
+        """Test the WCAG contrast matrix against get_color_brightness (method 11)"""
+        Y = [get_color_brightness(i, method=11, output=Out2.NORMALIZED) for i in self.colors]
+        self.assertTrue(np.allclose(relative_luminance_batch(self.colors), Y))
+        ratios, masks = contrast_matrix(self.colors, chunk=2)
+        expected = (np.maximum.outer(Y, Y) + 0.05) / (np.minimum.outer(Y, Y) + 0.05)
+        self.assertTrue(np.allclose(ratios, expected, rtol=1e-6))
+        self.assertTrue(np.array_equal(masks["AA"], expected >= 4.5))
+        self.assertTrue(np.array_equal(masks["AAA_large"], masks["AA"]))
+
+        ratios, masks = contrast_matrix(["000000", "ffffff", "767676"], ["ffffff"], dtype=np.float64)
+        self.assertEqual(ratios.shape, (3, 1))
+        self.assertAlmostEqual(ratios[0, 0], 21)
+        self.assertEqual(masks["AA"][:, 0].tolist(), [True, False, True])
+        self.assertEqual(masks["AAA"][:, 0].tolist(), [True, False, False])
+        blocks = list(iter_contrast_matrix(self.colors, chunk=2))
+        self.assertEqual([i for i, _ in blocks], [0, 2, 4])
+        self.assertTrue(np.allclose(np.concatenate([i for _, i in blocks]), expected))
+
+
+class TestCompositing(unittest.TestCase):
+    """A tester class for the compositing module"""
+
+    rng = np.random.default_rng(3)
+    src = rng.random((64, 32, 4))
+    dst = rng.random((64, 32, 4))
+
+    def test_src_over(self):
+        """Test source over against the straight alpha formula"""
+        a_s, a_d = self.src[..., 3:], self.dst[..., 3:]
+        alpha = a_s + a_d * (1 - a_s)
+        color = (self.src[..., :3] * a_s + self.dst[..., :3] * a_d * (1 - a_s)) / alpha
+        res = composite(self.src, self.dst)
+        self.assertTrue(np.allclose(res, np.concatenate((color, alpha), axis=-1)))
+        self.assertTrue(np.allclose(composite(premultiply(self.src), premultiply(self.dst), premultiplied=True),
+                                    premultiply(res)))
+
+    def test_operators_and_blend_modes(self):
+        """Test Porter-Duff operators and blend modes on opaque colors"""
+        src, dst = np.array([0.2, 0.4, 0.6, 1.0]), np.array([0.5, 0.5, 1.0, 1.0])
+        self.assertTrue(np.allclose(composite(src, dst, "dst_over"), dst))
+        self.assertTrue(np.allclose(composite(src, dst, "xor"), 0))
+        self.assertTrue(np.allclose(composite(src, dst, blend_mode="multiply")[:3], src[:3] * dst[:3]))
+        self.assertTrue(np.allclose(composite(src, dst, blend_mode="screen")[:3], [0.6, 0.7, 1.0]))
+        self.assertTrue(np.allclose(composite(src, dst, blend_mode="overlay")[:3], [0.2, 0.4, 1.0]))
+        self.assertTrue(np.allclose(composite(src, dst, opacity=0.5, linear=True)[:3],
+                                    batch_transfer_functions.srgb((batch_transfer_functions.srgb(src[:3], decode=True)
+                                    + batch_transfer_functions.srgb(dst[:3], decode=True)) / 2)))
+        self.assertEqual(composite([[255, 0, 0, 128]], [[0, 0, 255, 255]]).tolist(), [[128, 0, 127, 255]])
+        self.assertRaises(ValueError, composite, src, dst, "under")
+
+    def test_composite_layers(self):
+        """Test that tiled layer stacks match compositing whole images"""
+        layers = [(self.rng.random((70, 16, 4)) * 255).astype(np.uint8) for _ in range(4)]
+        expected = layers[0] / 255
+        for layer, mode in zip(layers[1:], ("normal", "multiply", "screen")):
+            expected = composite(layer / 255, expected, blend_mode=mode)
+        res = composite_layers(layers, blend_mode=["normal", "multiply", "screen"], tile_rows=16)
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertTrue(np.abs(res.astype(int) - np.rint(expected * 255)).max() <= 1)
+
+    def test_buffers(self):
+        """Test that bytes and memoryview layers keep their integer type"""
+        src, dst = (self.rng.integers(0, 256, (5, 4), dtype=np.uint8) for _ in range(2))
+        expected = composite(src, dst)
+        self.assertEqual(composite(src.tobytes(), memoryview(dst.tobytes())).tolist(), expected.tolist())
+        layers = composite_layers([dst.tobytes(), memoryview(src)], tile_rows=2)
+        self.assertEqual(layers.dtype, np.uint8)
+        self.assertEqual(layers.tolist(), expected.tolist())
+
+
+class TestYCbCrPlanes(unittest.TestCase):
+    """A tester class for the frame level Y'CbCr conversion"""
+
+    frame = np.random.default_rng(4).integers(0, 256, (6, 9, 3), dtype=np.uint8)
+
+    def test_reference_values(self):
+        """Test legal range, JFIF full range and 10-bit code values"""
+        white = np.full((1, 1, 3), 255, dtype=np.uint8)
+        self.assertEqual([i.item() for i in rgb_to_ycbcr_planes(white)], [235, 128, 128])
+        self.assertEqual([i.item() for i in rgb_to_ycbcr_planes(white, out_depth=10)], [940, 512, 512])
+        self.assertEqual([i.item() for i in rgb_to_ycbcr_planes([[[102, 0, 51]]], K="ITU-R BT.601",
+                                                                 out_legal=False)], [36, 136, 175])
+
+    def test_round_trip(self):
+        """Test 4:4:4 round trips for interleaved and planar frames"""
+        planes = rgb_to_ycbcr_planes(self.frame, K="ITU-R BT.2020", out_depth=10)
+        self.assertTrue(np.array_equal(ycbcr_planes_to_rgb(*planes, K="ITU-R BT.2020", in_depth=10), self.frame))
+        planes = rgb_to_ycbcr_planes(self.frame.transpose(2, 0, 1), planar=True, out_int=False)
+        self.assertTrue(np.array_equal(ycbcr_planes_to_rgb(*planes, planar=True), self.frame.transpose(2, 0, 1)))
+
+    def test_subsampling(self):
+        """Test plane shapes, zero-copy views and upsampling"""
+        Y, Cb, Cr = rgb_to_ycbcr_planes(self.frame, subsampling="420")
+        self.assertEqual((Y.shape, Cb.shape, Cr.shape), ((6, 9), (3, 5), (3, 5)))
+        self.assertTrue(Y.base is Cb.base is Cr.base is not None)
+        self.assertEqual(rgb_to_ycbcr_planes(self.frame, subsampling="422", method="average")[1].shape, (6, 5))
+        self.assertEqual(ycbcr_planes_to_rgb(Y, Cb, Cr, method="nearest").shape, self.frame.shape)
+        self.assertTrue(np.array_equal(upsample_chroma(Cb, Y.shape)[::2, ::2], Cb))
+        self.assertRaises(ValueError, rgb_to_ycbcr_planes, self.frame, subsampling="411")
+
+
+class TestFrameProcessor(unittest.TestCase):
+    """A tester class for the streaming raw frame processor"""
+
+    frames = np.random.default_rng(5).integers(0, 4096, (5, 8, 10, 3), dtype=np.uint16)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.tmp.name, "clip.raw")
+        # A 16 byte header and 6 bytes of padding after every frame
+        with open(self.path, "wb") as file:
+            file.write(bytes(16))
+            for frame in self.frames:
+                file.write(frame.tobytes() + bytes(6))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pipeline(self):
+        """Test a strided single file through a log to display pipeline against convert_rgb"""
+        reader = RawFrameReader(self.path, (8, 10), depth=12, offset=16, stride=self.frames[0].nbytes + 6)
+        self.assertEqual(len(reader), 5)
+        output = os.path.join(self.tmp.name, "out.raw")
+        stats = process_frames(reader, color_pipeline("ARRI WIDE GAMUT 3", "REC. 709", EI=800),
+                               RawFrameWriter(output, depth=10))
+        self.assertEqual(stats["frames"], 5)
+        self.assertGreater(stats["fps"], 0)
+        expected = convert_rgb(self.frames / 4095, "ARRI WIDE GAMUT 3", "REC. 709", clamp=True, EI=800)
+        result = np.fromfile(output, dtype=np.uint16).reshape(self.frames.shape)
+        self.assertTrue(np.array_equal(result, np.rint(np.clip(expected, 0, 1) * 1023)))
+
+    def test_yuv_files(self):
+        """Test writing and reading one Y'CbCr file per frame"""
+        pattern = os.path.join(self.tmp.name, "frame_{index:03d}.yuv")
+        process_frames([i / 4095 for i in self.frames], [], RawFrameWriter(pattern, depth=10, layout="yuv422"))
+        paths = sorted(os.path.join(self.tmp.name, i) for i in os.listdir(self.tmp.name) if i.endswith(".yuv"))
+        reader = RawFrameReader(paths, (8, 10), depth=10, layout="yuv422")
+        self.assertEqual((len(reader), reader[4].shape), (5, (8, 10, 3)))
+        self.assertEqual(os.path.getsize(paths[0]), (8 * 10 + 2 * 8 * 5) * 2)
+
+    def test_frame_files_mapping(self):
+        """Test that files with one frame each aren't kept mapped while a long sequence is read"""
+        import gc
+
+        paths = []
+        for index in range(40):
+            paths.append(os.path.join(self.tmp.name, f"frame_{index:03d}.raw"))
+            self.frames[index % 5].tofile(paths[-1])
+
+        def mapped() -> int:
+            gc.collect()
+            if not os.path.exists("/proc/self/maps"):
+                return 0
+            with open("/proc/self/maps", encoding="utf-8") as file:
+                return sum(os.path.basename(i) in file.read() for i in paths)
+
+        with RawFrameReader(paths, (8, 10), depth=12) as reader:
+            for index, frame in enumerate(reader):
+                self.assertTrue(np.array_equal(frame, self.frames[index % 5] / 4095))
+            self.assertEqual(len(reader._maps), 0)  # pylint: disable=protected-access
+            self.assertEqual(mapped(), 0)
+        with RawFrameReader(self.path, (8, 10), offset=16, stride=self.frames[0].nbytes + 6) as reader:
+            self.assertEqual(len(list(reader)), 5)
+            self.assertEqual(len(reader._maps), 1)  # pylint: disable=protected-access
+        self.assertEqual(len(reader._maps), 0)  # pylint: disable=protected-access
+
+    def test_errors(self):
+        """Test that errors in the stages are raised"""
+        reader = RawFrameReader(self.path, (8, 10), offset=16, stride=self.frames[0].nbytes + 6)
+        self.assertRaises(ZeroDivisionError, process_frames, reader, [lambda frame: 1 / 0],
+                          RawFrameWriter(os.path.join(self.tmp.name, "out.raw")))
+        self.assertRaises(ValueError, RawFrameReader, self.path, (8, 10), stride=10)
+
+    def test_writer_errors(self):
+        """Test that a failing writer stops the processing instead of blocking it"""
+        import threading
+        import time
+
+        class Writer:
+            """Fails after a slow write"""
+            def write(self, index, frame):
+                time.sleep(0.05)
+                raise OSError("Disk full")
+
+        errors = []
+
+        def run():
+            try:
+                process_frames([np.zeros((2, 2, 3))] * 10, [], Writer(), buffers=1)
+            except OSError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+class TestSpectral(unittest.TestCase):
+    """A tester class for the spectral integration"""
+
+    def test_bundled_tables(self):
+        """Test the color matching functions with equal energy and daylight whitepoints"""
+        for observer, cmfs in CMFS.items():
+            self.assertTrue(np.allclose(cmfs.sum(axis=0), cmfs[:, 1].sum(), rtol=1e-3), observer)
+        for observer, xy in (("2", (0.3127, 0.3290)), ("10", (0.3138, 0.3310))):
+            XYZ = spectral_to_xyz(np.ones(len(WAVELENGTHS)), observer=observer)
+            self.assertTrue(np.allclose(XYZ[:2] / XYZ.sum(), xy, atol=2e-4), observer)
+        self.assertTrue(np.allclose(spectral_to_xyz(np.ones(81), illuminant="D50"), ILLUMINANTS["2"]["D50"], atol=1e-4))
+        self.assertTrue(np.allclose(spectral_to_xyz(np.ones(81), illuminant="A"), ILLUMINANTS["2"]["A"], atol=1e-3))
+
+    def test_batches(self):
+        """Test resampling, batches and adapted illuminants"""
+        wavelengths = np.arange(400, 701, 10)
+        data = np.random.default_rng(6).random((500, len(wavelengths)))
+        XYZ = spectral_to_xyz(data, wavelengths, output=Out3.DIRECT)
+        self.assertEqual(XYZ.shape, (500, 3))
+        self.assertTrue(np.allclose(XYZ[7] / 100, spectral_to_xyz(resample(data[7], wavelengths), WAVELENGTHS)))
+        self.assertTrue(np.allclose(spectral_to_xyz(np.ones(31), wavelengths, illuminant="F11"),
+                                    ILLUMINANTS["2"]["F11"]))
+        self.assertRaises(ValueError, spectral_to_xyz, data[:, :-1], wavelengths)
+
+
+class TestCCT(unittest.TestCase):
+    """A tester class for the correlated color temperature calculations"""
+
+    def test_illuminants(self):
+        """Test the CCT of the standard illuminants against the ILLUM_WHITEPOINTS table"""
+        from color_utilities.additionals import ILLUM_WHITEPOINTS  # pylint: disable=import-outside-toplevel
+        names = ("A", "D50", "D55", "D65", "D75", "F11", "LED-B3")
+        res = xy_to_cct([ILLUM_WHITEPOINTS[i][0] for i in names])
+        expected = [int(ILLUM_WHITEPOINTS[i][-1][:-1]) for i in names]
+        self.assertTrue(np.allclose(res[:, 0], expected, atol=6))
+        self.assertTrue(np.allclose(res[3, 1], 0.0032, atol=1e-4))
+        self.assertTrue(np.isnan(xy_to_cct([0.2, 0.7])).all())
+
+    def test_round_trip(self):
+        """Test CCT and Duv to chromaticity and back on arrays"""
+        cct = np.geomspace(1500, 50000, 60).reshape(6, 10)
+        duv = np.linspace(-0.02, 0.02, 60).reshape(6, 10)
+        res = xy_to_cct(cct_to_xy(cct, duv))
+        self.assertEqual(res.shape, (6, 10, 2))
+        self.assertTrue(np.allclose(res[..., 0], cct, rtol=1e-4))
+        self.assertTrue(np.allclose(res[..., 1], duv, atol=1e-5))
+        self.assertTrue(np.allclose(cct_to_xy(6504, daylight=True), (0.3127, 0.3290), atol=3e-4))
+        self.assertTrue(np.allclose(cct_to_xyz(2856), ILLUMINANTS["2"]["A"], atol=1e-3))
+
+    def test_kelvin_to_rgb(self):
+        """Test the preview colors"""
+        res = kelvin_to_rgb([2000, 6504, 15000])
+        self.assertEqual(res.shape, (3, 3))
+        self.assertTrue((res[0, 0] == 255) and res[0, 2] < res[0, 1] < 255 and res[2, 2] == 255)
+        self.assertEqual(kelvin_to_rgb(4000, output=Out1.HEXP).shape, ())
+
+
+class TestIdentifiers(unittest.TestCase):
+    """A tester class for the enum identifiers of illuminants, observers, color spaces and adaptation methods"""
+
+    def test_refine_args(self):
+        """Test that enum members and strings resolve to the same table keys"""
+        from color_utilities import xyz  # pylint: disable=import-outside-toplevel
+        enums = xyz.refine_args(illuminant=Illuminant.D50, observer=Observer.CIE1964,
+                                color_space=ColorSpace.ACESCG, adaptation=Adaptation.CAT16)
+        strings = xyz.refine_args(illuminant=" d50", observer=10.0, color_space="acescg", adaptation="CAT16 ")
+        self.assertEqual(list(enums), list(strings))
+        self.assertIs(ColorSpace.ITU_R_BT_709, ColorSpace.REC_709)
+        self.assertEqual(color_space_name("rec. 709"), ColorSpace.REC_709.value)
+        self.assertEqual(observer_name("10°"), "10")
+        self.assertEqual(illuminant_name(Illuminant.CIE_D65), "CIE D65")
+
+    def test_conversions(self):
+        """Test enum members in conversions and the errors of unknown names"""
+        self.assertEqual(rgb_to_xyz((10, 20, 30), illuminant=Illuminant.D50, observer=Observer.CIE1931),
+                         rgb_to_xyz((10, 20, 30), illuminant="D50", observer=2))
+        self.assertTrue(np.allclose(spectral_to_xyz(np.ones(81), illuminant=Illuminant.A, observer=Observer.CIE1964),
+                                    ILLUMINANTS["10"]["A"], atol=1e-3))
+        self.assertRaises(ValueError, illuminant_name, "D66")
+        self.assertRaises(ValueError, observer_name, 5)
+        self.assertRaises(TypeError, adaptation_name, 1)
+        self.assertRaises(ValueError, color_space_name, "sRGB 2")
+
+
+class TestProfiling(unittest.TestCase):
+    """A tester class for the profiling hooks"""
+
+    def test_profile(self):
+        """Test call counts, stages, pstats data and restoring the original functions"""
+        import pstats  # pylint: disable=import-outside-toplevel
+        from color_utilities import converters, profiling  # pylint: disable=import-outside-toplevel
+        original, enabled = converters.rgb_to_xyz, profiling.get_profiler()
+        with profiling.profile() as prof:
+            for i in range(5):
+                converters.rgb_to_xyz(101 + i, 7, 9, illuminant="D50")
+            self.assertIs(profiling.get_profiler(), prof)
+        self.assertIs(converters.rgb_to_xyz, original)
+        self.assertIs(profiling.get_profiler(), enabled)
+
+        calls = {i["function"]: i["calls"] for i in prof.functions()}
+        self.assertEqual(calls["color_utilities.converters.rgb_to_xyz"], 5)
+        self.assertEqual(calls["color_utilities.xyz.apply_chromatic_adaptation"], 5)
+        stages = prof.stage_totals()
+        self.assertTrue(all(stages[i]["calls"] for i in profiling.STAGES))
+        self.assertEqual(pstats.Stats(prof).total_calls, sum(calls.values()))
+        self.assertIn("transfer function", prof.table(sort="self"))
+
+    def test_nested(self):
+        """Test that nested profilers both record and can be disabled in any order"""
+        from color_utilities import converters, profiling  # pylint: disable=import-outside-toplevel
+        original = converters.rgb_to_hsl
+        outer, inner = profiling.Profiler(), profiling.Profiler()
+        outer.enable()
+        inner.enable()
+        converters.rgb_to_hsl(10, 20, 30)
+        outer.disable()
+        converters.rgb_to_hsl(10, 20, 30)
+        self.assertIs(profiling.get_profiler(), inner)
+        inner.disable()
+        converters.rgb_to_hsl(10, 20, 30)
+        self.assertIs(converters.rgb_to_hsl, original)
+        calls = [{i["function"]: i["calls"] for i in prof.functions()} for prof in (outer, inner)]
+        self.assertEqual([i["color_utilities.converters.rgb_to_hsl"] for i in calls], [1, 2])
+        self.assertIn(converters, profiling.public_modules())
+
+
+class TestCache(unittest.TestCase):
+    """A tester class for the LRU cache of the scalar functions"""
+
+    def test_cache(self):
+        """Test that cached results are the same, normalized keys, statistics and evictions"""
+        from color_utilities import caching, color_utils, converters  # pylint: disable=import-outside-toplevel
+        expected = (get_median_color("c0ffee", "decaff"), rgb_to_xyz(10, 20, 30, illuminant="D50"),
+                    return_scale((1, 2, 3), Out3.DIRECT))
+        enabled = caching.cache_enabled()
+        with cache(maxsize=3):
+            clear_cache()
+            for _ in range(2):
+                self.assertEqual(color_utils.get_median_color("c0ffee", "decaff"), expected[0])
+            self.assertEqual(converters.rgb_to_xyz((10, 20, 30), illuminant="d50", observer=2), expected[1])
+            self.assertEqual(converters.rgb_to_xyz(10, 20, 30, illuminant=Illuminant.D50), expected[1])
+            self.assertNotEqual(converters.rgb_to_hsl(1, 1, 1), converters.rgb_to_hsl(1.0, 1.0, 1.0))
+            info = cache_info()
+            self.assertEqual((info["hits"], info["misses"], info["evictions"]), (2, 4, 1))
+            self.assertEqual(info["functions"]["color_utilities.converters.rgb_to_xyz"], {"hits": 1, "misses": 1})
+            # Random colors are not cached
+            self.assertEqual(cache_info()["skipped"], 0)
+            color_utils.monochrome_scheme("c0ffee")
+            self.assertEqual(cache_info()["misses"], 4)
+        self.assertEqual(caching.cache_enabled(), enabled)
+
+    def test_with_profiler(self):
+        """Test that the cache and a profiler can be enabled and disabled in any order"""
+        from color_utilities import caching, converters, profiling  # pylint: disable=import-outside-toplevel
+        enabled = caching.cache_enabled()
+        caching.disable_cache()
+        original = converters.rgb_to_hsl
+        try:
+            caching.enable_cache()
+            prof = profiling.Profiler()
+            prof.enable()
+            caching.disable_cache()
+            clear_cache()
+            for _ in range(2):
+                converters.rgb_to_hsl(10, 20, 30)
+            self.assertFalse(caching.cache_enabled())
+            self.assertEqual((cache_info()["hits"], cache_info()["currsize"]), (0, 0))
+            prof.disable()
+            self.assertIs(converters.rgb_to_hsl, original)
+            calls = {i["function"]: i["calls"] for i in prof.functions()}
+            self.assertEqual(calls["color_utilities.converters.rgb_to_hsl"], 2)
+        finally:
+            if enabled:
+                caching.enable_cache()
+
+
+class TestOKLab(unittest.TestCase):
+    """A tester class for the OKLab and OKLCh color spaces"""
+
+    def test_reference_values(self):
+        """Test against the published values and round trips"""
+        self.assertTrue(np.allclose(rgb_to_oklab(255, 255, 255), (1, 0, 0), atol=1e-6))
+        self.assertTrue(np.allclose(rgb_to_oklab("ff0000"), (0.62796, 0.22486, 0.12585), atol=1e-5))
+        self.assertEqual(oklab_to_rgb(rgb_to_oklab(12, 200, 99)), (12, 200, 99))
+        self.assertEqual(oklch_to_rgb(rgb_to_oklch("c0ffee"), output=Out1.HEX), "c0ffee")
+
+        colors = np.random.default_rng(2).integers(0, 256, (200, 3))
+        Lab = rgb_to_oklab_batch(colors)
+        self.assertTrue(np.allclose(Lab, [rgb_to_oklab(*i) for i in colors.tolist()]))
+        self.assertTrue((oklab_to_rgb_batch(Lab, output=Out1.ROUND) == colors).all())
+        self.assertTrue(np.allclose(oklch_to_oklab_batch(oklab_to_oklch_batch(Lab)), Lab))
+
+    def test_gradient_search_sort(self):
+        """Test gradients, nearest color search and sorting"""
+        self.assertEqual(len(oklab_gradient("ff0000", "0000ff", steps=3, include_inputs=True)), 5)
+        self.assertEqual(oklab_gradient("ff0000", "0000ff", steps=1, polar=True, output=Out1.ROUND)[0][1], 0)
+        palette = ["000000", "ffffff", "ff0000", "00ff00", "0000ff"]
+        self.assertEqual(nearest_color([[250, 10, 10], [10, 10, 10], [200, 200, 255]], palette).tolist(), [2, 0, 1])
+        self.assertEqual(sort_colors(palette, by="lightness").tolist(), [0, 4, 2, 3, 1])
+        self.assertEqual(sort_colors(palette).tolist(), [0, 1, 2, 3, 4])
+        self.assertRaises(ValueError, sort_colors, palette, by="name")
+
+
+class TestImageKernels(unittest.TestCase):
+    """A tester class for the integer 8-bit HSV/HSL kernels"""
+
+    def test_rgb_to_hsv_hsl(self):
+        """Test against the scalar converters rounded to the same ranges"""
+        image = np.random.default_rng(3).integers(0, 256, (20, 25, 3), dtype=np.uint8)
+        HSV, HSL = rgb_to_hsv_uint8(image, hue_range=360), rgb_to_hsl_uint8(image, hue_range=360, chunk=77)
+        self.assertEqual((HSV.dtype, HSV.shape), (np.uint16, image.shape))
+        self.assertEqual(rgb_to_hsv_uint8(image).dtype, np.uint8)
+        for rgb, hsv, hsl in zip(image.reshape(-1, 3).tolist(), HSV.reshape(-1, 3).tolist(), HSL.reshape(-1, 3).tolist()):
+            H, S, V = rgb_to_hsv(*rgb, output=Out2.DIRECT)
+            # Float noise can push exact halves either way
+            if abs(H % 1 - 0.5) > 1e-6:
+                self.assertEqual(hsv[0], min(round(H), 359))
+            self.assertLessEqual(abs(hsv[1] - S * 2.55), 0.5 + 1e-6)
+            self.assertEqual(hsv[2], max(rgb))
+            self.assertLessEqual(abs(hsl[2] - rgb_to_hsl(*rgb, output=Out2.DIRECT)[2] * 2.55), 0.5 + 1e-6)
+        self.assertEqual(rgb_to_hsv_uint8(np.array([[255, 0, 0], [0, 0, 255], [9, 9, 9]], dtype=np.uint8)).tolist(),
+                         [[0, 255, 255], [120, 255, 255], [0, 0, 9]])
+        self.assertRaises(TypeError, rgb_to_hsv_uint8, image.astype(np.float64))
+        self.assertRaises(ValueError, rgb_to_hsl_uint8, image, hue_range=100)
+
+    def test_hsv_hsl_to_rgb(self):
+        """Test round trips and the float converters"""
+        image = np.random.default_rng(4).integers(0, 256, (4000, 3), dtype=np.uint8)
+        for hue_range in (180, 360):
+            for forward, inverse in ((rgb_to_hsv_uint8, hsv_to_rgb_uint8), (rgb_to_hsl_uint8, hsl_to_rgb_uint8)):
+                res = inverse(forward(image, hue_range), hue_range)
+                self.assertEqual(res.dtype, np.uint8)
+                self.assertLessEqual(np.abs(res.astype(int) - image).max(), 8)
+        HSV = np.array([[30, 255, 255], [200, 100, 50]], dtype=np.uint16)
+        expected = np.rint(hsv_to_rgb_batch(HSV / (1, 255, 255)) * 255)
+        self.assertTrue((hsv_to_rgb_uint8(HSV, hue_range=360) == expected).all())
+        self.assertRaises(ValueError, hsl_to_rgb_uint8, HSV)
+
+
+class TestColorStatistics(unittest.TestCase):
+    """A tester class for the streaming color statistics"""
+
+    def test_accumulators(self):
+        """Test chunked and merged statistics against numpy on the whole collection"""
+        colors = np.random.default_rng(5).integers(0, 256, (20000, 3))
+        colors[:, 1] //= 3
+        chunks = np.array_split(colors, 7)
+        stats = collect_statistics(chunks[:4]).merge(pickle.loads(pickle.dumps(collect_statistics(chunks[4:]))))
+        values = colors / 255
+        self.assertEqual(stats.count, 20000)
+        self.assertTrue(np.allclose(stats.mean, values.mean(axis=0)))
+        self.assertTrue(np.allclose(stats.std, values.std(axis=0)))
+        self.assertTrue(np.allclose(stats.moments.covariance(1), np.cov(values.T)))
+        self.assertLess(np.abs(stats.median - np.median(values, axis=0)).max(), 0.01)
+        self.assertLess(np.abs(stats.percentile([5, 95]) - np.percentile(values, [5, 95], axis=0)).max(), 0.01)
+        self.assertTrue(np.array_equal(stats.histogram.counts,
+                                       np.histogramdd(values, bins=16, range=[(0, 1)] * 3)[0]))
+        self.assertEqual(stats.histogram.most_common(1)[0].shape, (1, 3))
+
+    def test_models(self):
+        """Test other models and errors"""
+        stats = ColorStatistics("oklab", bins=None)
+        stats.update(["ffffff", "000000"])
+        self.assertTrue(np.allclose(stats.mean, (0.5, 0, 0), atol=1e-6))
+        moments = MomentAccumulator(None).update([1.0, 2, 3, 4])
+        self.assertTrue(np.allclose(np.r_[moments.mean, moments.variance(1)], (2.5, 5 / 3)))
+        self.assertRaises(ValueError, HistogramAccumulator, None)
+        self.assertRaises(ValueError, stats.merge, ColorStatistics("oklab"))
+        self.assertRaises(TypeError, moments.merge, QuantileAccumulator(None))
+        self.assertRaises(ValueError, QuantileAccumulator().quantile, 0.5)
+
+
+class TestPalettes(unittest.TestCase):
+    """A tester class for the constrained palette generator"""
+
+    def test_generate_palette(self):
+        """Test that palettes satisfy their constraints"""
+        palette = generate_palette(200, min_distance=0.03, seed=1, output=Out1.NORMALIZED)
+        self.assertEqual(palette.shape, (200, 3))
+        Lab = rgb_to_oklab_batch(palette)
+        distances = np.linalg.norm(Lab[:, None] - Lab[None], axis=-1) + np.eye(200)
+        self.assertGreater(distances.min(), 0.03 - 1e-3)
+        self.assertTrue(np.array_equal(generate_palette(5, seed=4), generate_palette(5, seed=4)))
+
+        LCh = oklab_to_oklch_batch(rgb_to_oklab_batch(
+            generate_palette(20, hue_range=(340, 20), lightness=(0.4, 0.7), chroma=(0.05, 0.2), seed=2)))
+        self.assertTrue(((LCh[:, 0] > 0.4 - 1e-3) & (LCh[:, 0] < 0.7 + 1e-3)).all())
+        self.assertTrue(((LCh[:, 2] > 340 - 1) | (LCh[:, 2] < 20 + 1)).all())
+
+        dark = generate_palette(10, background="ffffff", min_contrast=4.5, seed=3, output=Out1.NORMALIZED)
+        Y = batch_transfer_functions.srgb(dark, decode=True) @ (0.2126, 0.7152, 0.0722)
+        self.assertTrue((1.05 / (Y + 0.05) > 4.5 - 0.05).all())
+
+        self.assertRaises(ValueError, generate_palette, 50, min_distance=0.3, seed=1)
+        self.assertRaises(ValueError, generate_palette, 5, lightness=(0.99, 1), chroma=(0.3, 0.4), seed=1)
+
+    def test_farthest_points(self):
+        """Test that the grid gives the same picks as updating every candidate"""
+        points = np.random.default_rng(6).random((5000, 3))
+        distances, expected, current = np.full(5000, np.inf), [], 0
+        for _ in range(300):
+            expected.append(current)
+            distances = np.minimum(distances, np.linalg.norm(points - points[current], axis=1))
+            current = int(distances.argmax())
+        self.assertEqual(palettes._farthest_points(points, 300, 0)[0].tolist(), expected)
+
+
+class TestAdjustments(unittest.TestCase):
+    """A tester class for the vectorized adjustment operators"""
+
+    colors = np.random.default_rng(7).integers(0, 256, (200, 3))
+
+    def test_single_adjustments(self):
+        """Test the batch adjustments against the scalar functions (which round the intermediate values)"""
+        cases = (
+            (saturate_batch(self.colors, value=20, output=Out1.ROUND), lambda c: saturate(*c, value=20)),
+            (darker_color_batch(self.colors, level=10, output=Out1.ROUND), lambda c: additionals.darker_color(*c, level=10)),
+            (brighter_color_batch(self.colors, level=10, mode="hsl", output=Out1.ROUND),
+             lambda c: additionals.brighter_color(*c, level=10, mode="hsl")),
+            (desaturate_batch(self.colors, value=20, output=Out1.HEX), lambda c: desaturate(*c, value=20)))
+        for batch, scalar in cases:
+            expected = [scalar(color) for color in self.colors.tolist()]
+            if isinstance(expected[0], str):
+                batch, expected = [hex_to_rgb(i) for i in batch], [hex_to_rgb(i) for i in expected]
+            self.assertTrue(np.allclose(batch, expected, atol=4))
+        for mode in ("rgb", "hsv", "hsl", "hsp"):
+            batch = color_change_batch(self.colors, value=10, operation="brighten", mode=mode, output=Out1.HEX)
+            expected = [color_change(*c, value=10, operation="brighten", mode=mode) for c in self.colors.tolist()]
+            self.assertTrue(np.allclose([hex_to_rgb(i) for i in batch], [hex_to_rgb(i) for i in expected], atol=4))
+        batch = half_color_batch(self.colors, operation="brighten", output=Out1.HEX)
+        self.assertEqual(batch.tolist(), [half_color(*c, operation="brighten") for c in self.colors.tolist()])
+
+    def test_chains(self):
+        """Test that a chain gives the same result as applying its adjustments one by one"""
+        chain = [Adjustment.saturate(10), Adjustment.darker(5, "hsl"),
+                 Adjustment.color_change(5, "brighten", "hsp"), Adjustment.half("brighten"), Adjustment.desaturate(3)]
+        res = self.colors / 255
+        for adjustment in chain:
+            res = adjust_batch(res, adjustment)
+        self.assertTrue(np.allclose(adjust_batch(self.colors, chain), res))
+        self.assertRaises(TypeError, adjust_batch, self.colors, [saturate])
+        self.assertRaises(ValueError, Adjustment.darker, 5, "hsp")
+
+        # HSV <-> HSL <-> HSP conversions without RGB round-trip exactly
+        HSV = rgb_to_hsv_batch(self.colors, output=Out2.HALF_NORMALIZED)
+        values = adjustments._convert(adjustments._convert(HSV.copy(), "hsv", "hsp"), "hsp", "hsl")
+        self.assertTrue(np.allclose(adjustments._convert(values, "hsl", "hsv")[HSV[:, 1] > 0], HSV[HSV[:, 1] > 0]))
+
+
+class TestDithering(unittest.TestCase):
+    """A tester class for the image bit-depth conversion"""
+
+    gradient = np.tile(np.arange(4096, dtype=np.uint16), (32, 1))
+
+    def test_rounding(self):
+        """Test that the conversion without dithering is the same as convert_bit_depth"""
+        for base, target in ((12, 8), (8, 10), (16, 8), (3, 8)):
+            codes = np.arange(0, 2 ** base, max(1, 2 ** base // 500), dtype=np.uint16)
+            res = convert_bit_depth_image(np.stack((codes,) * 3, axis=-1)[None], base, target)[0, :, 0]
+            expected = [convert_bit_depth(int(i), 0, 0, base_depth=base, target_depth=target, output=Out1.ROUND)[0]
+                        for i in codes]
+            self.assertEqual(res.tolist(), expected)
+        self.assertEqual(convert_bit_depth_image(self.gradient, 12, 8).dtype, np.uint8)
+        self.assertRaises(ValueError, convert_bit_depth_image, self.gradient, 10, 8)
+        self.assertRaises(ValueError, convert_bit_depth_image, self.gradient, 12, 8, dither="random")
+
+    def test_ordered(self):
+        """Test that ordered dithering keeps the local mean and that the integer and float paths agree"""
+        res = convert_bit_depth_image(self.gradient, 12, 8, dither="ordered")
+        self.assertTrue(np.array_equal(res, convert_bit_depth_image(self.gradient / 4095, 0, 8, dither="ordered")))
+        # A flat 8x8 tile averages to the exact value within the spacing of the thresholds
+        codes = np.arange(0, 4096, 7, dtype=np.uint16)
+        tiles = convert_bit_depth_image(np.tile(np.repeat(codes, 8), (8, 1)), 12, 8, dither="ordered")
+        means = tiles.reshape(8, -1, 8).mean(axis=(0, 2))
+        self.assertLess(np.abs(means - codes / 4095 * 255).max(), 1 / 64)
+        self.assertEqual(bayer_matrix(4).ravel().tolist(), [0, 8, 2, 10, 12, 4, 14, 6, 3, 11, 1, 9, 15, 7, 13, 5])
+
+    def test_floyd_steinberg(self):
+        """Test the wavefront error diffusion against a loop over the pixels"""
+        image = np.random.default_rng(8).integers(0, 1024, (13, 17, 3)).astype(np.uint16)
+        work = image * (255 / 1023)
+        expected = np.empty(image.shape, dtype=int)
+        for y in range(13):
+            for x in range(17):
+                quantized = np.clip(np.floor(work[y, x] + 0.5), 0, 255)
+                error, expected[y, x] = work[y, x] - quantized, quantized
+                for dy, dx, weight in dithering.FLOYD_STEINBERG:
+                    if y + dy < 13 and 0 <= x + dx < 17:
+                        work[y + dy, x + dx] += error * weight
+        self.assertTrue(np.array_equal(convert_bit_depth_image(image, 10, 8, dither="floyd-steinberg"), expected))
+
+
+class TestBuffers(unittest.TestCase):
+    """A tester class for the buffer protocol inputs and outputs"""
+
+    image = np.random.default_rng(9).integers(0, 256, (6, 7, 3), dtype=np.uint8)
+
+    def test_batch_inputs(self):
+        """Test that the batch functions take raw buffers"""
+        pixels = self.image.reshape(-1, 3)
+        raw = self.image.tobytes()
+        self.assertTrue(np.allclose(rgb_to_hsv_batch(raw), rgb_to_hsv_batch(pixels)))
+        self.assertTrue(np.array_equal(rgb_to_hsl_uint8(bytearray(raw)), rgb_to_hsl_uint8(pixels)))
+        self.assertEqual(rgb_to_hex_batch(memoryview(raw)).tolist(), rgb_to_hex_batch(pixels).tolist())
+        codes = py_array.array("H", (pixels.astype(np.uint16) * 257).ravel().tolist())
+        self.assertTrue(np.allclose(rgb_to_oklab_batch(codes, depth=16), rgb_to_oklab_batch(pixels)))
+        self.assertEqual(batch_transfer_functions.srgb(memoryview(np.linspace(0, 1, 7))).shape, (7,))
+
+    def test_views(self):
+        """Test interleaved, planar and strided views and that they don't copy"""
+        raw = bytearray(self.image.tobytes())
+        view = view_buffer(raw, shape=(6, 7))
+        self.assertTrue(np.array_equal(view, self.image))
+        self.assertTrue(np.shares_memory(view, np.frombuffer(raw, dtype=np.uint8)))
+        planar = np.ascontiguousarray(np.moveaxis(self.image, -1, 0)).tobytes()
+        self.assertTrue(np.array_equal(view_buffer(planar, shape=(6, 7), layout="chw"), self.image))
+        # Rows padded to 24 bytes after a 4 byte header
+        padded = np.zeros((6, 24), dtype=np.uint8)
+        padded[:, :21] = self.image.reshape(6, 21)
+        strided = view_buffer(b"head" + padded.tobytes(), shape=(6, 7), strides=(24, 3, 1), offset=4)
+        self.assertTrue(np.array_equal(strided, self.image))
+        self.assertRaises(ValueError, view_buffer, raw, shape=(7, 7))
+        self.assertRaises(ValueError, view_buffer, bytes(raw), writable=True)
+
+    def test_write_buffer(self):
+        """Test writing results into caller-supplied buffers"""
+        out = bytearray(self.image.size)
+        write_buffer(hsv_to_rgb_batch(rgb_to_hsv_batch(self.image.tobytes()), output=Out1.DIRECT), out, shape=(6, 7))
+        self.assertEqual(bytes(out), self.image.tobytes())
+        planar = bytearray(self.image.size)
+        write_buffer(self.image, planar, layout="chw")
+        self.assertEqual(bytes(planar), np.ascontiguousarray(np.moveaxis(self.image, -1, 0)).tobytes())
+        self.assertRaises(ValueError, write_buffer, self.image, self.image.tobytes())
+
+
+class TestWorkspace(unittest.TestCase):
+    """A tester class for the `out` and `workspace` arguments of the batch functions"""
+
+    frame = np.random.default_rng(10).random((256, 256, 3))
+
+    def _pipeline(self, frame: np.ndarray, out: np.ndarray, HSV: np.ndarray, workspace: Workspace):
+        convert_rgb(frame, "sRGB", "Rec. 2020", out=out, workspace=workspace)
+        rgb_to_hsv_batch(out, out=HSV, workspace=workspace)
+        hsv_to_rgb_batch(HSV, out=out, workspace=workspace)
+        rgb_to_oklab_batch(out, out=HSV, workspace=workspace)
+        batch_transfer_functions.acescc(frame, out=out, workspace=workspace)
+        batch_transfer_functions.log3_g10(out, decode=True, out=out, workspace=workspace)
+
+    def test_same_results(self):
+        """Test that writing into `out` (the input itself included) gives the same values"""
+        workspace, out = Workspace(), np.empty(self.frame.shape)
+        for func in (rgb_to_hsv_batch, rgb_to_hsl_batch, rgb_to_oklab_batch, batch_transfer_functions.srgb,
+                     batch_transfer_functions.acesproxy, batch_transfer_functions.log3_g12):
+            self.assertIs(func(self.frame, out=out, workspace=workspace), out)
+            self.assertTrue(np.array_equal(out, func(self.frame)))
+        HSL = rgb_to_hsl_batch(self.frame)
+        expected = hsl_to_rgb_batch(HSL)
+        self.assertTrue(np.array_equal(hsl_to_rgb_batch(HSL, out=HSL), expected))
+        expected = convert_rgb(self.frame, "ARRI WIDE GAMUT 3", "ACESCC", EI=800)
+        converted = convert_rgb(self.frame, "ARRI WIDE GAMUT 3", "ACESCC", out=out, workspace=workspace, EI=800)
+        self.assertTrue(np.array_equal(converted, expected))
+        self.assertRaises(ValueError, rgb_to_hsv_batch, self.frame, output=Out2.ROUND, out=out)
+        self.assertRaises(ValueError, batch_transfer_functions.srgb, self.frame, out=np.empty((3, 3)))
+
+    def test_steady_state(self):
+        """Test that a stream of same-sized frames is processed without allocating arrays"""
+        frames = [self.frame, self.frame[::-1], self.frame[:, ::-1]]
+        workspace, out, HSV = Workspace(), np.empty(self.frame.shape), np.empty(self.frame.shape)
+        self._pipeline(frames[0], out, HSV, workspace)
+        allocated = workspace.nbytes
+        tracemalloc.start()
+        try:
+            for frame in frames * 2:
+                self._pipeline(frame, out, HSV, workspace)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Only numpy's fixed-size iteration buffers (not a single plane of the frame)
+        self.assertLess(peak, self.frame[..., 0].nbytes)
+        self.assertEqual(workspace.nbytes, allocated)
+
+
+class TestFastMath(unittest.TestCase):
+    """A tester class for the fast math mode of the vectorized transfer functions"""
+
+    linear = np.concatenate((np.linspace(-0.1, 1, 20001), np.geomspace(1, 2 ** 16, 20001)))
+    kwargs = {"gamma_function": ({"gamma": 2.2},), "log3_g10": ({"method": 1}, {"method": 2}, {"method": 3}),
+              "acesproxy": ({"depth": 10}, {"depth": 12})}
+
+    def _curves(self):
+        """Yields the name, function and arguments of every curve"""
+        for name, func in list(vars(batch_transfer_functions).items()):
+            code = getattr(func, "__code__", None)
+            if not name.startswith("_") and code is not None and "workspace" in code.co_varnames:
+                for kwargs in self.kwargs.get(name, ({},)):
+                    yield name, func, kwargs
+
+    def test_max_error(self):
+        """Test the documented max error of every curve against the exact path"""
+        max_error = batch_transfer_functions.FAST_MATH_MAX_ERROR
+        for name, func, kwargs in self._curves():
+            # Encoding never warns about invalid values, negative ones included
+            with np.errstate(invalid="raise", divide="raise"):
+                exact = func(self.linear, **kwargs)
+                with batch_transfer_functions.fast_math():
+                    fast = func(self.linear, **kwargs)
+            self.assertEqual(fast.dtype, np.float64)
+            error, in_range, above = np.abs(fast - exact), (exact >= 0) & (exact <= 1), exact > 1
+            self.assertLessEqual(error[in_range].max() * 4095, max_error[12], name)
+            relative = exact[above] * batch_transfer_functions.FAST_MATH_MAX_RELATIVE_ERROR
+            self.assertTrue(np.all(error[above] <= relative), name)
+            for depth in (10, 12):
+                codes = np.arange(2 ** depth) / (2 ** depth - 1)
+                exact = func(codes, decode=True, **kwargs)
+                with batch_transfer_functions.fast_math(block=1000):
+                    fast = func(codes, decode=True, **kwargs)
+                # The difference to the closer neighboring code value
+                steps = np.abs(np.diff(exact))
+                steps = np.minimum(np.append(steps, steps[-1]), np.insert(steps, 0, steps[0]))
+                self.assertTrue(np.all(np.abs(fast - exact) <= steps * max_error[depth] + 1e-9), name)
+
+    def test_fast_math(self):
+        """Test that fast math is opt-in, restored after the with block and works with out and workspaces"""
+        frame = np.random.default_rng(11).random((300, 200, 3))
+        exact = convert_rgb(frame, "ARRI WIDE GAMUT 3", "REC. 2020", EI=800)
+        self.assertFalse(batch_transfer_functions.fast_math_enabled())
+        workspace, out = Workspace(), frame.copy()
+        with batch_transfer_functions.fast_math(block=4096):
+            self.assertTrue(batch_transfer_functions.fast_math_enabled())
+            fast = convert_rgb(out, "ARRI WIDE GAMUT 3", "REC. 2020", out=out, workspace=workspace, EI=800)
+        self.assertFalse(batch_transfer_functions.fast_math_enabled())
+        self.assertIs(fast, out)
+        self.assertFalse(np.array_equal(fast, exact))
+        # Bright values (linear ~40) keep their float32 error when the gamut matrix subtracts them from each other
+        self.assertTrue(np.allclose(fast, exact, rtol=1e-5, atol=1e-4))
+        self.assertTrue(np.array_equal(convert_rgb(frame, "ARRI WIDE GAMUT 3", "REC. 2020", EI=800), exact))
+        self.assertRaises(ValueError, batch_transfer_functions.enable_fast_math, 0)
+
+
+class TestGrading(unittest.TestCase):
+    """A tester class for the grading operators"""
+
+    values = np.random.default_rng(11).uniform(-0.1, 1.5, (300, 3))
+
+    def test_cdl(self):
+        """Test the CDL against a per pixel version of the ASC CDL v1.2 formulas"""
+        slope, offset, power, saturation = (1.2, 1.0, 0.8), (0.02, -0.01, 0.0), (1.1, 0.9, 1.0), 0.7
+
+        def scalar(color):
+            res = [min(max(c * s + o, 0), 1) ** p for c, s, o, p in zip(color, slope, offset, power)]
+            luma = sum(w * c for w, c in zip(additionals.REC709_LUMA_WEIGHTS, res))
+            return [min(max(luma + saturation * (c - luma), 0), 1) for c in res]
+
+        graded = GradingNode.cdl(slope, offset, power, saturation)(self.values)
+        self.assertTrue(np.allclose(graded, [scalar(color) for color in self.values.tolist()]))
+        # Without clamping values above 1 are kept and negative ones skip the power
+        graded = GradingNode.cdl(power=2.0, clamp=False)(self.values)
+        self.assertTrue(np.allclose(graded, np.where(self.values > 0, self.values ** 2, self.values)))
+        self.assertRaises(ValueError, GradingNode.cdl, power=0)
+        self.assertRaises(ValueError, GradingNode.cdl, slope=(1, 2))
+
+    def test_gains_and_pipelines(self):
+        """Test the exposure and white balance gains, chains, in place grading, LUT bakes and pipeline stages"""
+        chain = [GradingNode.exposure(1), GradingNode.white_balance(neutral=(0.5, 0.4, 0.25)),
+                 GradingNode.cdl(offset=0.01, saturation=1.2, clamp=False), GradingNode.exposure(-0.5)]
+        res = self.values
+        for node in chain:
+            res = node(res)
+        self.assertTrue(np.allclose(grade_batch(self.values, chain), res))
+        self.assertTrue(np.allclose(GradingNode.white_balance(neutral=(0.5, 0.4, 0.25))((0.5, 0.4, 0.25)), 0.4))
+        frame = self.values.copy()
+        self.assertIs(grade_batch(frame, chain, out=frame), frame)
+        self.assertTrue(np.allclose(frame, res))
+        self.assertRaises(TypeError, grade_batch, self.values, [lambda frame: frame])
+
+        # A LUT bake interpolates the grade closely (the error is largest around the clamped values)
+        grade = GradingNode.cdl(slope=(1.1, 1, 0.9), offset=0.02, power=1.2, saturation=0.8)
+        colors = np.clip(self.values, 0, 1)
+        error = np.abs(apply_lut(colors, bake_lut(grade)) - grade(colors))
+        self.assertTrue(error.max() < 0.01 and error.mean() < 1e-3)
+        self.assertTrue(np.allclose(apply_lut(colors, bake_lut([], size=2)), colors))
+
+        # Grading the linear values of the pipeline between the gamut matrix and the clamp
+        frame = np.random.default_rng(3).uniform(0, 1, (8, 8, 3))
+        res = frame
+        for stage in color_pipeline("sRGB", "REC. 709", grade=chain[:2]):
+            res = stage(res)
+        decode, encode = (batch_transfer_functions.get_transfer_function(i) for i in ("SRGB", "REC. 709"))
+        linear = decode(frame, decode=True) @ rgb_to_rgb_matrix("sRGB", "REC. 709").T
+        expected = encode(np.clip(grade_batch(linear, chain[:2]), 0, 1))
+        self.assertTrue(np.allclose(res, expected))
+
+
+class TestToneMapping(unittest.TestCase):
+    """A tester class for the tone mapping operators"""
+
+    values = np.random.default_rng(5).lognormal(-1.5, 2, (2000, 3))
+
+    def test_operators(self):
+        """Test the operators against their formulas and their shape"""
+        x = self.values
+        self.assertTrue(np.allclose(tone_map_batch(x, "reinhard"), x / (1 + x)))
+        self.assertTrue(np.allclose(tone_map_batch(x, "reinhard extended", white=8),
+                                    np.minimum(x * (1 + x / 64) / (1 + x), 1)))
+
+        def hable(v):
+            return (v * (0.15 * v + 0.05) + 0.004) / (v * (0.15 * v + 0.5) + 0.06) - 0.02 / 0.3
+
+        self.assertTrue(np.allclose(tone_map_batch(x, "hable", exposure=1), np.minimum(hable(4 * x) / hable(11.2), 1)))
+        for operator in TONE_MAPPERS:
+            res = tone_map_batch(x, operator)
+            self.assertTrue(np.all((res >= 0) & (res <= 1)))
+            # Monotonic in every channel
+            order = np.argsort(x[:, 0])
+            self.assertTrue(np.all(np.diff(tone_map_batch(x[order] * [1, 0, 0], operator)[:, 0]) >= -1e-12))
+        self.assertTrue(np.allclose(tone_map_batch([[-1, 0, 0]], "aces"), 0, atol=1e-3))
+        self.assertRaises(ValueError, tone_map_batch, x, "filmic")
+        self.assertRaises(TypeError, tone_map_batch, x, "reinhard", white=4)
+
+    def test_lut(self):
+        """Test the LUT path against the curves, in place and strided outputs and the pipeline node"""
+        for operator in TONE_MAPPERS:
+            for dtype in (np.float64, np.float32):
+                x = self.values.astype(dtype)
+                expected = tone_map_batch(x, operator, exposure=0.5)
+                self.assertTrue(np.allclose(tone_map_batch(x, operator, exposure=0.5, lut=True), expected, atol=1e-4))
+        out = np.zeros((len(self.values), 4))
+        tone_map_batch(self.values, "hable", lut=True, out=out[:, :3])
+        frame = self.values.copy()
+        self.assertIs(tone_map_batch(frame, "hable", lut=True, out=frame), frame)
+        self.assertTrue(np.array_equal(out[:, :3], frame))
+        self.assertTrue(np.array_equal(tone_mapping_node("hable", lut=True)(self.values), frame))
+
+    def test_lut_nan(self):
+        """Test that NaN values stay NaN with the LUT like they do with the curves"""
+        values = np.array([[0.18, np.nan, 4.0], [-np.nan, 1.0, 0.0]])
+        for operator in TONE_MAPPERS:
+            with np.errstate(invalid="ignore"):
+                expected = tone_map_batch(values, operator)
+            res = tone_map_batch(values, operator, lut=True)
+            self.assertTrue(np.array_equal(np.isnan(res), np.isnan(expected)), operator)
+            self.assertTrue(np.allclose(res, expected, atol=1e-4, equal_nan=True), operator)
+
+
+class TestHDRTransferFunctions(unittest.TestCase):
+    """A tester class for the PQ and HLG transfer functions and their table and LUT paths"""
+
+    values = np.concatenate((np.linspace(0, 1, 2001), np.geomspace(1e-7, 1, 2001)))
+
+    def test_curves(self):
+        """Test the vectorized curves against the scalar ones, reference values and round trips"""
+        for name in ("pq", "hlg"):
+            func = getattr(batch_transfer_functions, name)
+            scalar = getattr(transfer_functions, name)
+            self.assertTrue(np.allclose(func(self.values), scalar(self.values.tolist()), rtol=1e-12), name)
+            self.assertTrue(np.allclose(func(self.values, decode=True), scalar(self.values.tolist(), decode=True),
+                                        rtol=1e-12, atol=1e-15), name)
+            self.assertTrue(np.allclose(func(func(self.values), decode=True), self.values, rtol=1e-9, atol=1e-12))
+        # 100 cd/m2 is PQ code value 0.508, the HLG curves meet at 1/12 -> 0.5
+        self.assertAlmostEqual(batch_transfer_functions.pq([0.01])[0], 0.508078421517, places=10)
+        self.assertAlmostEqual(batch_transfer_functions.pq([1.0])[0], 1.0, places=12)
+        self.assertAlmostEqual(batch_transfer_functions.hlg([1 / 12])[0], 0.5, places=12)
+        self.assertIs(color_spaces["BT.2100 PQ"]["transfer function"], transfer_functions.pq)
+        frame = np.random.default_rng(2).random((4, 4, 3))
+        there = convert_rgb(frame, "REC. 2100 PQ", "REC. 2100 HLG")
+        self.assertTrue(np.allclose(convert_rgb(there, "REC. 2100 HLG", "REC. 2100 PQ"), frame))
+
+    def test_tables(self):
+        """Test the integer code value tables and the float LUTs against the curves"""
+        for name in ("pq", "hlg"):
+            func = getattr(batch_transfer_functions, name)
+            for depth in (10, 12):
+                codes = np.random.default_rng(depth).integers(0, 2 ** depth, (64, 32, 3)).astype(np.uint16)
+                for decode in (True, False):
+                    expected = func(codes / (2 ** depth - 1), decode=decode)
+                    self.assertTrue(np.array_equal(func(codes, decode=decode, depth=depth), expected), name)
+            out = np.zeros((64, 32, 4))
+            func(codes, decode=True, depth=12, out=out[..., :3])
+            self.assertTrue(np.array_equal(out[..., :3], func(codes / 4095, decode=True)))
+            self.assertRaises(ValueError, func, np.array([1024]), decode=True, depth=10)
+            for decode in (True, False):
+                for dtype in (np.float64, np.float32):
+                    values = self.values.astype(dtype)
+                    error = np.abs(func(values, decode=decode, lut=True) - func(values, decode=decode))
+                    self.assertLess(error.max(), 2e-5, name)
+
+    def test_lut_nan(self):
+        """Test that NaN stays NaN in the float LUTs, in place too, like it does with the curves"""
+        values = np.array([0.25, np.nan, -np.nan, np.inf, -1.0, 0.5])
+        for name in ("pq", "hlg"):
+            func = getattr(batch_transfer_functions, name)
+            for decode in (True, False):
+                res = func(values, decode=decode, lut=True)
+                self.assertTrue(np.array_equal(np.isnan(res), np.isnan(func(values, decode=decode))), name)
+                self.assertTrue(np.allclose(res[[0, 5]], func(values[[0, 5]], decode=decode), atol=2e-5), name)
+                frame = values.astype(np.float32)
+                func(frame, decode=decode, lut=True, out=frame)
+                self.assertTrue(np.array_equal(np.isnan(frame), np.isnan(res)), name)
+
+
 #!!!!!!!!!!!!!!!!!!! Change "check_..." to "validate..." function names. Check how to use Pydantic for the checks
 
 